@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Benchmarks du backend du Lecteur Musical
+Mesure les opérations critiques sur une bibliothèque synthétique, sans carte son,
+et compare chaque mesure à la précédente enregistrée pour la même taille
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'src')
+sys.path.insert(0, SRC_DIR)
+
+from synthetic_library import generate_library, KINDS
+
+
+DEFAULT_RESULTS_FILE = os.path.expanduser("~/.cache/mp3_player/benchmarks.jsonl")
+
+# Écart au-delà duquel une mesure est signalée comme régression
+REGRESSION_THRESHOLD = 0.10
+
+
+class BackendBench:
+    """Crée des backends isolés (HOME temporaire) et chronomètre leurs opérations"""
+
+    def __init__(self, size, repeat, seconds):
+        self.size = size
+        self.repeat = repeat
+        self.seconds = seconds
+        self.workdir = tempfile.mkdtemp(prefix="mp3_player_bench_")
+        self.library = os.path.join(self.workdir, 'library')
+        self.home = os.path.join(self.workdir, 'home')
+        self.cache = os.path.join(self.home, '.cache', 'mp3_player')
+        self.paths = []
+
+        # Les chemins par défaut (index, likes, session...) sont calculés à l'import :
+        # HOME doit être redirigé avant d'importer le backend
+        os.environ['HOME'] = self.home
+
+    def setup(self):
+        self.paths = generate_library(self.library, self.size, KINDS, self.seconds)
+
+    def close(self):
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def new_backend(self, cold=False):
+        """Backend neuf ; avec cold, sans aucun cache (index, dossiers, likes)"""
+        if cold:
+            shutil.rmtree(self.cache, ignore_errors=True)
+        from music_player_backend import MusicPlayerBackend
+        from audio_output import NullOutput
+        # Temps simulé figé : aucune fin de morceau ne survient sans advance(), et
+        # la durée simulée de chaque morceau est celle de l'index (reliée par le backend)
+        return MusicPlayerBackend(output=NullOutput(speed=0))
+
+    # ===== Mesures =====
+
+    def run(self):
+        """Exécute toutes les mesures et retourne {nom: résultat}"""
+        benches = [
+            ('add_folder_cold', self.bench_add_folder, {'cold': True}),
+            ('add_folder_warm', self.bench_add_folder, {'cold': False}),
+            ('add_files', self.bench_add_files, {}),
+            ('load_song', self.bench_load_song, {}),
+            ('track_transition', self.bench_track_transition, {}),
+            ('get_next_song_index', self.bench_next_index, {'shuffle': False}),
+            ('get_next_song_index_shuffle', self.bench_next_index, {'shuffle': True}),
+            ('toggle_like_song', self.bench_toggle_like, {}),
+            ('is_song_liked', self.bench_is_liked, {}),
+            ('on_playlist_updated', self.bench_playlist_updated, {}),
+        ]
+        results = {}
+        for name, bench, kwargs in benches:
+            samples, ops = [], 1
+            for _ in range(self.repeat):
+                duration, ops = bench(**kwargs)
+                samples.append(duration / ops)
+            results[name] = {
+                'ops': ops,
+                'median_ms': statistics.median(samples) * 1000,
+                'min_ms': min(samples) * 1000,
+            }
+        return results
+
+    def bench_add_folder(self, cold):
+        """Parcours du dossier jusqu'à on_scan_finished"""
+        if not cold:
+            # Remplir les caches (dossiers et métadonnées) avant la mesure
+            backend = self.new_backend()
+            self._scan(backend)
+            backend.library_index.probe_many(self.paths)
+            backend.cleanup()
+
+        backend = self.new_backend(cold=cold)
+        start = time.perf_counter()
+        self._scan(backend)
+        duration = time.perf_counter() - start
+        backend.cleanup()
+        return duration, 1
+
+    def _scan(self, backend):
+        finished = threading.Event()
+        backend.on_scan_finished = lambda success, message: finished.set()
+        backend.add_folder(self.library)
+        finished.wait()
+
+    def bench_add_files(self):
+        backend = self.new_backend()
+        start = time.perf_counter()
+        backend.add_files(self.paths)
+        duration = time.perf_counter() - start
+        backend.cleanup()
+        return duration, 1
+
+    def bench_load_song(self):
+        """Chargement de morceaux tirés au hasard (index des métadonnées déjà rempli)"""
+        backend = self.new_backend()
+        backend.library_index.probe_many(self.paths)
+        backend.playlist.extend(self.paths)
+        indexes = random.Random(1).sample(range(len(self.paths)), min(100, len(self.paths)))
+        start = time.perf_counter()
+        for index in indexes:
+            backend.load_song(index, autoplay=True)
+        duration = time.perf_counter() - start
+        backend.cleanup()
+        return duration, len(indexes)
+
+    def bench_track_transition(self):
+        """Enchaînement sans blanc en temps simulé, de la fin d'un morceau à on_song_changed"""
+        backend = self.new_backend()
+        backend.library_index.probe_many(self.paths)
+        paths = self.paths[:100]
+        backend.playlist.extend(paths)
+        changed = threading.Semaphore(0)
+        backend.on_song_changed = lambda filename, length, index: changed.release()
+        backend.load_song(0, autoplay=True)
+        changed.acquire()
+        start = time.perf_counter()
+        for _ in range(len(paths) - 1):
+            # Fin exacte du morceau en cours : la sortie enchaîne sur le morceau en file
+            backend.output.advance(backend.song_length)
+            changed.acquire()
+        duration = time.perf_counter() - start
+        backend.cleanup()
+        return duration, len(paths) - 1
+
+    def bench_next_index(self, shuffle):
+        backend = self.new_backend()
+        backend.playlist.extend(self.paths)
+        if shuffle:
+            backend.toggle_shuffle()
+        calls = 100000
+        start = time.perf_counter()
+        for i in range(calls):
+            backend.current_index = i % len(self.paths)
+            backend.get_next_song_index()
+        duration = time.perf_counter() - start
+        backend.cleanup()
+        return duration, calls
+
+    def bench_toggle_like(self):
+        """Like/unlike (écriture synchronisée du journal à chaque appel)"""
+        backend = self.new_backend(cold=True)
+        paths = self.paths[:200]
+        start = time.perf_counter()
+        for path in paths:
+            backend.toggle_like_song(path)
+        duration = time.perf_counter() - start
+        backend.cleanup()
+        return duration, len(paths)
+
+    def bench_is_liked(self):
+        backend = self.new_backend(cold=True)
+        for path in self.paths[::2]:
+            backend.toggle_like_song(path)
+        calls = 100000
+        start = time.perf_counter()
+        for i in range(calls):
+            backend.is_song_liked(self.paths[i % len(self.paths)])
+        duration = time.perf_counter() - start
+        backend.cleanup()
+        return duration, calls
+
+    def bench_playlist_updated(self):
+        """Notification de la playlist pour une rafale de téléchargements terminés"""
+        backend = self.new_backend()
+        backend.events.defer()
+        backend.on_playlist_updated = lambda playlist: len(playlist)
+        start = time.perf_counter()
+        for path in self.paths:
+            backend.events.post(backend._add_downloaded_file, path)
+        while backend.events.drain():
+            pass
+        duration = time.perf_counter() - start
+        backend.cleanup()
+        return duration, len(self.paths)
+
+
+# ===== Enregistrement et comparaison =====
+
+def git_revision():
+    """Commit courant du dépôt (None hors d'un dépôt git)"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BENCH_DIR, capture_output=True, text=True, check=True
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_results(results_file):
+    entries = []
+    try:
+        with open(results_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def save_result(results_file, entry):
+    os.makedirs(os.path.dirname(os.path.abspath(results_file)), exist_ok=True)
+    with open(results_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def report(entry, previous):
+    """Affiche les mesures et leur évolution par rapport à la précédente"""
+    reference = previous['results'] if previous else {}
+    if previous:
+        print(f"Comparaison avec {previous.get('revision') or '?'} ({previous.get('label') or ''})")
+    print(f"{'opération':32} {'médiane (ms)':>14} {'min (ms)':>12} {'évolution':>12}")
+    for name, result in entry['results'].items():
+        change = ''
+        if name in reference and reference[name]['median_ms'] > 0:
+            ratio = result['median_ms'] / reference[name]['median_ms'] - 1
+            change = f"{ratio:+.1%}"
+            if ratio > REGRESSION_THRESHOLD:
+                change += " ▲"
+        print(f"{name:32} {result['median_ms']:14.4f} {result['min_ms']:12.4f} {change:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du backend du Lecteur Musical")
+    parser.add_argument('--size', type=int, default=1000, help="nombre de fichiers de la bibliothèque")
+    parser.add_argument('--repeat', type=int, default=5, help="répétitions de chaque mesure")
+    parser.add_argument('--seconds', type=float, default=10.0, help="durée de chaque morceau")
+    parser.add_argument('--results', default=DEFAULT_RESULTS_FILE, help="fichier des résultats (JSON Lines)")
+    parser.add_argument('--label', default='', help="description de la version mesurée")
+    parser.add_argument('--no-save', action='store_true', help="ne pas enregistrer les résultats")
+    args = parser.parse_args()
+
+    results_file = os.path.abspath(args.results)
+    bench = BackendBench(args.size, args.repeat, args.seconds)
+    try:
+        bench.setup()
+        results = bench.run()
+    finally:
+        bench.close()
+
+    entry = {
+        'timestamp': time.time(),
+        'revision': git_revision(),
+        'label': args.label,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'size': args.size,
+        'repeat': args.repeat,
+        'results': results,
+    }
+    previous = [e for e in load_results(results_file) if e.get('size') == args.size]
+    report(entry, previous[-1] if previous else None)
+
+    if not args.no_save:
+        save_result(results_file, entry)
+        print(f"Résultats enregistrés dans {results_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Générateur de bibliothèques MP3 synthétiques pour les benchmarks
+Fichiers valides (trames MPEG-1 couche III silencieuses + étiquette ID3v2.4) en CBR, VBR avec Xing et VBR sans Xing
+"""
+
+import os
+import random
+import struct
+
+
+SAMPLE_RATE = 44100
+SAMPLES_PER_FRAME = 1152
+
+# Index de débit de l'en-tête -> kbit/s (MPEG-1 couche III)
+BITRATES = {1: 32, 5: 64, 9: 128, 11: 192, 14: 320}
+
+KINDS = ('cbr', 'xing', 'vbr')
+
+
+def frame_header(bitrate_index, padding=0):
+    """En-tête d'une trame MPEG-1 couche III, 44,1 kHz, stéréo, sans CRC"""
+    return bytes([0xFF, 0xFB, (bitrate_index << 4) | (padding << 1), 0x00])
+
+
+def frame_length(bitrate_index, padding=0):
+    return 144 * BITRATES[bitrate_index] * 1000 // SAMPLE_RATE + padding
+
+
+def silent_frame(bitrate_index):
+    """Trame complète dont les données audio sont nulles (silence)"""
+    return frame_header(bitrate_index) + bytes(frame_length(bitrate_index) - 4)
+
+
+def xing_frame(frames, audio_bytes, offsets):
+    """Première trame portant l'en-tête Xing (nombre de trames, octets, sommaire de 100 points)"""
+    frame = bytearray(silent_frame(9))
+    pos = 4 + 32
+    toc = bytes(min(255, offset * 256 // audio_bytes) for offset in offsets)
+    data = b'Xing' + struct.pack('>III', 0x7, frames, audio_bytes) + toc
+    frame[pos:pos + len(data)] = data
+    return bytes(frame)
+
+
+def build_audio(kind, seconds, rng):
+    """Construit les trames d'un morceau de la durée demandée"""
+    frames = max(1, round(seconds * SAMPLE_RATE / SAMPLES_PER_FRAME))
+    if kind == 'cbr':
+        return silent_frame(1) * frames
+
+    choices = list(BITRATES)
+    body = [silent_frame(rng.choice(choices)) for _ in range(frames)]
+    audio = b''.join(body)
+    if kind == 'vbr':
+        return audio
+
+    # Sommaire Xing : position (en octets) de la trame jouée à chaque centième de la durée
+    starts = [0]
+    for frame in body:
+        starts.append(starts[-1] + len(frame))
+    offsets = [starts[i * frames // 100] for i in range(100)]
+    return xing_frame(frames, len(audio), offsets) + audio
+
+
+def id3_tag(title, artist, album, track):
+    """Étiquette ID3v2.4 minimale (textes en UTF-8)"""
+    def syncsafe(value):
+        return bytes([(value >> 21) & 0x7F, (value >> 14) & 0x7F, (value >> 7) & 0x7F, value & 0x7F])
+
+    frames = b''
+    for frame_id, text in (('TIT2', title), ('TPE1', artist), ('TALB', album), ('TRCK', str(track))):
+        payload = b'\x03' + text.encode('utf-8')
+        frames += frame_id.encode('ascii') + syncsafe(len(payload)) + b'\x00\x00' + payload
+    return b'ID3\x04\x00\x00' + syncsafe(len(frames)) + frames
+
+
+def generate_library(root, count, kinds=KINDS, seconds=10.0, tracks_per_album=12, albums_per_artist=4, seed=0):
+    """Crée count fichiers MP3 répartis en Artiste/Album/Piste et retourne leurs chemins
+
+    Les trames de chaque type ne sont générées qu'une fois et partagées par
+    tous les fichiers de ce type ; seules les étiquettes diffèrent.
+    """
+    rng = random.Random(seed)
+    audio = {kind: build_audio(kind, seconds, rng) for kind in kinds}
+
+    paths = []
+    for i in range(count):
+        album_index = i // tracks_per_album
+        artist_index = album_index // albums_per_artist
+        track = i % tracks_per_album + 1
+        kind = kinds[i % len(kinds)]
+
+        artist = f"Artiste {artist_index:04d}"
+        album = f"Album {album_index:05d}"
+        folder = os.path.join(root, artist, album)
+        os.makedirs(folder, exist_ok=True)
+
+        path = os.path.join(folder, f"{track:02d} - Morceau {i:06d} ({kind}).mp3")
+        with open(path, 'wb') as f:
+            f.write(id3_tag(f"Morceau {i}", artist, album, track))
+            f.write(audio[kind])
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Génère une bibliothèque MP3 synthétique")
+    parser.add_argument('root', help="dossier de destination")
+    parser.add_argument('--count', type=int, default=500, help="nombre de fichiers")
+    parser.add_argument('--seconds', type=float, default=10.0, help="durée de chaque morceau")
+    args = parser.parse_args()
+
+    files = generate_library(args.root, args.count, seconds=args.seconds)
+    print(f"{len(files)} fichiers créés dans {args.root}")
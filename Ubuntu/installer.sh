@@ -142,6 +142,8 @@ cat > "$CONFIG_FILE" << EOF
 YTDLP_INSTALLED=$YTDLP_INSTALLED
 INSTALL_DIR=$INSTALL_DIR
 VENV_PATH=$HOME/venv/mp3_player_venv
+# Mise à jour automatique des dépendances (tous les 7 jours) : true pour l'activer
+AUTO_UPGRADE=false
 EOF
 
 if [ $? -ne 0 ]; then
@@ -168,15 +170,7 @@ fi
 # Activer l'environnement virtuel
 source "$VENV_PATH/bin/activate"
 
-# Vérifier et mettre à jour les dépendances obligatoires (silencieusement)
-pip install --upgrade pygame mutagen > /dev/null 2>&1
-
-# Vérifier et mettre à jour yt-dlp si installé
-if [ "$YTDLP_INSTALLED" = "true" ]; then
-    pip install --upgrade yt-dlp > /dev/null 2>&1
-fi
-
-# Lancer l'application
+# Lancer l'application (les dépendances sont vérifiées et mises à jour par lecteur.py)
 python3 "$INSTALL_DIR/src/lecteur.py"
 RUNSCRIPT
 
@@ -14,13 +14,5 @@ fi
 # Activer l'environnement virtuel
 source "$VENV_PATH/bin/activate"
 
-# Vérifier et mettre à jour les dépendances obligatoires (silencieusement)
-pip install --upgrade pygame mutagen > /dev/null 2>&1
-
-# Vérifier et mettre à jour yt-dlp si installé
-if [ "$YTDLP_INSTALLED" = "true" ]; then
-    pip install --upgrade yt-dlp > /dev/null 2>&1
-fi
-
-# Lancer l'application
+# Lancer l'application (les dépendances sont vérifiées et mises à jour par lecteur.py)
 python3 "$INSTALL_DIR/src/lecteur.py"
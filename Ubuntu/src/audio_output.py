@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Sorties audio du Lecteur Musical
+Mixer pygame (par défaut), sortie muette à temps simulé et enregistrement dans un fichier WAV
+"""
+
+import os
+import time
+import wave
+import threading
+from abc import ABC, abstractmethod
+
+
+# Variable d'environnement : "null", "null:<vitesse>" ou "wav:<fichier>" (mixer pygame sinon)
+AUDIO_OUTPUT_ENV = 'MP3_PLAYER_AUDIO_OUTPUT'
+
+
+class AudioOutputError(Exception):
+    """Erreur de la sortie audio (fichier illisible, périphérique absent...)"""
+
+
+class AudioOutput(ABC):
+    """Interface des sorties audio utilisées par le backend
+
+    Une seule piste est jouée à la fois, avec au plus un morceau en file
+    d'attente enchaîné sans blanc. on_end est appelé (depuis un thread de
+    la sortie) à chaque fin de morceau, enchaînement compris, et à chaque
+    stop(), comme l'événement de fin de pygame. Une sortie qui ne peut pas
+    signaler ces fins met signals_end à False : la fin des morceaux est
+    alors détectée en interrogeant get_busy().
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.on_end = None
+        self.signals_end = True
+
+    def clock(self):
+        """Horloge (en secondes) sur laquelle avance la lecture"""
+        return time.monotonic()
+
+    def open(self):
+        """Prépare la sortie ; appelé avant chaque utilisation, sans effet si elle est prête"""
+        self.ready = True
+
+    @abstractmethod
+    def load(self, source, namehint=''):
+        """Charge un morceau (chemin ou fichier ouvert) et vide la file d'attente"""
+
+    @abstractmethod
+    def play(self, start=0.0):
+        """Joue le morceau chargé depuis la position start (en secondes)"""
+
+    @abstractmethod
+    def pause(self):
+        """Met la lecture en pause"""
+
+    @abstractmethod
+    def unpause(self):
+        """Reprend la lecture là où elle a été mise en pause"""
+
+    @abstractmethod
+    def stop(self):
+        """Arrête la lecture et vide la file d'attente"""
+
+    @abstractmethod
+    def queue(self, path):
+        """Place un morceau à enchaîner à la fin du morceau en cours"""
+
+    @abstractmethod
+    def get_busy(self):
+        """Vrai si un morceau est en cours de lecture (hors pause)"""
+
+    def close(self):
+        """Libère la sortie"""
+        self.ready = False
+
+    def _notify_end(self):
+        if self.on_end:
+            self.on_end()
+
+
+# ===== Mixer pygame =====
+
+class PygameOutput(AudioOutput):
+    """Lecture par pygame.mixer.music ; pygame n'est importé qu'à l'ouverture"""
+
+    def __init__(self):
+        super().__init__()
+        self._pygame = None
+        self._end_event = None
+        self._stop_event = None
+        self._watching_end = False
+
+    def open(self):
+        if self.ready:
+            return
+        import pygame
+        self._pygame = pygame
+        try:
+            self._init_mixer()
+        except pygame.error as e:
+            raise AudioOutputError(e)
+        self.ready = True
+        self._start_end_watcher()
+
+    def _init_mixer(self):
+        self._pygame.mixer.init()
+
+    def load(self, source, namehint=''):
+        try:
+            self._pygame.mixer.music.load(source, namehint)
+        except self._pygame.error as e:
+            raise AudioOutputError(e)
+
+    def play(self, start=0.0):
+        try:
+            self._pygame.mixer.music.play(start=start)
+        except self._pygame.error as e:
+            raise AudioOutputError(e)
+
+    def pause(self):
+        self._pygame.mixer.music.pause()
+
+    def unpause(self):
+        self._pygame.mixer.music.unpause()
+
+    def stop(self):
+        self._pygame.mixer.music.stop()
+
+    def queue(self, path):
+        try:
+            self._pygame.mixer.music.queue(path)
+        except self._pygame.error as e:
+            raise AudioOutputError(e)
+
+    def get_busy(self):
+        return self._pygame.mixer.music.get_busy()
+
+    def close(self):
+        if self._watching_end:
+            self._watching_end = False
+            # Débloque le thread qui attend les événements
+            self._pygame.event.post(self._pygame.event.Event(self._stop_event))
+        if self.ready:
+            self._pygame.mixer.music.stop()
+            self._pygame.mixer.quit()
+        self.ready = False
+
+    def _start_end_watcher(self):
+        """Demande à pygame de signaler la fin des morceaux et attend ces événements"""
+        pygame = self._pygame
+        # Le sous-système vidéo ne sert qu'à la file d'événements : aucune fenêtre n'est créée
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        try:
+            pygame.display.init()
+        except pygame.error as e:
+            print(f"Erreur lors de l'initialisation des événements pygame: {e}")
+            self.signals_end = False
+            return
+
+        # Événement posté par pygame quand un morceau se termine, et événement d'arrêt du thread
+        self._end_event = pygame.USEREVENT + 1
+        self._stop_event = pygame.USEREVENT + 2
+        pygame.mixer.music.set_endevent(self._end_event)
+        self._watching_end = True
+        thread = threading.Thread(target=self._watch_music_end, daemon=True)
+        thread.start()
+
+    def _watch_music_end(self):
+        """Attend les événements de fin de morceau (thread dédié, endormi jusqu'au prochain événement)"""
+        while True:
+            event = self._pygame.event.wait()
+            if event.type == self._stop_event or not self._watching_end:
+                return
+            if event.type == self._end_event:
+                self._notify_end()
+
+
+class WavFileOutput(PygameOutput):
+    """Mixer pygame dont le son est écrit dans un fichier WAV au lieu de la carte son
+
+    Utilise le pilote audio « disk » de SDL : le décodage est celui de la
+    vraie lecture. Avec realtime=False, le mixer produit le son aussi vite
+    que possible (silence compris quand rien n'est joué) ; l'horloge suit
+    alors la quantité de son écrite plutôt que le temps réel. Le pilote
+    s'applique à tout le processus.
+    """
+
+    def __init__(self, wav_file, realtime=True, frequency=44100):
+        super().__init__()
+        self.wav_file = wav_file
+        self.realtime = realtime
+        self.frequency = frequency
+        self._raw_file = wav_file + ".raw"
+        # Échantillons de 16 bits en stéréo
+        self._bytes_per_second = frequency * 2 * 2
+
+    def _init_mixer(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.wav_file)), exist_ok=True)
+        os.environ['SDL_AUDIODRIVER'] = 'disk'
+        os.environ['SDL_DISKAUDIOFILE'] = self._raw_file
+        if not self.realtime:
+            os.environ['SDL_DISKAUDIODELAY'] = '0'
+        self._pygame.mixer.init(frequency=self.frequency, size=-16, channels=2)
+
+    def clock(self):
+        try:
+            return os.path.getsize(self._raw_file) / self._bytes_per_second
+        except OSError:
+            return 0.0
+
+    def close(self):
+        was_ready = self.ready
+        super().close()
+        if was_ready:
+            self._write_wav()
+
+    def _write_wav(self):
+        """Ajoute l'en-tête WAV au son brut écrit par SDL"""
+        try:
+            with open(self._raw_file, 'rb') as raw, wave.open(self.wav_file, 'wb') as wav:
+                wav.setnchannels(2)
+                wav.setsampwidth(2)
+                wav.setframerate(self.frequency)
+                while True:
+                    chunk = raw.read(1 << 20)
+                    if not chunk:
+                        break
+                    wav.writeframes(chunk)
+            os.remove(self._raw_file)
+        except (OSError, wave.Error) as e:
+            print(f"Erreur lors de l'écriture du fichier WAV: {e}")
+
+
+# ===== Sortie muette =====
+
+class NullOutput(AudioOutput):
+    """Sortie sans son qui simule la durée des morceaux
+
+    Le temps simulé avance à speed fois le temps réel (speed=0 : il
+    n'avance que par advance()). La durée d'un morceau est donnée par
+    get_duration(chemin), ou vaut default_duration. Pour un fichier ouvert
+    (lecture depuis un seek), la durée restante est estimée d'après la
+    position du fichier.
+    """
+
+    def __init__(self, get_duration=None, speed=1.0, default_duration=180.0):
+        super().__init__()
+        self.get_duration = get_duration
+        self.speed = speed
+        self.default_duration = default_duration
+        self.source = None
+        self._cond = threading.Condition()
+        self._origin = time.monotonic()
+        self._advanced = 0.0
+        self._length = None
+        self._queued = None
+        # Instant simulé de la position 0 (en lecture) ou position figée (en pause)
+        self._started = None
+        self._paused = None
+        self._closed = False
+
+    def clock(self):
+        return self._advanced + (time.monotonic() - self._origin) * self.speed
+
+    def advance(self, seconds):
+        """Fait avancer le temps simulé immédiatement"""
+        with self._cond:
+            self._advanced += seconds
+            self._cond.notify()
+
+    def open(self):
+        if self.ready:
+            return
+        self._closed = False
+        self.ready = True
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+
+    def load(self, source, namehint=''):
+        length = self._source_length(source)
+        with self._cond:
+            self.source = source
+            self._length = length
+            self._queued = None
+            self._started = None
+            self._paused = None
+            self._cond.notify()
+
+    def play(self, start=0.0):
+        with self._cond:
+            if self._length is None:
+                raise AudioOutputError("Aucun morceau chargé")
+            self._started = self.clock() - start
+            self._paused = None
+            self._cond.notify()
+
+    def pause(self):
+        with self._cond:
+            if self._started is not None:
+                self._paused = self.clock() - self._started
+                self._started = None
+                self._cond.notify()
+
+    def unpause(self):
+        with self._cond:
+            if self._paused is not None:
+                self._started = self.clock() - self._paused
+                self._paused = None
+                self._cond.notify()
+
+    def stop(self):
+        with self._cond:
+            active = self._started is not None or self._paused is not None
+            self._started = None
+            self._paused = None
+            self._queued = None
+            self._cond.notify()
+        if active:
+            self._notify_end()
+
+    def queue(self, path):
+        length = self._source_length(path)
+        with self._cond:
+            self._queued = (path, length)
+
+    def get_busy(self):
+        return self._started is not None
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._started = None
+            self._paused = None
+            self._cond.notify()
+        self.ready = False
+
+    def _source_length(self, source):
+        if isinstance(source, str):
+            length = self.get_duration(source) if self.get_duration else 0
+            return length or self.default_duration
+
+        # Fichier ouvert : part restante de la durée du fichier
+        length = self._source_length(getattr(source, 'name', ''))
+        try:
+            size = os.fstat(source.fileno()).st_size
+            return length * (1 - source.tell() / size) if size else 0.0
+        except (OSError, ValueError, AttributeError):
+            return length
+
+    def _run(self):
+        """Signale la fin des morceaux quand le temps simulé l'atteint (thread dédié)"""
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                if self._started is None:
+                    self._cond.wait()
+                    continue
+                remaining = self._started + self._length - self.clock()
+                if remaining > 0:
+                    self._cond.wait(remaining / self.speed if self.speed else None)
+                    continue
+
+                if self._queued is not None:
+                    # Enchaînement sans blanc : le morceau suivant démarre à la fin exacte du précédent
+                    self._started += self._length
+                    self.source, self._length = self._queued
+                    self._queued = None
+                else:
+                    self._started = None
+            self._notify_end()
+
+
+def output_from_env():
+    """Sortie audio choisie par MP3_PLAYER_AUDIO_OUTPUT (mixer pygame par défaut)"""
+    setting = os.environ.get(AUDIO_OUTPUT_ENV, '')
+    kind, _, argument = setting.partition(':')
+    if kind == 'null':
+        try:
+            return NullOutput(speed=float(argument) if argument else 1.0)
+        except ValueError:
+            print(f"Avertissement : la vitesse de {AUDIO_OUTPUT_ENV} doit être un nombre")
+            return NullOutput()
+    if kind == 'wav' and argument:
+        return WavFileOutput(os.path.expanduser(argument))
+    if setting:
+        print(f"Avertissement : {AUDIO_OUTPUT_ENV} inconnue ({setting}), mixer pygame utilisé")
+    return PygameOutput()
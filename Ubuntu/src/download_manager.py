@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Gestionnaire de téléchargements du Lecteur Musical
+File d'attente persistante traitée par un nombre limité de workers
+"""
+
+import os
+import json
+import time
+import queue
+import threading
+import itertools
+
+
+# États d'un téléchargement
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+STATE_LABELS = {
+    PENDING: "En attente",
+    RUNNING: "En cours",
+    DONE: "Terminé",
+    FAILED: "Erreur",
+    CANCELLED: "Annulé",
+}
+
+DEFAULT_JOBS_FILE = os.path.expanduser("~/.cache/mp3_player/downloads.json")
+
+# Intervalle minimal entre deux mises à jour de progression d'un même téléchargement
+PROGRESS_INTERVAL = 0.25
+
+# Attente maximale de chaque worker à la fermeture (secondes)
+SHUTDOWN_TIMEOUT = 2.0
+
+
+class DownloadCancelled(Exception):
+    """Levée par un téléchargement interrompu à la demande de l'utilisateur"""
+
+
+class DownloadJob:
+    """Un téléchargement et son état"""
+
+    def __init__(self, job_id, url, state=PENDING, title=None, video_id=None):
+        self.id = job_id
+        self.url = url
+        self.state = state
+        self.title = title
+        self.video_id = video_id
+        self.progress = 0.0
+        self.message = ""
+        self.output_file = None
+
+        # Non persistés
+        self.cancel_event = threading.Event()
+        self.process = None
+        self.progress_callback = None
+        self.last_notified = 0.0
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def label(self):
+        """Texte court décrivant le téléchargement"""
+        name = self.title or self.url
+        text = f"[{STATE_LABELS[self.state]}] {name}"
+        if self.state == RUNNING and self.progress:
+            text += f" ({self.progress:.0f}%)"
+        return text
+
+    def to_dict(self):
+        return {'id': self.id, 'url': self.url, 'state': self.state, 'title': self.title,
+                'video_id': self.video_id}
+
+
+class DownloadManager:
+    """Exécute les téléchargements sur un pool de workers
+
+    run_job(job) réalise le téléchargement et retourne le fichier produit ;
+    il lève DownloadCancelled si job.cancelled devient vrai. Les téléchargements
+    en attente ou interrompus sont repris au démarrage suivant.
+    """
+
+    def __init__(self, run_job, jobs_file=DEFAULT_JOBS_FILE, max_workers=2,
+                 progress_interval=PROGRESS_INTERVAL):
+        self.run_job = run_job
+        self.jobs_file = jobs_file
+        self.max_workers = max_workers
+        self.progress_interval = progress_interval
+
+        self._jobs = {}
+        self._queue = queue.Queue()
+        # Identifiants présents dans la file : un téléchargement n'y figure qu'une fois
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._workers = []
+        self._shutting_down = threading.Event()
+
+        # Callback appelé (depuis un worker) à chaque changement d'un téléchargement
+        self.on_job_updated = None
+
+    # ===== Cycle de vie =====
+
+    def start(self):
+        """Recharge les téléchargements non terminés et démarre les workers"""
+        if self._workers:
+            return
+        for job in self._load_jobs():
+            self._jobs[job.id] = job
+            if job.state == PENDING:
+                self._enqueue(job.id)
+
+        for _ in range(self.max_workers):
+            worker = threading.Thread(target=self._worker, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def shutdown(self):
+        """Arrête les workers ; les téléchargements en cours seront repris au prochain lancement"""
+        if not self._workers:
+            # Jamais démarré : le fichier n'a pas été relu, il ne doit pas être réécrit
+            return
+        # Les workers remettent en attente, sans notifier, ce que la fermeture interrompt
+        self._shutting_down.set()
+        for job in self.jobs():
+            if job.state == RUNNING:
+                job.cancel_event.set()
+                if job.process is not None:
+                    job.process.terminate()
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join(SHUTDOWN_TIMEOUT)
+        self._save_jobs()
+
+    # ===== Opérations =====
+
+    def submit(self, url, progress_callback=None, video_id=None):
+        """Ajoute un téléchargement à la file
+
+        Si la même vidéo est déjà en attente ou en cours, ce téléchargement est réutilisé.
+        """
+        self.start()
+        with self._lock:
+            if video_id is not None:
+                for job in self._jobs.values():
+                    if job.video_id == video_id and job.state in (PENDING, RUNNING):
+                        return job
+            job = DownloadJob(self._next_id(), url, video_id=video_id)
+            job.progress_callback = progress_callback
+            job.message = "En attente"
+            self._jobs[job.id] = job
+        self._save_jobs()
+        self._enqueue(job.id)
+        self._notify(job)
+        return job
+
+    def submit_many(self, items, progress_callback=None):
+        """Ajoute plusieurs téléchargements (url, video_id, titre) en une seule écriture
+
+        Retourne les téléchargements créés ; les vidéos déjà en file sont ignorées.
+        """
+        self.start()
+        jobs = []
+        with self._lock:
+            active = {job.video_id for job in self._jobs.values()
+                      if job.video_id is not None and job.state in (PENDING, RUNNING)}
+            for url, video_id, title in items:
+                if video_id is not None and video_id in active:
+                    continue
+                active.add(video_id)
+                job = DownloadJob(self._next_id(), url, title=title, video_id=video_id)
+                job.progress_callback = progress_callback
+                job.message = "En attente"
+                self._jobs[job.id] = job
+                jobs.append(job)
+        self._save_jobs()
+        for job in jobs:
+            self._enqueue(job.id)
+            self._notify(job)
+        return jobs
+
+    def cancel(self, job_id):
+        """Annule un téléchargement en attente ou en cours"""
+        job = self._jobs.get(job_id)
+        if job is None or job.state not in (PENDING, RUNNING):
+            return False
+        job.cancel_event.set()
+        if job.process is not None:
+            job.process.terminate()
+        if job.state == PENDING:
+            self._set_state(job, CANCELLED, "Téléchargement annulé")
+        return True
+
+    def retry(self, job_id):
+        """Relance un téléchargement en erreur ou annulé"""
+        job = self._jobs.get(job_id)
+        if job is None or job.state not in (FAILED, CANCELLED):
+            return False
+        job.cancel_event.clear()
+        job.progress = 0.0
+        self._set_state(job, PENDING, "En attente")
+        self._enqueue(job.id)
+        return True
+
+    def jobs(self):
+        """Retourne la liste des téléchargements connus"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    # ===== Workers =====
+
+    def _enqueue(self, job_id):
+        """Place un téléchargement dans la file, s'il n'y est pas déjà"""
+        with self._lock:
+            if job_id in self._queued:
+                return
+            self._queued.add(job_id)
+        self._queue.put(job_id)
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None or self._shutting_down.is_set():
+                return
+            with self._lock:
+                self._queued.discard(job_id)
+            job = self._jobs.get(job_id)
+            if job is None or job.state != PENDING or job.cancelled:
+                continue
+
+            self._set_state(job, RUNNING, "🔄 Démarrage du téléchargement...")
+            try:
+                job.output_file = self.run_job(job)
+                job.progress = 100.0
+                self._finish(job, DONE, f"✓ Téléchargé: {job.title or job.url}")
+            except Exception as e:
+                if self._shutting_down.is_set():
+                    # Interrompu par la fermeture : repris au prochain lancement
+                    job.state = PENDING
+                    job.message = "En attente"
+                elif isinstance(e, DownloadCancelled):
+                    self._set_state(job, CANCELLED, "Téléchargement annulé")
+                else:
+                    message = str(e) if isinstance(e, RuntimeError) else f"Erreur: {e}"
+                    self._set_state(job, CANCELLED if job.cancelled else FAILED, message)
+            finally:
+                job.process = None
+
+    def _finish(self, job, state, message):
+        """Fixe l'état final ; pendant la fermeture, sans notification ni écriture (faite par shutdown)"""
+        if self._shutting_down.is_set():
+            job.state = state
+            job.message = message
+        else:
+            self._set_state(job, state, message)
+
+    def update(self, job, message=None, progress=None, title=None, throttle=False):
+        """Met à jour la progression d'un téléchargement (appelé par run_job)
+
+        Avec throttle, la notification est omise si la précédente date de moins de
+        progress_interval : seul l'état le plus récent compte, les autres sont fusionnés.
+        """
+        if message is not None:
+            job.message = message
+        if progress is not None:
+            job.progress = progress
+        if title is not None:
+            job.title = title
+        if throttle and time.monotonic() - job.last_notified < self.progress_interval:
+            return
+        self._notify(job)
+
+    def _set_state(self, job, state, message):
+        job.state = state
+        job.message = message
+        self._save_jobs()
+        self._notify(job)
+
+    def _notify(self, job):
+        job.last_notified = time.monotonic()
+        if self.on_job_updated:
+            self.on_job_updated(job)
+
+    def _next_id(self):
+        job_id = next(self._ids)
+        while job_id in self._jobs:
+            job_id = next(self._ids)
+        return job_id
+
+    # ===== Persistance =====
+
+    def _load_jobs(self):
+        """Relit les téléchargements sauvegardés ; ceux qui étaient en cours repassent en attente"""
+        jobs = []
+        try:
+            if os.path.exists(self.jobs_file):
+                with open(self.jobs_file, 'r', encoding='utf-8') as f:
+                    for data in json.load(f):
+                        state = PENDING if data['state'] in (PENDING, RUNNING) else data['state']
+                        jobs.append(DownloadJob(data['id'], data['url'], state,
+                                                data.get('title'), data.get('video_id')))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Erreur lors du chargement des téléchargements: {e}")
+        return jobs
+
+    def _save_jobs(self):
+        """Sauvegarde les téléchargements non terminés (écriture atomique)"""
+        with self._lock:
+            data = [job.to_dict() for job in self._jobs.values() if job.state not in (DONE, CANCELLED)]
+            try:
+                os.makedirs(os.path.dirname(self.jobs_file), exist_ok=True)
+                tmp_file = self.jobs_file + ".tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_file, self.jobs_file)
+            except OSError as e:
+                print(f"Erreur lors de la sauvegarde des téléchargements: {e}")
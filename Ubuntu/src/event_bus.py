@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+File d'appels du Lecteur Musical
+Les threads d'arrière-plan y déposent commandes et événements, exécutés par lots dans le thread de l'interface
+"""
+
+import os
+import threading
+from collections import deque
+
+
+# Nombre maximal d'appels exécutés par lot avant de rendre la main à l'interface
+BATCH_SIZE = 200
+
+
+class EventBus:
+    """File d'appels à exécuter dans un seul thread (celui de l'interface)
+
+    post() peut être appelé depuis n'importe quel thread : il ne fait que
+    déposer l'appel et, quand la file passe de vide à non vide, écrire un
+    octet dans un tube. Le thread propriétaire surveille ce tube (sans
+    aucun réveil tant que la file est vide) et appelle drain() quand il
+    devient lisible. Un appel déposé avec une clé remplace celui de même
+    clé encore en attente : seul le plus récent compte. Tant que defer()
+    n'a pas été appelé (pas d'interface), les appels sont exécutés
+    immédiatement.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        self.batch_size = batch_size
+        self._queue = deque()
+        self._keyed = {}
+        self._lock = threading.Lock()
+        self._deferred = False
+        self._closed = False
+        # Vrai tant qu'un octet signale la file non vide (écrit et pas encore relevé par drain())
+        self._awake = False
+        self._reader = None
+        self._writer = None
+
+    def defer(self):
+        """Dépose désormais les appels dans la file
+
+        Retourne le descripteur à surveiller : il devient lisible quand des
+        appels attendent drain().
+        """
+        if self._reader is None:
+            self._reader, self._writer = os.pipe()
+            os.set_blocking(self._reader, False)
+            os.set_blocking(self._writer, False)
+        self._deferred = True
+        return self._reader
+
+    def post(self, func, *args, key=None):
+        """Dépose un appel func(*args) dans la file"""
+        if self._closed:
+            return
+        if not self._deferred:
+            func(*args)
+            return
+
+        with self._lock:
+            if key is not None and key in self._keyed:
+                # Remplace l'appel en attente en gardant sa place dans la file
+                self._keyed[key][1:] = [func, args]
+                return
+            entry = [key, func, args]
+            self._queue.append(entry)
+            if key is not None:
+                self._keyed[key] = entry
+            wake = not self._awake
+            self._awake = True
+
+        if wake:
+            self._wake()
+
+    def drain(self):
+        """Exécute un lot d'appels en attente (thread propriétaire uniquement)
+
+        Retourne vrai s'il reste des appels : le lot était complet, et le
+        tube est de nouveau signalé pour le lot suivant.
+        """
+        self._clear_wakeup()
+        for _ in range(self.batch_size):
+            with self._lock:
+                if not self._queue:
+                    self._awake = False
+                    return False
+                key, func, args = self._queue.popleft()
+                if key is not None:
+                    del self._keyed[key]
+            try:
+                func(*args)
+            except Exception as e:
+                print(f"Erreur lors du traitement d'un événement: {e}")
+
+        with self._lock:
+            if not self._queue:
+                self._awake = False
+                return False
+        self._wake()
+        return True
+
+    def close(self):
+        """Ignore désormais les appels déposés et ferme le tube"""
+        self._closed = True
+        with self._lock:
+            self._queue.clear()
+            self._keyed.clear()
+            reader, writer = self._reader, self._writer
+            self._reader = self._writer = None
+        for fd in (reader, writer):
+            if fd is not None:
+                os.close(fd)
+
+    # ===== Tube de réveil =====
+
+    def _wake(self):
+        try:
+            os.write(self._writer, b'\0')
+        except BlockingIOError:
+            # Tube plein : il est déjà lisible
+            pass
+        except (OSError, TypeError):
+            # Tube fermé (fermeture en cours)
+            pass
+
+    def _clear_wakeup(self):
+        if self._reader is None:
+            return
+        try:
+            while os.read(self._reader, 512):
+                pass
+        except (BlockingIOError, OSError):
+            pass
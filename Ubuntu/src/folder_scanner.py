@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Scanner de dossiers du Lecteur Musical
+Parcourt récursivement les dossiers en parallèle et transmet les fichiers trouvés par lots
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from library_index import AUDIO_EXTENSIONS
+from profiling import profiler
+
+
+class FolderScanner:
+    """Parcours parallèle et incrémental d'arborescences musicales"""
+
+    def __init__(self, library_index, extensions=AUDIO_EXTENSIONS, max_workers=8, batch_size=200):
+        self.library_index = library_index
+        self.extensions = tuple(extensions)
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self._cancelled = threading.Event()
+
+    def scan(self, root_path, on_batch, on_done=None):
+        """Lance le parcours de root_path dans un thread d'arrière-plan
+
+        on_batch(fichiers) est appelé pour chaque lot trouvé,
+        on_done(fichiers) une fois le parcours terminé avec la liste complète.
+        """
+        self._cancelled.clear()
+        thread = threading.Thread(
+            target=profiler.wrap(self._run),
+            args=(os.path.abspath(root_path), on_batch, on_done),
+            daemon=True
+        )
+        thread.start()
+        return thread
+
+    def cancel(self):
+        """Interrompt le parcours en cours"""
+        self._cancelled.set()
+
+    def _run(self, root_path, on_batch, on_done):
+        """Coordonne le parcours : distribue les dossiers aux workers et regroupe les résultats
+
+        Les dossiers sont parcourus en parallèle, mais leurs fichiers sont
+        transmis dans l'ordre d'un parcours trié (dossier, puis chacun de ses
+        sous-dossiers dans l'ordre alphabétique) : les résultats arrivés en
+        avance attendent leur tour.
+        """
+        found = []
+        batch = []
+        changed = []
+        # Résultats en attente de leur tour : dossier -> (fichiers, sous-dossiers)
+        results = {}
+        # Prochains dossiers à transmettre (le prochain en fin de liste)
+        expected = [root_path]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = {pool.submit(self._scan_directory, root_path): root_path}
+            while pending and not self._cancelled.is_set():
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        files, subdirs, entry = future.result()
+                    except OSError as e:
+                        print(f"Erreur lors du parcours d'un dossier: {e}")
+                        files, subdirs, entry = [], [], None
+
+                    if entry is not None:
+                        changed.append(entry)
+                    for subdir in subdirs:
+                        pending[pool.submit(self._scan_directory, subdir)] = subdir
+                    results[path] = (files, subdirs)
+
+                while expected and expected[-1] in results:
+                    files, subdirs = results.pop(expected.pop())
+                    expected.extend(reversed(subdirs))
+                    batch.extend(files)
+                    if len(batch) >= self.batch_size:
+                        found.extend(batch)
+                        on_batch(batch)
+                        batch = []
+
+            for future in pending:
+                future.cancel()
+
+        if batch:
+            found.extend(batch)
+            on_batch(batch)
+
+        self.library_index.store_directories(changed)
+
+        if on_done:
+            on_done(found)
+
+    def _scan_directory(self, path):
+        """Liste un dossier, en réutilisant le cache si sa date de modification n'a pas changé
+
+        Le cache mémorise tous les fichiers du dossier : le filtre des extensions
+        est appliqué à la lecture, pour qu'un changement d'extensions s'applique
+        aussi aux dossiers déjà parcourus.
+        Retourne (fichiers audio, sous-dossiers, entrée à mettre en cache ou None).
+        """
+        mtime_ns = os.stat(path).st_mtime_ns
+        cached = self.library_index.get_directory(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return self._audio_files(cached[1]), cached[2], None
+
+        files = []
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry.path)
+                except OSError:
+                    continue
+
+        files.sort()
+        subdirs.sort()
+        return self._audio_files(files), subdirs, (path, mtime_ns, files, subdirs)
+
+    def _audio_files(self, files):
+        return [f for f in files if f.lower().endswith(self.extensions)]
@@ -1,8 +1,25 @@
+from startup_profile import profile
 import subprocess
 import sys
 import os
+import json
+import time
+from importlib import metadata
 from pathlib import Path
 from music_player_frontend import main
+from metrics import metrics
+from profiling import profiler, enabled_from_env
+profile.mark('imports')
+
+
+# Fichier mémorisant les versions installées et la date de la dernière mise à jour
+DEPENDENCIES_STAMP = Path.home() / '.cache' / 'mp3_player' / 'dependencies.json'
+
+# Intervalle minimal entre deux mises à jour automatiques (7 jours)
+UPGRADE_INTERVAL = 7 * 24 * 3600
+
+pip_spawns = metrics.counter(
+    'mp3_player_subprocess_spawns_total', "Processus lancés, par commande", command='pip')
 
 
 def load_config():
@@ -28,8 +45,44 @@ def load_config():
     return config
 
 
+def load_stamp():
+    """Charge le fichier de versions (vide s'il n'existe pas ou est illisible)"""
+    try:
+        with open(DEPENDENCIES_STAMP, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_stamp(stamp):
+    """Sauvegarde le fichier de versions (écriture atomique)"""
+    try:
+        DEPENDENCIES_STAMP.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = DEPENDENCIES_STAMP.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(stamp, f)
+        os.replace(tmp_file, DEPENDENCIES_STAMP)
+    except OSError as e:
+        print(f"Avertissement : Impossible d'écrire {DEPENDENCIES_STAMP} : {e}")
+
+
+def installed_versions(dependencies):
+    """Lit les versions installées dans les métadonnées des paquets (sans réseau)"""
+    versions = {}
+    for name in dependencies:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
 def check_dependencies():
-    """Vérifie et met à jour les dépendances si nécessaire"""
+    """Vérifie les dépendances sans accès réseau et planifie leur mise à jour
+
+    Seules les dépendances absentes sont installées avant le lancement ;
+    la mise à jour se fait en arrière-plan, au plus une fois par UPGRADE_INTERVAL.
+    """
     # Charger la configuration
     config = load_config()
     
@@ -40,16 +93,61 @@ def check_dependencies():
     if config.get('YTDLP_INSTALLED', 'false').lower() == 'true':
         dependencies.append('yt-dlp')
     
+    stamp = load_stamp()
+    versions = installed_versions(dependencies)
+    missing = [name for name, version in versions.items() if version is None]
+    
+    # Une dépendance manque : impossible de démarrer sans l'installer
+    if missing:
+        try:
+            pip_spawns.inc()
+            subprocess.check_call(
+                [sys.executable, '-m', 'pip', 'install'] + missing,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except subprocess.CalledProcessError:
+            print("Erreur lors de l'installation des dépendances")
+        versions = installed_versions(dependencies)
+    
+    # Signaler les versions installées depuis le dernier lancement (mise à jour d'arrière-plan)
+    previous = stamp.get('versions', {})
+    for name, version in versions.items():
+        if previous.get(name) and version and previous[name] != version:
+            print(f"{name} mis à jour : {previous[name]} -> {version}")
+    stamp['versions'] = versions
+    
+    # Mise à jour périodique, détachée du lecteur pour ne jamais retarder l'affichage.
+    # Désactivée par défaut : pip remplacerait les modules d'un lecteur déjà ouvert (AUTO_UPGRADE=true pour l'activer)
+    auto_upgrade = config.get('AUTO_UPGRADE', 'false').lower() == 'true'
+    if auto_upgrade and time.time() - stamp.get('last_upgrade', 0) >= UPGRADE_INTERVAL:
+        upgrade_dependencies(dependencies)
+        stamp['last_upgrade'] = time.time()
+    
+    save_stamp(stamp)
+
+
+def upgrade_dependencies(dependencies):
+    """Lance pip install --upgrade dans un processus indépendant du lecteur"""
     try:
-        subprocess.check_call(
+        pip_spawns.inc()
+        subprocess.Popen(
             [sys.executable, '-m', 'pip', 'install', '--upgrade'] + dependencies,
             stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True
         )
-    except subprocess.CalledProcessError:
-        print("Erreur lors de la mise à jour des dépendances")
+    except OSError as e:
+        print(f"Erreur lors de la mise à jour des dépendances: {e}")
 
 
 if __name__ == "__main__":
     check_dependencies()
-    main()
\ No newline at end of file
+    profile.mark('dependencies')
+    # Capture CPU et mémoire dès le lancement (sinon à la demande : kill -USR1 <pid>)
+    if enabled_from_env():
+        profiler.start()
+    main()
+    # Une capture encore en cours est écrite avant de quitter
+    profiler.stop(wait=True)
\ No newline at end of file
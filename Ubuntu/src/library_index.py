@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Index persistant de la bibliothèque musicale
+Mémorise la durée, le débit et les tags des fichiers audio dans une base SQLite
+"""
+
+import os
+import json
+import sqlite3
+import threading
+
+
+# Version du format des entrées : toute entrée avec un tampon différent est re-analysée
+INDEX_STAMP = 1
+
+# Version du format de la base (PRAGMA user_version), indépendante des entrées des morceaux
+# (2 : les dossiers mémorisent tous leurs fichiers, pas seulement ceux d'une liste d'extensions)
+SCHEMA_VERSION = 2
+
+DEFAULT_INDEX_FILE = os.path.expanduser("~/.cache/mp3_player/library.db")
+
+# Formats lus par le lecteur (ceux que pygame sait décoder)
+AUDIO_EXTENSIONS = ('.mp3', '.ogg', '.opus', '.flac', '.wav')
+
+
+class LibraryIndex:
+    """Cache des métadonnées audio indexé par chemin, taille et date de modification"""
+
+    def __init__(self, db_file=DEFAULT_INDEX_FILE):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn = None
+        self._open()
+
+    def _open(self):
+        """Ouvre (ou crée) la base SQLite"""
+        try:
+            os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS tracks (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    duration REAL NOT NULL,
+                    bitrate INTEGER NOT NULL,
+                    tags TEXT NOT NULL,
+                    stamp INTEGER NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS directories (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    files TEXT NOT NULL,
+                    subdirs TEXT NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS seek_index (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    step REAL NOT NULL,
+                    duration REAL NOT NULL,
+                    exact INTEGER NOT NULL,
+                    offsets BLOB NOT NULL
+                )"""
+            )
+            # Dossiers parcourus avec un autre format : à parcourir de nouveau
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                self._conn.execute("DELETE FROM directories")
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS downloads (
+                    video_id TEXT PRIMARY KEY,
+                    path TEXT NOT NULL
+                )"""
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Erreur lors de l'ouverture de l'index de la bibliothèque: {e}")
+            self._conn = None
+
+    # ===== Lecture =====
+
+    def get(self, path, st=None):
+        """Retourne les métadonnées en cache si elles sont encore valides, sinon None"""
+        if self._conn is None:
+            return None
+        try:
+            st = st or os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            # La base a pu être fermée entre-temps (fermeture du lecteur)
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, duration, bitrate, tags, stamp FROM tracks WHERE path = ?",
+                (path,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        size, mtime_ns, duration, bitrate, tags, stamp = row
+        if size != st.st_size or mtime_ns != st.st_mtime_ns or stamp != INDEX_STAMP:
+            return None
+        return {
+            'duration': duration,
+            'bitrate': bitrate,
+            'tags': json.loads(tags)
+        }
+
+    def lookup(self, path):
+        """Retourne les métadonnées d'un fichier, en l'analysant seulement si nécessaire"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        info = self.get(path, st)
+        if info is None:
+            info = self._probe(path)
+            if info is not None:
+                self._store([(path, st, info)])
+        return info
+
+    def get_duration(self, path):
+        """Retourne la durée d'un fichier en secondes (0 si inconnue)"""
+        info = self.lookup(path)
+        return info['duration'] if info else 0
+
+    # ===== Écriture =====
+
+    def probe_many(self, paths):
+        """Analyse en lot les fichiers absents ou périmés de l'index"""
+        pending = []
+        for path in paths:
+            if self._conn is None:
+                return
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if self.get(path, st) is not None:
+                continue
+            info = self._probe(path)
+            if info is not None:
+                pending.append((path, st, info))
+            if len(pending) >= 500:
+                self._store(pending)
+                pending = []
+        if pending:
+            self._store(pending)
+
+    def _store(self, entries):
+        """Enregistre une série d'entrées (chemin, stat, infos) dans la base"""
+        if self._conn is None:
+            return
+        rows = [
+            (path, st.st_size, st.st_mtime_ns, info['duration'], info['bitrate'],
+             json.dumps(info['tags'], ensure_ascii=False), INDEX_STAMP)
+            for path, st, info in entries
+        ]
+        try:
+            with self._lock:
+                if self._conn is None:
+                    return
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Erreur lors de l'écriture dans l'index de la bibliothèque: {e}")
+
+    # ===== Cache des dossiers =====
+
+    def get_directory(self, path):
+        """Retourne (mtime_ns, fichiers, sous-dossiers) du dernier parcours d'un dossier"""
+        if self._conn is None:
+            return None
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT mtime_ns, files, subdirs FROM directories WHERE path = ?",
+                (path,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), json.loads(row[2])
+
+    def store_directories(self, entries):
+        """Enregistre le contenu de dossiers parcourus (chemin, mtime_ns, fichiers, sous-dossiers)"""
+        if self._conn is None or not entries:
+            return
+        rows = [
+            (path, mtime_ns, json.dumps(files, ensure_ascii=False), json.dumps(subdirs, ensure_ascii=False))
+            for path, mtime_ns, files, subdirs in entries
+        ]
+        try:
+            with self._lock:
+                if self._conn is None:
+                    return
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO directories VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Erreur lors de l'écriture dans l'index de la bibliothèque: {e}")
+
+    # ===== Index de positionnement =====
+
+    def get_seek_index(self, path, st):
+        """Retourne (pas, décalages, durée, exact) si l'index stocké correspond au fichier"""
+        if self._conn is None:
+            return None
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, step, offsets, duration, exact FROM seek_index WHERE path = ?",
+                (path,)
+            ).fetchone()
+        if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+            return None
+        return row[2], row[3], row[4], bool(row[5])
+
+    def store_seek_index(self, path, st, step, offsets, duration, exact):
+        """Enregistre l'index de positionnement d'un fichier"""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                if self._conn is None:
+                    return
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO seek_index VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, st.st_size, st.st_mtime_ns, step, duration, int(exact), offsets)
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Erreur lors de l'écriture dans l'index de la bibliothèque: {e}")
+
+    def get_download(self, video_id):
+        """Retourne le fichier déjà téléchargé pour cette vidéo, s'il existe encore"""
+        if self._conn is None:
+            return None
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT path FROM downloads WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        if row is None or not os.path.exists(row[0]):
+            return None
+        return row[0]
+
+    def store_download(self, video_id, path):
+        """Associe une vidéo au fichier téléchargé"""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                if self._conn is None:
+                    return
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO downloads VALUES (?, ?)", (video_id, path)
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Erreur lors de l'écriture dans l'index de la bibliothèque: {e}")
+
+    @staticmethod
+    def _probe(path):
+        """Lit les en-têtes du fichier avec mutagen (format détecté automatiquement)"""
+        # Importé ici : mutagen n'est pas nécessaire pour afficher la fenêtre
+        import mutagen
+        try:
+            audio = mutagen.File(path, easy=True)
+        except Exception:
+            return None
+        if audio is None:
+            return None
+
+        tags = {}
+        if audio.tags:
+            for key in ('title', 'artist', 'album', 'tracknumber'):
+                if key in audio.tags:
+                    tags[key] = audio.tags[key][0]
+        return {
+            'duration': audio.info.length,
+            'bitrate': getattr(audio.info, 'bitrate', 0) or 0,
+            'tags': tags
+        }
+
+    def close(self):
+        """Ferme la base"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Stockage des musiques likées
+Ensemble en mémoire, journal d'opérations en ajout seul et compaction en arrière-plan
+"""
+
+import os
+import json
+import threading
+
+
+class LikedSongsStore:
+    """Ensemble ordonné des musiques likées, persistant à chaque modification
+
+    L'état est l'instantané JSON (liste de chemins) auquel on rejoue le journal :
+    chaque like/délike y est ajouté immédiatement, puis le journal est fusionné
+    dans l'instantané quand il devient trop long.
+    """
+
+    def __init__(self, snapshot_file, compact_threshold=200):
+        self.snapshot_file = snapshot_file
+        self.journal_file = os.path.splitext(snapshot_file)[0] + ".journal"
+        self.compact_threshold = compact_threshold
+
+        self._songs = {}
+        self._lock = threading.Lock()
+        self._journal = None
+        self._journal_entries = 0
+        self._compacting = False
+        # Vrai si la dernière ligne du journal a été tronquée (pas de saut de ligne final)
+        self._torn_tail = False
+
+        self._load()
+
+    # ===== Lecture =====
+
+    def __contains__(self, song_path):
+        return song_path in self._songs
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._songs))
+
+    def __len__(self):
+        return len(self._songs)
+
+    def _load(self):
+        """Charge l'instantané puis rejoue le journal"""
+        try:
+            if os.path.exists(self.snapshot_file):
+                with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                    self._songs = dict.fromkeys(json.load(f))
+        except (json.JSONDecodeError, OSError, TypeError) as e:
+            print(f"Erreur lors du chargement des musiques likées: {e}")
+            self._songs = {}
+
+        try:
+            if os.path.exists(self.journal_file):
+                with open(self.journal_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        self._replay(line)
+                        self._journal_entries += 1
+                        self._torn_tail = not line.endswith("\n")
+        except OSError as e:
+            print(f"Erreur lors de la lecture du journal des musiques likées: {e}")
+
+    def _replay(self, line):
+        """Applique une ligne du journal ('+' ou '-' suivi du chemin en JSON)"""
+        try:
+            op, song_path = line[0], json.loads(line[1:])
+        except (IndexError, json.JSONDecodeError):
+            # Ligne tronquée par un arrêt brutal : on l'ignore
+            return
+        if op == '+':
+            self._songs[song_path] = None
+        elif op == '-':
+            self._songs.pop(song_path, None)
+
+    # ===== Modification =====
+
+    def toggle(self, song_path):
+        """Like ou délike une musique, retourne True si elle est désormais likée"""
+        with self._lock:
+            if song_path in self._songs:
+                del self._songs[song_path]
+                liked = False
+            else:
+                self._songs[song_path] = None
+                liked = True
+            self._append('+' if liked else '-', song_path)
+
+            if self._journal_entries >= self.compact_threshold and not self._compacting:
+                self._compacting = True
+                threading.Thread(target=self.compact, daemon=True).start()
+        return liked
+
+    def _append(self, op, song_path):
+        """Ajoute une opération au journal et la force sur le disque"""
+        try:
+            if self._journal is None:
+                os.makedirs(os.path.dirname(self.journal_file), exist_ok=True)
+                self._journal = open(self.journal_file, 'a', encoding='utf-8')
+            entry = op + json.dumps(song_path, ensure_ascii=False) + "\n"
+            if self._torn_tail:
+                entry = "\n" + entry
+                self._torn_tail = False
+            self._journal.write(entry)
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal_entries += 1
+        except OSError as e:
+            print(f"Erreur lors de la sauvegarde des musiques likées: {e}")
+
+    def compact(self):
+        """Réécrit l'instantané puis vide le journal"""
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.snapshot_file), exist_ok=True)
+                tmp_file = self.snapshot_file + ".tmp"
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(list(self._songs), f, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_file, self.snapshot_file)
+
+                # Le journal n'est vidé qu'une fois l'instantané en place
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                with open(self.journal_file, 'w', encoding='utf-8'):
+                    pass
+                self._journal_entries = 0
+                self._torn_tail = False
+            except OSError as e:
+                print(f"Erreur lors de la compaction des musiques likées: {e}")
+            finally:
+                self._compacting = False
+
+    def close(self):
+        """Fusionne le journal si nécessaire et ferme les fichiers"""
+        if self._journal_entries:
+            self.compact()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
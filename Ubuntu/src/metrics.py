@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Métriques du Lecteur Musical
+Histogrammes de durées et compteurs, exportés au format texte Prometheus (fichier ou point d'accès local)
+"""
+
+import os
+import time
+import bisect
+import threading
+
+
+# Variables d'environnement : "1" pour le fichier par défaut, ou chemin du fichier ; port du point d'accès HTTP
+METRICS_ENV = 'MP3_PLAYER_METRICS'
+METRICS_PORT_ENV = 'MP3_PLAYER_METRICS_PORT'
+
+DEFAULT_METRICS_FILE = os.path.expanduser("~/.cache/mp3_player/metrics.prom")
+
+# Intervalle d'écriture du fichier (secondes)
+EXPORT_INTERVAL = 15.0
+
+# Bornes des histogrammes (secondes) : de la demi-milliseconde aux phases de téléchargement
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class Histogram:
+    """Répartition de durées par tranches cumulables (comme un histogramme Prometheus)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self):
+        """Gestionnaire de contexte qui enregistre la durée du bloc"""
+        return _Timer(self)
+
+    def snapshot(self):
+        """Retourne (effectifs cumulés par borne, +Inf compris), la somme et le nombre de mesures"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative, running = [], 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total, running
+
+
+class _Timer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Counter:
+    """Compteur croissant"""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self):
+        return self._value
+
+
+class PhaseTimer:
+    """Chronomètre des phases successives d'une opération
+
+    start(phase) clôt la phase précédente et enregistre sa durée dans
+    l'histogramme de même nom avec l'étiquette phase. Une phase interrompue
+    par une exception n'est pas enregistrée.
+    """
+
+    def __init__(self, registry, name, help_text):
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.phase = None
+        self._start = 0.0
+
+    def start(self, phase):
+        self.stop()
+        self.phase = phase
+        self._start = time.perf_counter()
+
+    def stop(self):
+        """Clôt la phase en cours"""
+        if self.phase is not None:
+            histogram = self.registry.histogram(self.name, self.help_text, phase=self.phase)
+            histogram.observe(time.perf_counter() - self._start)
+            self.phase = None
+
+
+class MetricsRegistry:
+    """Ensemble des métriques du processus, regroupées par nom puis par étiquettes"""
+
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS, **labels):
+        return self._get(name, 'histogram', help_text, labels, lambda: Histogram(buckets))
+
+    def counter(self, name, help_text, **labels):
+        return self._get(name, 'counter', help_text, labels, Counter)
+
+    def phases(self, name, help_text):
+        return PhaseTimer(self, name, help_text)
+
+    def _get(self, name, kind, help_text, labels, factory):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._families.setdefault(name, (kind, help_text, {}))
+            metrics = family[2]
+            if key not in metrics:
+                metrics[key] = factory()
+            return metrics[key]
+
+    def render(self):
+        """Texte au format d'exposition Prometheus"""
+        with self._lock:
+            families = [(name, kind, help_text, list(metrics.items()))
+                        for name, (kind, help_text, metrics) in sorted(self._families.items())]
+
+        lines = []
+        for name, kind, help_text, metrics in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, metric in metrics:
+                if kind == 'counter':
+                    lines.append(f"{name}{_labels(key)} {metric.value}")
+                    continue
+                cumulative, total, count = metric.snapshot()
+                bounds = [repr(float(b)) for b in metric.buckets] + ['+Inf']
+                for bound, value in zip(bounds, cumulative):
+                    lines.append(f"{name}_bucket{_labels(key + (('le', bound),))} {value}")
+                lines.append(f"{name}_sum{_labels(key)} {total}")
+                lines.append(f"{name}_count{_labels(key)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key):
+    if not key:
+        return ''
+    pairs = []
+    for name, value in key:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+# ===== Export =====
+
+class MetricsExporter:
+    """Écrit périodiquement les métriques dans un fichier et/ou les sert sur 127.0.0.1"""
+
+    def __init__(self, registry, metrics_file=None, port=None, interval=EXPORT_INTERVAL):
+        self.registry = registry
+        self.metrics_file = metrics_file
+        self.port = port
+        self.interval = interval
+        self._stop = threading.Event()
+        self._server = None
+
+    def start(self):
+        if self.metrics_file:
+            thread = threading.Thread(target=self._write_periodically, daemon=True)
+            thread.start()
+        if self.port:
+            self._start_server()
+
+    def stop(self):
+        """Arrête l'export, après une dernière écriture du fichier"""
+        self._stop.set()
+        if self.metrics_file:
+            self.write()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def write(self):
+        """Écrit le fichier de façon atomique (fichier temporaire puis renommage)"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.metrics_file)), exist_ok=True)
+            tmp_file = self.metrics_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(self.registry.render())
+            os.replace(tmp_file, self.metrics_file)
+        except OSError as e:
+            print(f"Erreur lors de l'écriture des métriques: {e}")
+
+    def _write_periodically(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def _start_server(self):
+        # Importé ici : le serveur n'est utile que si le port est configuré
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        except OSError as e:
+            print(f"Erreur lors de l'ouverture du point d'accès des métriques: {e}")
+            return
+        self._server.daemon_threads = True
+        thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        thread.start()
+
+
+def start_exporter(registry=None):
+    """Démarre l'export configuré par les variables d'environnement (None s'il est désactivé)"""
+    setting = os.environ.get(METRICS_ENV, '')
+    metrics_file = None
+    if setting and setting != '0':
+        metrics_file = DEFAULT_METRICS_FILE if setting == '1' else setting
+    try:
+        port = int(os.environ.get(METRICS_PORT_ENV, '0'))
+    except ValueError:
+        print(f"Avertissement : {METRICS_PORT_ENV} doit être un numéro de port")
+        port = 0
+    if not metrics_file and not port:
+        return None
+
+    exporter = MetricsExporter(registry or metrics, metrics_file, port)
+    exporter.start()
+    return exporter
+
+
+# Métriques du processus, enregistrées en permanence (coût d'une mesure : quelques microsecondes)
+metrics = MetricsRegistry()
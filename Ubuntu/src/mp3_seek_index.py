@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Index de positionnement des fichiers MP3
+Table compacte temps -> octet construite une seule fois par fichier (table Xing/VBRI ou parcours des trames)
+"""
+
+import os
+import mmap
+import struct
+from array import array
+
+
+# Débits (kbit/s) de la couche III, pour MPEG-1 et pour MPEG-2/2.5
+BITRATES_MPEG1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0)
+BITRATES_MPEG2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0)
+
+# Fréquences d'échantillonnage selon le champ version de l'en-tête
+SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),   # MPEG-2.5
+}
+
+# Taille maximale d'un fichier indexable (décalages stockés sur 32 bits)
+MAX_FILE_SIZE = 0xFFFFFFFF
+
+
+class SeekIndex:
+    """Table de décalages : offsets[i] est l'octet de la trame jouée à i * step secondes
+
+    exact vaut False quand la table provient d'un sommaire Xing (positions
+    approximatives, à recaler sur la trame suivante).
+    """
+
+    def __init__(self, step, offsets, duration, exact=True):
+        self.step = step
+        self.offsets = offsets
+        self.duration = duration
+        self.exact = exact
+
+    def lookup(self, seconds):
+        """Retourne (octet, temps réel de ce point) pour la position demandée"""
+        if not self.offsets:
+            return 0, 0.0
+        i = int(seconds / self.step) if self.step > 0 else 0
+        i = max(0, min(i, len(self.offsets) - 1))
+        return self.offsets[i], i * self.step
+
+    def to_blob(self):
+        """Sérialise les décalages sous forme binaire compacte"""
+        return self.offsets.tobytes()
+
+    @classmethod
+    def from_blob(cls, step, blob, duration, exact):
+        offsets = array('I')
+        offsets.frombytes(blob)
+        return cls(step, offsets, duration, exact)
+
+
+# ===== Analyse des en-têtes =====
+
+def parse_frame_header(data, pos):
+    """Décode l'en-tête de trame à la position donnée
+
+    Retourne (taille de trame, échantillons par trame, fréquence, mode de canal, version)
+    ou None si ce n'est pas une trame MPEG couche III valide.
+    """
+    if pos + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[pos], data[pos + 1], data[pos + 2], data[pos + 3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    if version == 1 or layer != 1:
+        return None
+
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    if bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    padding = (b2 >> 1) & 0x01
+    channel_mode = b3 >> 6
+    sample_rate = SAMPLE_RATES[version][rate_index]
+
+    if version == 3:
+        bitrate = BITRATES_MPEG1[bitrate_index] * 1000
+        samples = 1152
+        frame_length = 144 * bitrate // sample_rate + padding
+    else:
+        bitrate = BITRATES_MPEG2[bitrate_index] * 1000
+        samples = 576
+        frame_length = 72 * bitrate // sample_rate + padding
+
+    return frame_length, samples, sample_rate, channel_mode, version
+
+
+def _skip_id3v2(data):
+    """Retourne la position de la fin de l'étiquette ID3v2 éventuelle"""
+    if len(data) >= 10 and data[:3] == b'ID3':
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def find_frame(data, pos, limit=65536):
+    """Cherche la première trame valide (suivie d'une autre trame valide) à partir de pos"""
+    end = min(len(data), pos + limit)
+    while pos < end:
+        pos = data.find(b'\xFF', pos, end)
+        if pos < 0:
+            return None
+        header = parse_frame_header(data, pos)
+        if header is not None:
+            following = pos + header[0]
+            if following >= len(data) or parse_frame_header(data, following) is not None:
+                return pos
+        pos += 1
+    return None
+
+
+# ===== Construction de l'index =====
+
+def _read_info_frame(data, start, header):
+    """Lit l'en-tête Xing/Info ou VBRI de la première trame
+
+    Retourne (type, informations) ou (None, None).
+    """
+    frame_length, samples, sample_rate, channel_mode, version = header
+    mono = channel_mode == 3
+    if version == 3:
+        xing_pos = start + 4 + (17 if mono else 32)
+    else:
+        xing_pos = start + 4 + (9 if mono else 17)
+
+    tag = bytes(data[xing_pos:xing_pos + 4])
+    if tag in (b'Xing', b'Info'):
+        flags = struct.unpack('>I', data[xing_pos + 4:xing_pos + 8])[0]
+        pos = xing_pos + 8
+        frames = audio_bytes = toc = None
+        if flags & 0x1:
+            frames = struct.unpack('>I', data[pos:pos + 4])[0]
+            pos += 4
+        if flags & 0x2:
+            audio_bytes = struct.unpack('>I', data[pos:pos + 4])[0]
+            pos += 4
+        if flags & 0x4:
+            toc = bytes(data[pos:pos + 100])
+        return 'xing', (frames, audio_bytes, toc)
+
+    vbri_pos = start + 4 + 32
+    if bytes(data[vbri_pos:vbri_pos + 4]) == b'VBRI':
+        (_, _, _, audio_bytes, frames, entries, scale, entry_size,
+         frames_per_entry) = struct.unpack('>HHHIIHHHH', data[vbri_pos + 4:vbri_pos + 26])
+        sizes = []
+        pos = vbri_pos + 26
+        for _ in range(entries):
+            sizes.append(int.from_bytes(data[pos:pos + entry_size], 'big') * scale)
+            pos += entry_size
+        return 'vbri', (frames, frames_per_entry, sizes)
+
+    return None, None
+
+
+def build_seek_index(path):
+    """Construit l'index d'un fichier MP3 (None si le fichier n'est pas exploitable)"""
+    try:
+        size = os.path.getsize(path)
+        if size == 0 or size > MAX_FILE_SIZE:
+            return None
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _build(data)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Erreur lors de l'indexation de {path}: {e}")
+        return None
+
+
+def _build(data):
+    start = find_frame(data, _skip_id3v2(data))
+    if start is None:
+        return None
+    header = parse_frame_header(data, start)
+    samples, sample_rate = header[1], header[2]
+    frame_time = samples / sample_rate
+
+    kind, info = _read_info_frame(data, start, header)
+
+    # Sommaire Xing : 100 points répartis sur la durée, sans lire le reste du fichier
+    if kind == 'xing':
+        frames, audio_bytes, toc = info
+        if frames and toc:
+            audio_bytes = audio_bytes or (len(data) - start)
+            duration = frames * frame_time
+            offsets = array('I', (start + toc[i] * audio_bytes // 256 for i in range(100)))
+            return SeekIndex(duration / 100, offsets, duration, exact=False)
+
+    # Table VBRI : un point toutes les frames_per_entry trames
+    if kind == 'vbri':
+        frames, frames_per_entry, sizes = info
+        if frames and frames_per_entry and sizes:
+            offsets = array('I', [start])
+            for entry_size in sizes[:-1]:
+                offsets.append(offsets[-1] + entry_size)
+            return SeekIndex(frames_per_entry * frame_time, offsets, frames * frame_time)
+
+    # Sinon : parcours complet des trames, un point par seconde environ
+    if kind is not None:
+        start += header[0]
+    every = max(1, round(sample_rate / samples))
+    offsets = array('I')
+    pos = start
+    count = 0
+    size = len(data)
+    while pos < size:
+        header = parse_frame_header(data, pos)
+        if header is None:
+            pos = find_frame(data, pos + 1)
+            if pos is None:
+                break
+            continue
+        if count % every == 0:
+            offsets.append(pos)
+        count += 1
+        pos += header[0]
+
+    return SeekIndex(every * frame_time, offsets, count * frame_time)
+
+
+# ===== Utilisation =====
+
+def load_seek_index(path, library_index):
+    """Retourne l'index d'un fichier depuis le cache, en le construisant au besoin"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    cached = library_index.get_seek_index(path, st)
+    if cached is not None:
+        step, blob, duration, exact = cached
+        return SeekIndex.from_blob(step, blob, duration, exact)
+
+    index = build_seek_index(path)
+    if index is not None:
+        library_index.store_seek_index(path, st, index.step, index.to_blob(), index.duration, index.exact)
+    return index
+
+
+def open_at(path, index, seconds):
+    """Ouvre le fichier positionné sur la trame jouée à la position demandée
+
+    Retourne (fichier ouvert, temps réel de la trame) ou (None, 0) en cas d'échec.
+    """
+    offset, position = index.lookup(seconds)
+    stream = open(path, 'rb')
+    with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if not index.exact:
+            # Les points Xing ne tombent pas sur des débuts de trame : on se recale
+            offset = find_frame(data, offset)
+            if offset is None:
+                stream.close()
+                return None, 0
+
+        # Avancer trame par trame jusqu'à celle qui contient la position demandée
+        header = parse_frame_header(data, offset)
+        while header is not None:
+            frame_time = header[1] / header[2]
+            if position + frame_time > seconds:
+                break
+            following = offset + header[0]
+            header = parse_frame_header(data, following)
+            if header is not None:
+                offset = following
+                position += frame_time
+
+    stream.seek(offset)
+    return stream, position
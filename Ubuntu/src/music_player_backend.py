@@ -4,39 +4,80 @@ Backend du Lecteur Musical
 Gère la lecture audio, la playlist et les téléchargements
 """
 
-import pygame
 import os
 from pathlib import Path
-from mutagen.mp3 import MP3
-import random
-import subprocess
 import threading
+import time
 import re
-import json
+from library_index import LibraryIndex
+from folder_scanner import FolderScanner
+from playlist import Playlist
+from liked_songs import LikedSongsStore
+from playback_clock import PlaybackClock
+from mp3_seek_index import load_seek_index, open_at
+from shuffle import ShuffleEngine
+from download_manager import DownloadManager, FAILED
+from youtube_engine import YoutubeEngine
+from session import SessionStore
+from event_bus import EventBus
+from audio_output import NullOutput, AudioOutputError, output_from_env
+from metrics import metrics
+from profiling import profiler
+from waveform import WaveformCache
+
+
+# ===== Métriques =====
+
+load_song_seconds = metrics.histogram(
+    'mp3_player_load_song_seconds', "Durée de load_song, notifications du frontend comprises")
+load_output_seconds = metrics.histogram(
+    'mp3_player_load_song_phase_seconds', "Durée des étapes de load_song", phase='load')
+load_probe_seconds = metrics.histogram(
+    'mp3_player_load_song_phase_seconds', "Durée des étapes de load_song", phase='probe')
+seek_seconds = metrics.histogram('mp3_player_seek_seconds', "Durée d'un déplacement dans le morceau")
+pip_spawns = metrics.counter(
+    'mp3_player_subprocess_spawns_total', "Processus lancés, par commande", command='pip')
 
 
 class MusicPlayerBackend:
     """Gère toute la logique  du lecteur musical"""
     
-    def __init__(self):
-        # Initialiser pygame mixer
-        pygame.mixer.init()
+    def __init__(self, max_downloads=2, output=None):
+        # Sortie audio : mixer pygame par défaut (ou MP3_PLAYER_AUDIO_OUTPUT), ouvert au premier morceau chargé
+        self.output = output or output_from_env()
+        self.output.on_end = self._post_music_end
         
         # Variables d'état
-        self.playlist = []
+        self.playlist = Playlist()
+        self.playlist.on_change = self._on_playlist_changed
         self.current_index = 0
         self.is_playing = False
         self.is_paused = False
         self.song_length = 0
-        self.pause_position = 0
+        self.clock = PlaybackClock(self.output.clock)
+        
+        # Index de positionnement du morceau chargé (chemin, SeekIndex) et flux ouvert par seek()
+        self._seek_index = None
+        self._seek_stream = None
         self.shuffle_mode = False
+        self.shuffle = ShuffleEngine()
+        
+        # Lecture sans blanc : morceau suivant déjà placé dans la file du mixer
+        self.gapless = True
+        self._queued_path = None
         self.download_folder = os.path.expanduser("~/Musique")
         os.makedirs(self.download_folder, exist_ok=True)
         
-        # Gestion des musiques likées
-        self.liked_songs = []
+        # Index persistant des métadonnées (durée, débit, tags)
+        self.library_index = LibraryIndex()
+        self.folder_scanner = FolderScanner(self.library_index)
+        if isinstance(self.output, NullOutput) and self.output.get_duration is None:
+            # La sortie muette simule la durée réelle des morceaux
+            self.output.get_duration = self.library_index.get_duration
+        
+        # Gestion des musiques likées (chargées au premier accès)
         self.liked_songs_file = os.path.expanduser("~/.cache/mp3_player/liked_list.json")
-        self._load_liked_songs()
+        self._liked_songs = None
         
         # Callbacks pour notifier le frontend
         self.on_song_changed = None
@@ -44,43 +85,95 @@ class MusicPlayerBackend:
         self.on_playlist_updated = None
         self.on_download_progress = None
         self.on_error = None
+        self.on_scan_finished = None
+        self.on_playlist_changed = None
+        self.on_download_updated = None
+        self.on_waveform_ready = None
+        
+        # File des appels venant des threads d'arrière-plan, exécutés dans le thread du frontend
+        self.events = EventBus()
+        
+        # Téléchargement YouTube (API yt_dlp, ou commande yt-dlp à défaut)
+        self.youtube = YoutubeEngine()
+        
+        # File de téléchargement (démarrée par resume_downloads ou au premier ajout)
+        self.download_manager = DownloadManager(profiler.wrap(self._run_download), max_workers=max_downloads)
+        self.download_manager.on_job_updated = self._on_download_job_updated
+        
+        # Formes d'onde calculées dans un processus séparé, une fois par fichier
+        self.waveforms = WaveformCache()
+        
+        # Session sauvegardée à chaque changement (écritures regroupées)
+        self.session = SessionStore(self._session_state)
+    
+    @property
+    def liked_songs(self):
+        """Musiques likées, lues sur le disque au premier accès"""
+        if self._liked_songs is None:
+            self._liked_songs = LikedSongsStore(self.liked_songs_file)
+        return self._liked_songs
+    
+    def _post_playlist_updated(self):
+        """Demande un rafraîchissement de la playlist (un seul pour une rafale d'ajouts)"""
+        self.events.post(self._report_playlist_updated, key='playlist_updated')
+    
+    def _report_playlist_updated(self):
+        if self.on_playlist_updated:
+            self.on_playlist_updated(self.playlist)
     
     # ===== Gestion de la playlist =====
     
     def add_folder(self, folder_path):
-        """Ajoute tous les MP3 d'un dossier à la playlist"""
+        """Ajoute tous les fichiers audio d'un dossier (et de ses sous-dossiers) à la playlist
+
+        Le parcours a lieu en arrière-plan : les fichiers arrivent par lots
+        et on_scan_finished est appelé à la fin.
+        """
         if not folder_path or not os.path.exists(folder_path):
             return False, "Dossier invalide"
         
-        mp3_files = []
-        for file in sorted(os.listdir(folder_path)):
-            if file.lower().endswith('.mp3'):
-                full_path = os.path.join(folder_path, file)
-                if full_path not in self.playlist:
-                    mp3_files.append(full_path)
+        scan = {'added': 0}
         
-        if mp3_files:
-            self.playlist.extend(mp3_files)
-            if self.on_playlist_updated:
-                self.on_playlist_updated(self.playlist)
-            
-            if len(self.playlist) == len(mp3_files):
-                self.current_index = 0
-                self.load_song(self.current_index, autoplay=False)
-            
-            return True, f"{len(mp3_files)} fichiers ajoutés"
+        def on_batch(files):
+            self.events.post(self._add_scanned_files, files, scan)
+        
+        def on_done(files):
+            self.events.post(self._on_scan_done, scan)
+            self.library_index.probe_many(files)
+        
+        self.folder_scanner.scan(folder_path, on_batch, on_done)
+        return True, "Analyse du dossier en cours..."
+    
+    def _add_scanned_files(self, files, scan):
+        """Ajoute un lot de fichiers trouvés par le scanner"""
+        new_files = self.playlist.extend(files)
+        if not new_files:
+            return
+        
+        scan['added'] += len(new_files)
+        self._post_playlist_updated()
         
-        return False, "Aucun fichier MP3 nouveau trouvé"
+        if len(self.playlist) == len(new_files):
+            self.current_index = 0
+            self.load_song(self.current_index, autoplay=False)
+    
+    def _on_scan_done(self, scan):
+        """Notifie la fin du parcours d'un dossier"""
+        if self.on_scan_finished:
+            if scan['added']:
+                self.on_scan_finished(True, f"{scan['added']} fichiers ajoutés")
+            else:
+                self.on_scan_finished(False, "Aucun fichier audio nouveau trouvé")
     
     def add_files(self, file_paths):
-        """Ajoute des fichiers MP3 spécifiques à la playlist"""
+        """Ajoute des fichiers audio spécifiques à la playlist"""
         if not file_paths:
             return False, "Aucun fichier sélectionné"
         
-        new_files = [f for f in file_paths if f not in self.playlist]
+        new_files = self.playlist.extend(file_paths)
         
         if new_files:
-            self.playlist.extend(new_files)
+            self._warm_library_index(new_files)
             if self.on_playlist_updated:
                 self.on_playlist_updated(self.playlist)
             
@@ -92,15 +185,136 @@ class MusicPlayerBackend:
         
         return False, "Tous les fichiers sont déjà dans la playlist"
     
+    def remove_song(self, index):
+        """Retire une chanson de la playlist"""
+        if not (0 <= index < len(self.playlist)):
+            return False
+        
+        was_current = index == self.current_index
+        self.playlist.remove_at(index)
+        
+        if index < self.current_index:
+            self.current_index -= 1
+        elif was_current:
+            if not self.playlist:
+                self.clear_playlist()
+                return True
+            self.current_index = min(index, len(self.playlist) - 1)
+            self.load_song(self.current_index, autoplay=self.is_playing and not self.is_paused)
+        
+        self._queue_next()
+        if self.on_playlist_updated:
+            self.on_playlist_updated(self.playlist)
+        return True
+    
+    def move_song(self, source, destination):
+        """Déplace une chanson dans la playlist"""
+        try:
+            self.playlist.move(source, destination)
+        except IndexError:
+            return False
+        
+        # Suivre la chanson en cours
+        if source == self.current_index:
+            self.current_index = destination
+        elif source < self.current_index <= destination:
+            self.current_index -= 1
+        elif destination <= self.current_index < source:
+            self.current_index += 1
+        
+        self._queue_next()
+        if self.on_playlist_updated:
+            self.on_playlist_updated(self.playlist)
+        return True
+    
+    def _on_playlist_changed(self, action, *args):
+        """Relaie au frontend les modifications détaillées de la playlist"""
+        if self.on_playlist_changed:
+            self.on_playlist_changed(action, *args)
+        
+        # Un ajout en fin de playlist rejoint le cycle aléatoire en cours ; sinon les index changent
+        if action == 'insert' and args[0] + args[1] == len(self.playlist):
+            self.shuffle.resize(len(self.playlist))
+        else:
+            self.shuffle.reset(len(self.playlist))
+        
+        if action == 'insert':
+            self._queue_next()
+        self.session.schedule_save()
+    
+    # ===== Session =====
+    
+    def _session_state(self):
+        """État sauvegardé entre deux lancements"""
+        return {
+            'playlist': self.playlist.to_list(),
+            'current_index': self.current_index,
+            'position': self.get_current_position(),
+            'shuffle_mode': self.shuffle_mode,
+            'shuffle': self.shuffle.state(),
+            'gapless': self.gapless,
+        }
+    
+    def restore_session(self):
+        """Recharge la playlist et la position de la session précédente
+
+        Les fichiers ne sont pas vérifiés un par un : un fichier disparu
+        est signalé quand on essaie de le lire.
+        """
+        state = self.session.load()
+        if not state or not state.get('playlist'):
+            return False
+        
+        self.playlist.extend(state['playlist'])
+        self.shuffle_mode = state.get('shuffle_mode', False)
+        self.gapless = state.get('gapless', True)
+        
+        index = state.get('current_index', 0)
+        if not (isinstance(index, int) and 0 <= index < len(self.playlist)
+                and os.path.exists(self.playlist[index])):
+            index = 0
+        self.current_index = index
+        
+        try:
+            if state['shuffle']['size'] == len(self.playlist):
+                self.shuffle.restore(state['shuffle'])
+            else:
+                self.shuffle.reset(len(self.playlist), index)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Erreur lors de la restauration du mode aléatoire: {e}")
+            self.shuffle.reset(len(self.playlist), index)
+        
+        if self.on_playlist_updated:
+            self.on_playlist_updated(self.playlist)
+        
+        success, _ = self.load_song(index, autoplay=False)
+        
+        # Reprendre à la position sauvegardée, en pause
+        position = state.get('position', 0)
+        if success and position > 0:
+            self.seek(position)
+        return True
+    
+    def _warm_library_index(self, file_paths):
+        """Analyse en arrière-plan les fichiers absents de l'index"""
+        thread = threading.Thread(
+            target=profiler.wrap(self.library_index.probe_many),
+            args=(list(file_paths),),
+            daemon=True
+        )
+        thread.start()
+    
     def clear_playlist(self):
         """Vide complètement la playlist"""
-        pygame.mixer.music.stop()
-        self.playlist = []
+        if self.output.ready:
+            self.output.stop()
+        self._queued_path = None
+        self.playlist.clear()
         self.current_index = 0
         self.is_playing = False
         self.is_paused = False
         self.song_length = 0
-        self.pause_position = 0
+        self.clock.stop()
         
         if self.on_playlist_updated:
             self.on_playlist_updated(self.playlist)
@@ -109,16 +323,6 @@ class MusicPlayerBackend:
         if self.on_playback_state_changed:
             self.on_playback_state_changed(False, False)
     
-    def _load_liked_songs(self):
-        """Charge la liste des musiques likées depuis le fichier JSON"""
-        try:
-            if os.path.exists(self.liked_songs_file):
-                with open(self.liked_songs_file, 'r', encoding='utf-8') as f:
-                    self.liked_songs = json.load(f)
-        except Exception as e:
-            print(f"Erreur lors du chargement des musiques likées: {e}")
-            self.liked_songs = []
-    
     def load_liked_songs(self):
         """Charge les musiques likées dans la playlist (depuis la liste en mémoire)"""
         if not self.liked_songs:
@@ -128,13 +332,12 @@ class MusicPlayerBackend:
         existing_files = [f for f in self.liked_songs if os.path.exists(f)]
         
         if not existing_files:
-            return False, "Aucun fichier MP3 liké n'existe plus sur le disque"
+            return False, "Aucun fichier liké n'existe plus sur le disque"
         
         # Ajouter uniquement les fichiers qui ne sont pas déjà dans la playlist
-        new_files = [f for f in existing_files if f not in self.playlist]
+        new_files = self.playlist.extend(existing_files)
         
         if new_files:
-            self.playlist.extend(new_files)
             if self.on_playlist_updated:
                 self.on_playlist_updated(self.playlist)
             
@@ -146,16 +349,6 @@ class MusicPlayerBackend:
         
         return False, "Toutes les musiques likées sont déjà dans la playlist"
     
-    def _save_liked_songs(self):
-        """Sauvegarde la liste des musiques likées dans le fichier JSON"""
-        try:
-            # Créer le répertoire si nécessaire
-            os.makedirs(os.path.dirname(self.liked_songs_file), exist_ok=True)
-            with open(self.liked_songs_file, 'w', encoding='utf-8') as f:
-                json.dump(self.liked_songs, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Erreur lors de la sauvegarde des musiques likées: {e}")
-    
     # ===== Gestion de la lecture =====
     
     def load_song(self, index, autoplay=False):
@@ -163,24 +356,29 @@ class MusicPlayerBackend:
         if not (0 <= index < len(self.playlist)):
             return False, "Index invalide"
         
+        start = time.perf_counter()
         try:
-            pygame.mixer.music.load(self.playlist[index])
+            self.output.open()
+            with load_output_seconds.time():
+                self.output.load(self.playlist[index])
+            # load() vide la file d'attente du mixer
+            self._queued_path = None
+            self._close_seek_stream()
+            self._prepare_seek_index(self.playlist[index])
             filename = os.path.basename(self.playlist[index])
             
-            # Obtenir la durée
-            try:
-                audio = MP3(self.playlist[index])
-                self.song_length = audio.info.length
-            except:
-                self.song_length = 0
-            
-            self.pause_position = 0
+            # Obtenir la durée (depuis l'index si le fichier n'a pas changé)
+            with load_probe_seconds.time():
+                self.song_length = self.library_index.get_duration(self.playlist[index])
             
             if autoplay:
-                pygame.mixer.music.play()
+                self.output.play()
+                self.clock.start(0)
                 self.is_playing = True
                 self.is_paused = False
+                self._queue_next()
             else:
+                self.clock.stop()
                 self.is_playing = False
                 self.is_paused = False
             
@@ -190,6 +388,8 @@ class MusicPlayerBackend:
             if self.on_playback_state_changed:
                 self.on_playback_state_changed(self.is_playing, self.is_paused)
             
+            self.session.schedule_save()
+            load_song_seconds.observe(time.perf_counter() - start)
             return True, filename
             
         except Exception as e:
@@ -204,20 +404,24 @@ class MusicPlayerBackend:
                 self.on_error("Chargez d'abord une playlist!")
             return False
         
+        self.output.open()
         if self.is_playing:
             if self.is_paused:
-                pygame.mixer.music.unpause()
+                self.output.unpause()
+                self.clock.resume()
                 self.is_paused = False
             else:
-                self.pause_position = self.get_current_position()
-                pygame.mixer.music.pause()
+                self.output.pause()
+                self.clock.pause()
                 self.is_paused = True
         else:
-            pygame.mixer.music.play()
+            self.output.play()
+            self.clock.start(0)
             self.is_playing = True
             self.is_paused = False
-            self.pause_position = 0
+            self._queue_next()
         
+        self.session.schedule_save()
         if self.on_playback_state_changed:
             self.on_playback_state_changed(self.is_playing, self.is_paused)
         
@@ -226,13 +430,16 @@ class MusicPlayerBackend:
     def next_song(self):
         """Passe à la chanson suivante"""
         if self.playlist:
-            self.current_index = self.get_next_song_index()
+            self.current_index = self._advance_index()
             self.load_song(self.current_index, autoplay=self.is_playing)
     
     def previous_song(self):
-        """Retourne à la chanson précédente"""
+        """Retourne à la chanson précédente (dans l'ordre de lecture en mode aléatoire)"""
         if self.playlist:
-            self.current_index = (self.current_index - 1) % len(self.playlist)
+            index = self.shuffle.previous(self.current_index) if self.shuffle_mode else None
+            if index is None:
+                index = (self.current_index - 1) % len(self.playlist)
+            self.current_index = index
             self.load_song(self.current_index, autoplay=self.is_playing)
     
     def play_at_index(self, index):
@@ -244,56 +451,203 @@ class MusicPlayerBackend:
     def seek(self, position_seconds):
         """Se déplace à une position spécifique dans la chanson"""
         if self.song_length > 0 and 0 <= position_seconds <= self.song_length:
+            start_time = time.perf_counter()
             was_playing = self.is_playing and not self.is_paused
-            pygame.mixer.music.stop()
-            pygame.mixer.music.load(self.playlist[self.current_index])
-            pygame.mixer.music.play(start=position_seconds)
+            path = self.playlist[self.current_index]
+            previous_stream = self._seek_stream
+            
+            # load() arrête la lecture sans poster d'événement de fin, contrairement à stop()
+            stream, start = self._open_seek_stream(path, position_seconds)
+            if stream is not None:
+                # Lecture directe depuis la trame visée, sans que le décodeur parcoure le début du fichier
+                self.output.load(stream, 'mp3')
+                self.output.play()
+            else:
+                self.output.load(path)
+                self.output.play(start=position_seconds)
+                start = position_seconds
+            self._queued_path = None
+            self._seek_stream = stream
+            if previous_stream is not None:
+                previous_stream.close()
             
+            self.clock.start(start)
             self.is_playing = True
-            self.pause_position = position_seconds
             
             if not was_playing:
-                pygame.mixer.music.pause()
+                self.output.pause()
+                self.clock.pause()
                 self.is_paused = True
             else:
                 self.is_paused = False
             
+            self._queue_next()
+            self.session.schedule_save()
+            seek_seconds.observe(time.perf_counter() - start_time)
             return True
         return False
     
+    def _prepare_seek_index(self, path):
+        """Charge ou construit en arrière-plan l'index de positionnement du morceau"""
+        self._seek_index = None
+        if not path.lower().endswith('.mp3'):
+            return
+        
+        def build():
+            index = load_seek_index(path, self.library_index)
+            if index is not None:
+                self._seek_index = (path, index)
+        
+        thread = threading.Thread(target=profiler.wrap(build), daemon=True)
+        thread.start()
+    
+    def _open_seek_stream(self, path, position_seconds):
+        """Ouvre le fichier sur la trame correspondant à la position, si l'index est prêt"""
+        seek_index = self._seek_index
+        if seek_index is None or seek_index[0] != path:
+            return None, 0
+        try:
+            return open_at(path, seek_index[1], position_seconds)
+        except OSError as e:
+            print(f"Erreur lors du positionnement dans {path}: {e}")
+            return None, 0
+    
+    def _close_seek_stream(self):
+        """Ferme le flux ouvert par le dernier seek (après un nouveau load())"""
+        if self._seek_stream is not None:
+            self._seek_stream.close()
+            self._seek_stream = None
+    
     # ===== Mode shuffle =====
     
     def toggle_shuffle(self):
         """Active/désactive le mode aléatoire"""
         self.shuffle_mode = not self.shuffle_mode
+        if self.shuffle_mode:
+            self.shuffle.reset(len(self.playlist), self.current_index)
+        self._queue_next()
+        self.session.schedule_save()
         return self.shuffle_mode
     
     def get_next_song_index(self):
         """Obtient l'index de la prochaine chanson (avec shuffle si activé)"""
         if self.shuffle_mode:
             if len(self.playlist) > 1:
-                possible_indices = [i for i in range(len(self.playlist)) if i != self.current_index]
-                return random.choice(possible_indices)
+                return self.shuffle.peek(self.current_index)
             return 0
         else:
             return (self.current_index + 1) % len(self.playlist)
     
+    def _advance_index(self):
+        """Comme get_next_song_index, mais enregistre le tirage aléatoire comme joué"""
+        if self.shuffle_mode and len(self.playlist) > 1:
+            return self.shuffle.next(self.current_index)
+        return self.get_next_song_index()
+    
     # ===== Informations sur la lecture =====
     
     def get_current_position(self):
         """Obtient la position actuelle dans la chanson (en secondes)"""
-        if self.is_playing:
-            if self.is_paused:
-                return self.pause_position
-            else:
-                pos_ms = pygame.mixer.music.get_pos()
-                if pos_ms >= 0:
-                    return self.pause_position + (pos_ms / 1000.0)
-        return 0
+        if not self.is_playing:
+            return 0
+        position = self.clock.position()
+        if self.song_length:
+            position = min(position, self.song_length)
+        return position
+    
+    def _post_music_end(self):
+        """Fin de morceau signalée par la sortie audio (depuis son thread)"""
+        self.events.post(self._on_music_end)
+    
+    def _on_music_end(self):
+        """Passe au morceau suivant quand la sortie signale la fin du morceau en cours"""
+        if self._queued_path is not None and self.output.get_busy():
+            # Le mixer a déjà enchaîné sur le morceau en file d'attente
+            self._advance_to_queued()
+        # stop() poste aussi l'événement : on vérifie que la lecture est réellement finie
+        elif self.is_song_finished():
+            self.next_song()
+    
+    # ===== Lecture sans blanc =====
+    
+    def toggle_gapless(self):
+        """Active/désactive la lecture sans blanc"""
+        self.gapless = not self.gapless
+        if self.gapless:
+            self._queue_next()
+        return self.gapless
+    
+    def _queue_next(self):
+        """Place le morceau suivant dans la file d'attente de la sortie audio"""
+        # Sans événement de fin, l'enchaînement par le mixer passerait inaperçu (get_busy resterait vrai)
+        if not (self.output.ready and self.output.signals_end and self.gapless
+                and self.is_playing and len(self.playlist) > 1):
+            return
+        
+        next_path = self.playlist[self.get_next_song_index()]
+        if next_path == self._queued_path:
+            return
+        
+        try:
+            self.output.queue(next_path)
+        except AudioOutputError as e:
+            print(f"Erreur lors de la préparation du morceau suivant: {e}")
+            return
+        self._queued_path = next_path
+        
+        # Pré-analyser le morceau pour que la transition n'attende pas mutagen
+        thread = threading.Thread(target=profiler.wrap(self.library_index.lookup), args=(next_path,), daemon=True)
+        thread.start()
+        if self.on_waveform_ready:
+            # Forme d'onde prête avant l'enchaînement
+            self.waveforms.request(next_path)
+    
+    def _advance_to_queued(self):
+        """Met à jour l'état après l'enchaînement automatique sur le morceau en file"""
+        path = self._queued_path
+        self._queued_path = None
+        if path not in self.playlist:
+            # Le morceau a été retiré de la playlist entre-temps
+            self.next_song()
+            return
+        
+        # L'événement arrive un peu après l'enchaînement réel : on reporte le dépassement
+        overflow = self.clock.position() - self.song_length if self.song_length else 0
+        self.clock.start(max(0.0, min(overflow, 1.0)))
+        
+        self._advance_index()
+        self.current_index = self.playlist.index(path)
+        self.song_length = self.library_index.get_duration(path)
+        # Le flux du dernier seek appartenait au morceau précédent ; l'index du nouveau est préparé
+        self._close_seek_stream()
+        self._prepare_seek_index(path)
+        
+        if self.on_song_changed:
+            self.on_song_changed(os.path.basename(path), self.song_length, self.current_index)
+        
+        self._queue_next()
+        self.session.schedule_save()
+    
+    def request_waveform(self, path):
+        """Demande la forme d'onde d'un fichier ; elle arrive par on_waveform_ready(chemin, pics)"""
+        self.waveforms.request(
+            path, lambda path, peaks: self.events.post(self._report_waveform, path, peaks, key='waveform')
+        )
+    
+    def _report_waveform(self, path, peaks):
+        if self.on_waveform_ready:
+            self.on_waveform_ready(path, peaks)
     
     def is_song_finished(self):
         """Vérifie si la chanson actuelle est terminée"""
-        return not pygame.mixer.music.get_busy() and self.is_playing and not self.is_paused
+        if not self.output.ready:
+            return False
+        return not self.output.get_busy() and self.is_playing and not self.is_paused
+    
+    def check_song_end(self):
+        """Passe au morceau suivant si la sortie, sans événement de fin, a fini le morceau (appelé à chaque tick)"""
+        if not self.output.signals_end and self.is_song_finished():
+            self.next_song()
     
     def get_playlist_info(self):
         """Retourne les informations de la playlist"""
@@ -317,116 +671,228 @@ class MusicPlayerBackend:
     
     def check_ytdlp_installed(self):
         """Vérifie si yt-dlp est installé"""
-        try:
-            subprocess.run(
-                ['yt-dlp', '--version'],
-                capture_output=True,
-                check=True
-            )
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        return self.youtube.is_available()
     
     def install_ytdlp(self):
         """Installe yt-dlp via pip"""
+        import subprocess
+        
         def install():
             try:
+                pip_spawns.inc()
                 subprocess.run(
                     ['pip', 'install', '--user', 'yt-dlp'],
                     capture_output=True,
                     check=True
                 )
-                if self.on_download_progress:
-                    self.on_download_progress("✓ yt-dlp installé avec succès!")
+                self.events.post(self._report_download_message, "✓ yt-dlp installé avec succès!")
             except subprocess.CalledProcessError as e:
-                if self.on_error:
-                    self.on_error(f"Erreur lors de l'installation: {e}")
+                self.events.post(self._report_error, f"Erreur lors de l'installation: {e}")
         
         thread = threading.Thread(target=install, daemon=True)
         thread.start()
     
+    def set_keep_native_audio(self, enabled):
+        """Active le téléchargement sans conversion (flux audio d'origine)"""
+        self.youtube.keep_native = enabled
+    
     def download_from_youtube(self, url, progress_callback=None):
-        """Télécharge une vidéo YouTube en MP3"""
-        def download():
+        """Ajoute une vidéo, une playlist ou une chaîne YouTube à la file de téléchargement"""
+        # Vérifier l'URL avant de la mettre en file
+        video_id = self._extract_video_id(url)
+        if not video_id:
+            collection_url = self._extract_collection_url(url)
+            if collection_url:
+                self._import_collection(collection_url, progress_callback)
+                return None
+            
+            error_msg = "URL invalide. Seuls les domaines suivants sont autorisés :\n"
+            error_msg += "• youtube.com\n"
+            error_msg += "• music.youtube.com\n"
+            error_msg += "• m.youtube.com\n"
+            error_msg += "• www.youtube.com\n"
+            error_msg += "• youtu.be\n"
+            if self.on_error:
+                self.on_error(error_msg)
+            return None
+        
+        # Vidéo déjà téléchargée : on réutilise le fichier local
+        existing = self.library_index.get_download(video_id)
+        if existing:
+            self._add_downloaded_file(existing)
+            callback = progress_callback or self.on_download_progress
+            if callback:
+                callback(f"✓ Déjà téléchargé: {os.path.basename(existing)}")
+            return None
+        
+        return self.download_manager.submit(url, progress_callback, video_id=video_id)
+    
+    def _import_collection(self, url, progress_callback=None):
+        """Liste les vidéos d'une playlist en arrière-plan puis les met en file"""
+        callback = progress_callback or self.on_download_progress
+        if callback:
+            callback("📃 Récupération de la playlist...")
+        
+        def expand():
             try:
-                if progress_callback:
-                    progress_callback("🔄 Démarrage du téléchargement...")
-                
-                # Extraire l'ID de la vidéo
-                video_id = self._extract_video_id(url)
-                if not video_id:
-                    error_msg = "URL invalide. Seuls les domaines suivants sont autorisés :\n"
-                    error_msg += "• youtube.com\n"
-                    error_msg += "• music.youtube.com\n"
-                    error_msg += "• m.youtube.com\n"
-                    error_msg += "• www.youtube.com\n"
-                    error_msg += "• youtu.be\n"
-                    if self.on_error:
-                        self.on_error(error_msg)
-                    return
-                
-                # Obtenir le titre
-                if progress_callback:
-                    progress_callback("📝 Récupération des informations...")
-                
-                title = self._get_video_title(url)
-                safe_title = self._sanitize_filename(title)
-                output_file = os.path.join(self.download_folder, f"{safe_title}.mp3")
-                
-                if progress_callback:
-                    progress_callback(f"⬇️ Téléchargement de '{safe_title}'...")
-                
-                # Télécharger
-                cmd = [
-                    'yt-dlp',
-                    '-x',
-                    '--audio-format', 'mp3',
-                    '--audio-quality', '0',
-                    '-o', output_file,
-                    url
-                ]
-                
-                process = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    check=True
-                )
-                
-                if os.path.exists(output_file):
-                    if progress_callback:
-                        progress_callback(f"✓ Téléchargé: {safe_title}")
-                    
-                    # Ajouter à la playlist
-                    if output_file not in self.playlist:
-                        self.playlist.append(output_file)
-                        if self.on_playlist_updated:
-                            self.on_playlist_updated(self.playlist)
-                        
-                        if len(self.playlist) == 1:
-                            self.current_index = 0
-                            self.load_song(0, autoplay=False)
-                else:
-                    if self.on_error:
-                        self.on_error("Le fichier téléchargé n'a pas été trouvé")
-                
-            except subprocess.CalledProcessError as e:
-                if self.on_error:
-                    self.on_error(f"Erreur de téléchargement: {e.stderr}")
+                title, entries = self.youtube.extract_entries(url)
             except Exception as e:
-                if self.on_error:
-                    self.on_error(f"Erreur: {str(e)}")
+                self.events.post(self._report_error, str(e))
+                return
+            
+            # Les vidéos déjà présentes sont ajoutées directement, les autres téléchargées
+            existing = []
+            items = []
+            for video_id, video_title in entries:
+                path = self.library_index.get_download(video_id)
+                if path:
+                    existing.append(path)
+                else:
+                    video_url = f"https://www.youtube.com/watch?v={video_id}"
+                    items.append((video_url, video_id, self._sanitize_filename(video_title or "") or None))
+            
+            jobs = self.download_manager.submit_many(items, progress_callback)
+            self.events.post(self._add_downloaded_files, existing)
+            
+            name = f"'{title}'" if title else "la playlist"
+            message = f"📃 {len(entries)} morceaux dans {name} : {len(jobs)} en file, {len(existing)} déjà téléchargés"
+            if callback:
+                self.events.post(callback, message)
         
-        thread = threading.Thread(target=download, daemon=True)
+        thread = threading.Thread(target=profiler.wrap(expand), daemon=True)
         thread.start()
     
+    def _report_download_message(self, message):
+        """Affiche un message de téléchargement"""
+        if self.on_download_progress:
+            self.on_download_progress(message)
+    
+    def _report_error(self, message):
+        """Affiche une erreur survenue en arrière-plan"""
+        if self.on_error:
+            self.on_error(message)
+    
+    def resume_downloads(self):
+        """Démarre la file de téléchargement et reprend les téléchargements interrompus"""
+        self.download_manager.start()
+    
+    def cancel_download(self, job_id):
+        """Annule un téléchargement en attente ou en cours"""
+        return self.download_manager.cancel(job_id)
+    
+    def retry_download(self, job_id):
+        """Relance un téléchargement en erreur ou annulé"""
+        return self.download_manager.retry(job_id)
+    
+    def get_downloads(self):
+        """Retourne la liste des téléchargements connus"""
+        return self.download_manager.jobs()
+    
+    def _run_download(self, job):
+        """Télécharge une vidéo (exécuté par un worker du gestionnaire de téléchargements)"""
+        url = job.url
+        
+        # Téléchargée entre-temps (par exemple avant une reprise)
+        if job.video_id:
+            existing = self.library_index.get_download(job.video_id)
+            if existing:
+                self.events.post(self._add_downloaded_file, existing)
+                return existing
+        
+        phases = metrics.phases('mp3_player_download_phase_seconds', "Durée des étapes d'un téléchargement")
+        
+        # Obtenir les informations (une seule extraction, réutilisée pour le téléchargement)
+        self.download_manager.update(job, "📝 Récupération des informations...")
+        phases.start('extract_info')
+        info = self.youtube.extract_info(url)
+        safe_title = self._sanitize_filename(info.get('title') or "video") or "video"
+        video_id = job.video_id or info.get('id')
+        # L'ID dans le nom évite que deux vidéos de même titre s'écrasent
+        filename = f"{safe_title} [{video_id}]" if video_id else safe_title
+        output_base = os.path.join(self.download_folder, filename)
+        
+        self.download_manager.update(job, f"⬇️ Téléchargement de '{safe_title}'...", title=safe_title)
+        
+        # Télécharger en relayant la progression (limitée en fréquence par le gestionnaire)
+        def on_progress(status):
+            if status['phase'] == 'postprocess' and phases.phase == 'download':
+                phases.start('postprocess')
+            self._update_download_progress(job, safe_title, status)
+        
+        phases.start('download')
+        output_file = self.youtube.download(url, info, output_base, job, on_progress)
+        phases.stop()
+        if video_id:
+            self.library_index.store_download(video_id, output_file)
+        
+        self.events.post(self._add_downloaded_file, output_file)
+        return output_file
+    
+    def _update_download_progress(self, job, title, status):
+        """Traduit l'état transmis par le moteur de téléchargement en message"""
+        if status['phase'] == 'postprocess':
+            self.download_manager.update(job, f"🎵 Conversion de '{title}'...", progress=100.0)
+            return
+        
+        percent = status.get('percent')
+        parts = [f"⬇️ '{title}'"]
+        if percent is not None:
+            parts.append(f"{percent:.0f}%")
+        if status.get('downloaded') and status.get('total'):
+            parts.append(f"{status['downloaded'] / 1e6:.1f}/{status['total'] / 1e6:.1f} Mo")
+        if status.get('speed'):
+            parts.append(f"{status['speed'] / 1e6:.1f} Mo/s")
+        if status.get('eta') is not None:
+            parts.append(f"reste {self.format_time(status['eta'])}")
+        self.download_manager.update(job, " - ".join(parts), progress=percent, throttle=True)
+    
+    def _add_downloaded_files(self, files):
+        """Ajoute d'un coup des fichiers déjà téléchargés à la playlist"""
+        was_empty = len(self.playlist) == 0
+        if self.playlist.extend(files):
+            self._post_playlist_updated()
+            
+            if was_empty:
+                self.current_index = 0
+                self.load_song(0, autoplay=False)
+    
+    def _add_downloaded_file(self, output_file):
+        """Ajoute un fichier téléchargé à la playlist"""
+        if self.playlist.append(output_file):
+            self._post_playlist_updated()
+            
+            if len(self.playlist) == 1:
+                self.current_index = 0
+                self.load_song(0, autoplay=False)
+    
+    def _on_download_job_updated(self, job):
+        """Relaie au frontend l'état d'un téléchargement (appelé depuis un worker)"""
+        # Seul le dernier état d'un téléchargement compte
+        self.events.post(self._report_download, job, job.state, job.message, key=('download', job.id))
+    
+    def _report_download(self, job, state, message):
+        """Affiche la progression d'un téléchargement, ou l'erreur s'il a échoué"""
+        if state == FAILED:
+            if self.on_error:
+                self.on_error(message)
+        else:
+            callback = job.progress_callback or self.on_download_progress
+            if callback:
+                callback(message)
+        # La liste des téléchargements n'est rafraîchie qu'une fois par lot d'événements
+        self.events.post(self._report_downloads_updated, job, key='downloads_updated')
+    
+    def _report_downloads_updated(self, job):
+        if self.on_download_updated:
+            self.on_download_updated(job)
+    
     def _is_valid_youtube_url(self, url):
         """Vérifie si l'URL provient d'un domaine YouTube autorisé"""
         allowed_domains = [
             'youtube.com',
             'www.youtube.com',
             'music.youtube.com',
-            'm.youtube.com'
+            'm.youtube.com',
             'youtu.be'
         ]
         
@@ -450,9 +916,9 @@ class MusicPlayerBackend:
             return None
         
         patterns = [
-            r'(?:youtube\.com/watch\?v=|youtu\.be/)([^&\s]+)',
-            r'youtube\.com/embed/([^&\s]+)',
-            r'music\.youtube\.com/watch\?v=([^&\s]+)',  # Support YouTube Music
+            r'(?:youtube\.com/watch\?v=|youtu\.be/)([\w-]+)',
+            r'youtube\.com/embed/([\w-]+)',
+            r'music\.youtube\.com/watch\?v=([\w-]+)',  # Support YouTube Music
         ]
         for pattern in patterns:
             match = re.search(pattern, url)
@@ -460,18 +926,21 @@ class MusicPlayerBackend:
                 return match.group(1)
         return None
     
-    def _get_video_title(self, url):
-        """Récupère le titre d'une vidéo YouTube"""
-        try:
-            result = subprocess.run(
-                ['yt-dlp', '--get-title', url],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return result.stdout.strip()
-        except:
-            return "video"
+    def _extract_collection_url(self, url):
+        """Retourne l'URL canonique d'une playlist ou d'une chaîne YouTube, sinon None"""
+        if not self._is_valid_youtube_url(url):
+            return None
+        
+        # Playlists et albums (YouTube Music publie les albums comme des playlists)
+        match = re.search(r'youtube\.com/playlist\?(?:.*&)?list=([\w-]+)', url)
+        if match:
+            return f"https://www.youtube.com/playlist?list={match.group(1)}"
+        
+        # Chaînes : on prend l'onglet des vidéos par défaut
+        match = re.search(r'youtube\.com/(@[\w.-]+|channel/[\w-]+|c/[\w.-]+|user/[\w.-]+)(/\w+)?', url)
+        if match:
+            return f"https://www.youtube.com/{match.group(1)}{match.group(2) or '/videos'}"
+        return None
     
     def _sanitize_filename(self, filename):
         """Nettoie un nom de fichier"""
@@ -481,23 +950,9 @@ class MusicPlayerBackend:
     
     # ===== Nettoyage =====
     
-    def _load_liked_songs(self):
-        """Charge la liste des musiques likées depuis le fichier"""
-        if os.path.exists(self.liked_songs_file):
-            try:
-                with open(self.liked_songs_file, 'r', encoding='utf-8') as file:
-                    self.liked_songs = json.load(file)
-            except (json.JSONDecodeError, IOError):
-                self.liked_songs = []
-
     def toggle_like_song(self, song_path):
         """Ajoute ou retire une musique de la liste des musiques likées"""
-        if song_path in self.liked_songs:
-            self.liked_songs.remove(song_path)
-            return False  # Déliké
-        else:
-            self.liked_songs.append(song_path)
-            return True  # Liké
+        return self.liked_songs.toggle(song_path)
 
     def is_song_liked(self, song_path):
         """Vérifie si une musique est likée"""
@@ -505,9 +960,16 @@ class MusicPlayerBackend:
 
     def cleanup(self):
         """Nettoie les ressources et sauvegarde les données"""
-        self._save_liked_songs()
-        pygame.mixer.music.stop()
-        pygame.mixer.quit()
+        self.session.flush()
+        if self._liked_songs is not None:
+            self._liked_songs.close()
+        self.download_manager.shutdown()
+        self.folder_scanner.cancel()
+        self.library_index.close()
+        self.waveforms.close()
+        self.output.close()
+        self._close_seek_stream()
+        self.events.close()
     
     @staticmethod
     def format_time(seconds):
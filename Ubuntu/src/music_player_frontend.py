@@ -4,15 +4,32 @@ Frontend du Lecteur Musical - Interface utilisateur
 Utilise tkinter pour l'interface graphique
 """
 
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import os
 from music_player_backend import MusicPlayerBackend
+from playlist_view import PlaylistView
+from startup_profile import profile, FIRST_FRAME
+from metrics import metrics, start_exporter
+from profiling import profiler
+from waveform import resample
+
+
+ui_tick_seconds = metrics.histogram('mp3_player_ui_tick_seconds', "Durée d'une mise à jour du slider")
+playlist_refresh_seconds = metrics.histogram(
+    'mp3_player_playlist_refresh_seconds', "Durée d'un rafraîchissement de la playlist affichée")
 
 
 class MusicPlayerFrontend:
     """Gère l'interface utilisateur du lecteur musical"""
     
+    # Fréquence de rafraîchissement du slider selon l'état (aucune mise à jour à l'arrêt)
+    TICK_PLAYING_MS = 250
+    TICK_DRAGGING_MS = 30
+    
+    # Largeur (pixels) d'une colonne de la forme d'onde
+    WAVEFORM_STEP = 2
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Lecteur Musical")
@@ -21,27 +38,46 @@ class MusicPlayerFrontend:
         
         # Créer le backend
         self.backend = MusicPlayerBackend()
+        profile.mark('backend')
         
         # Variables UI
         self.seeking = False
+        self.drag_position = 0
         self.canvas_width = 580
+        self._tick_id = None
         
         # Configurer les callbacks du backend
         self.setup_backend_callbacks()
         
         # Créer l'interface
         self.setup_ui()
+        profile.mark('ui')
         
         # Démarrer la mise à jour du slider
-        self.update_slider()
+        self._schedule_tick()
+        
+        # Premier affichage : le dessin de la fenêtre, déjà en attente, passe avant cette tâche
+        self.root.after_idle(profile.mark, FIRST_FRAME)
+        # Restaurer la session et reprendre les téléchargements, une fois la fenêtre affichée
+        # (phases distinctes du profil de démarrage)
+        self.root.after_idle(self.restore_session)
+        self.root.after_idle(self.resume_downloads)
     
     def setup_backend_callbacks(self):
         """Configure les callbacks pour les événements du backend"""
         self.backend.on_song_changed = self.on_song_changed
         self.backend.on_playback_state_changed = self.on_playback_state_changed
         self.backend.on_playlist_updated = self.on_playlist_updated
+        self.backend.on_playlist_changed = self.on_playlist_changed
         self.backend.on_download_progress = self.on_download_progress
+        self.backend.on_download_updated = self.on_download_updated
         self.backend.on_error = self.on_error
+        self.backend.on_scan_finished = self.on_scan_finished
+        self.backend.on_waveform_ready = self.on_waveform_ready
+        # Les événements d'arrière-plan sont traités par lots dans la boucle Tk : les autres
+        # threads ne font que les déposer, et Tk n'est réveillé que lorsque la file se remplit
+        self._events_fd = self.backend.events.defer()
+        self.root.tk.createfilehandler(self._events_fd, tk.READABLE, lambda fd, mask: self.backend.events.drain())
     
     # ===== Callbacks du backend =====
     
@@ -53,7 +89,7 @@ class MusicPlayerFrontend:
             self.time_label.config(text=f"0:00 / {total_time}")
 
             # Mettre à jour la sélection dans la listbox
-            self.playlist_box.selection_clear(0, tk.END)
+            self.playlist_box.selection_clear()
             self.playlist_box.selection_set(index)
             self.playlist_box.see(index)
 
@@ -63,9 +99,19 @@ class MusicPlayerFrontend:
                 self.like_button.config(text="❤️", fg="#FF69B4")
             else:
                 self.like_button.config(text="♡", fg="white")
+            
+            # Barre simple jusqu'à ce que la forme d'onde soit prête
+            if current_song != self.waveform_path:
+                self.waveform_path = current_song
+                self.waveform_peaks = None
+                self.draw_waveform()
+                self.backend.request_waveform(current_song)
         else:
             self.song_label.config(text="No song")
             self.time_label.config(text="0:00 / 0:00")
+            self.waveform_path = None
+            self.waveform_peaks = None
+            self.draw_waveform()
 
         self.update_slider_position(0)
     
@@ -75,19 +121,40 @@ class MusicPlayerFrontend:
             self.play_button.config(text="⏸")
         else:
             self.play_button.config(text="▶")
+        
+        self._schedule_tick()
     
     def on_playlist_updated(self, playlist):
         """Appelé quand la playlist est mise à jour"""
-        self.playlist_box.delete(0, tk.END)
-        for file_path in playlist:
-            filename = os.path.basename(file_path)
-            self.playlist_box.insert(tk.END, filename)
+        # La vue suit déjà les modifications détaillées : on ne redessine que les lignes visibles
+        with playlist_refresh_seconds.time():
+            self.playlist_box.refresh()
+    
+    def on_playlist_changed(self, action, *args):
+        """Appelé pour chaque modification détaillée de la playlist"""
+        self.playlist_box.apply_change(action, *args)
+    
+    def on_waveform_ready(self, path, peaks):
+        """Appelé quand la forme d'onde d'un fichier est disponible"""
+        if path == self.waveform_path and peaks is not None:
+            self.waveform_peaks = peaks
+            self.draw_waveform()
+            self.redraw_slider_progress()
     
     def on_download_progress(self, message):
         """Appelé pour afficher la progression du téléchargement"""
         if hasattr(self, 'download_status_label'):
             self.download_status_label.config(text=message)
     
+    def on_download_updated(self, job):
+        """Rafraîchit la liste des téléchargements si le dialogue est ouvert"""
+        self.refresh_download_jobs()
+    
+    def on_scan_finished(self, success, message):
+        """Appelé à la fin du parcours d'un dossier"""
+        if not success:
+            messagebox.showwarning("Attention", message)
+    
     def on_error(self, error_message):
         """Appelé en cas d'erreur"""
         messagebox.showerror("Erreur", error_message)
@@ -159,8 +226,9 @@ class MusicPlayerFrontend:
         scrollbar = tk.Scrollbar(playlist_frame)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        self.playlist_box = tk.Listbox(
+        self.playlist_box = PlaylistView(
             playlist_frame,
+            self.backend.playlist,
             bg='#2d2d2d',
             fg='white',
             selectbackground='#1db954',
@@ -216,6 +284,23 @@ class MusicPlayerFrontend:
             outline=''
         )
         
+        # Forme d'onde du morceau (remplace les barres quand elle est disponible)
+        self.waveform_path = None
+        self.waveform_peaks = None
+        self.waveform_points = None
+        self.slider_wave = self.slider_canvas.create_polygon(
+            0, 0, 0, 0, 0, 0,
+            fill='#404040',
+            outline='',
+            state='hidden'
+        )
+        self.slider_wave_progress = self.slider_canvas.create_polygon(
+            0, 0, 0, 0, 0, 0,
+            fill='#1db954',
+            outline='',
+            state='hidden'
+        )
+        
         # Curseur rond
         self.slider_handle = self.slider_canvas.create_oval(
             -8, 7, 8, 23,
@@ -349,7 +434,7 @@ class MusicPlayerFrontend:
     def add_folder(self):
         """Ouvre un dialogue pour ajouter un dossier"""
         folder = filedialog.askdirectory(
-            title="Sélectionner un dossier contenant des MP3",
+            title="Sélectionner un dossier contenant de la musique",
             initialdir=self.backend.download_folder
         )
         
@@ -361,9 +446,9 @@ class MusicPlayerFrontend:
     def add_files(self):
         """Ouvre un dialogue pour ajouter des fichiers"""
         files = filedialog.askopenfilenames(
-            title="Sélectionner des fichiers MP3",
+            title="Sélectionner des fichiers audio",
             initialdir=self.backend.download_folder,
-            filetypes=[("MP3 files", "*.mp3"), ("All files", "*.*")]
+            filetypes=[("Audio files", "*.mp3 *.ogg *.opus *.flac *.wav"), ("All files", "*.*")]
         )
         
         if files:
@@ -392,9 +477,23 @@ class MusicPlayerFrontend:
             else:
                 self.like_button.config(text="♡", fg="white")
     
+    def restore_session(self):
+        """Recharge la session précédente et met à jour les boutons"""
+        self.backend.restore_session()
+        self.update_shuffle_button(self.backend.shuffle_mode)
+        profile.mark('session')
+    
+    def resume_downloads(self):
+        """Reprend les téléchargements interrompus"""
+        self.backend.resume_downloads()
+        profile.mark('downloads')
+    
     def toggle_shuffle(self):
         """Active/désactive le mode shuffle"""
-        shuffle_enabled = self.backend.toggle_shuffle()
+        self.update_shuffle_button(self.backend.toggle_shuffle())
+    
+    def update_shuffle_button(self, shuffle_enabled):
+        """Affiche l'état du mode shuffle"""
         if shuffle_enabled:
             self.shuffle_button.config(bg='#1db954', activebackground='#1ed760')
         else:
@@ -406,22 +505,57 @@ class MusicPlayerFrontend:
         """Redimensionne le slider quand la fenêtre change"""
         self.canvas_width = event.width
         self.slider_canvas.coords(self.slider_bg, 0, 13, self.canvas_width, 17)
-        
+        self.draw_waveform()
+        self.redraw_slider_progress()
+    
+    def redraw_slider_progress(self):
+        """Replace le slider sur la position de lecture courante"""
         info = self.backend.get_playback_info()
         if info['song_length'] > 0:
             progress = (info['current_position'] / info['song_length']) * 100
             self.update_slider_position(progress)
     
+    def draw_waveform(self):
+        """Dessine la forme d'onde mise en cache, rééchantillonnée à la largeur du slider"""
+        columns = resample(self.waveform_peaks, self.canvas_width // self.WAVEFORM_STEP) if self.waveform_peaks else []
+        if len(columns) < 2:
+            self.waveform_points = None
+            for item in (self.slider_wave, self.slider_wave_progress):
+                self.slider_canvas.itemconfig(item, state='hidden')
+            for item in (self.slider_bg, self.slider_progress):
+                self.slider_canvas.itemconfig(item, state='normal')
+            return
+        
+        # Contour du haut (maxima) puis du bas (minima) ; un trait minimal reste visible dans les silences
+        middle, half = 15, 12
+        top = [(x * self.WAVEFORM_STEP, middle - max(high, 0.05) * half) for x, (low, high) in enumerate(columns)]
+        bottom = [(x * self.WAVEFORM_STEP, middle - min(low, -0.05) * half) for x, (low, high) in enumerate(columns)]
+        self.waveform_points = (top, bottom)
+        
+        self.slider_canvas.coords(self.slider_wave, *[c for point in top + bottom[::-1] for c in point])
+        for item in (self.slider_wave, self.slider_wave_progress):
+            self.slider_canvas.itemconfig(item, state='normal')
+        for item in (self.slider_bg, self.slider_progress):
+            self.slider_canvas.itemconfig(item, state='hidden')
+    
     def update_slider_position(self, percentage):
         """Met à jour la position visuelle du slider"""
         x = (percentage / 100.0) * self.canvas_width
         self.slider_canvas.coords(self.slider_progress, 0, 13, x, 17)
         self.slider_canvas.coords(self.slider_handle, x-8, 7, x+8, 23)
+        
+        if self.waveform_points is not None:
+            # Partie déjà jouée de la forme d'onde
+            top, bottom = self.waveform_points
+            count = max(2, min(len(top), int(x // self.WAVEFORM_STEP) + 1))
+            points = top[:count] + bottom[:count][::-1]
+            self.slider_canvas.coords(self.slider_wave_progress, *[c for point in points for c in point])
     
     def on_slider_click(self, event):
         """Gère le clic sur le slider"""
         self.seeking = True
         self.update_slider_from_mouse(event.x)
+        self._schedule_tick()
     
     def on_slider_drag(self, event):
         """Gère le glissement du slider"""
@@ -433,6 +567,7 @@ class MusicPlayerFrontend:
         x = max(0, min(x, self.canvas_width))
         percentage = (x / self.canvas_width) * 100
         self.update_slider_position(percentage)
+        self.drag_position = (percentage / 100.0) * self.backend.song_length
     
     def on_slider_release(self, event):
         """Gère le relâchement du slider"""
@@ -444,32 +579,51 @@ class MusicPlayerFrontend:
             self.backend.seek(position)
         
         self.seeking = False
+        self.update_slider()
+    
+    def _tick_interval(self):
+        """Intervalle avant la prochaine mise à jour du slider (None = aucune)"""
+        if self.seeking:
+            return self.TICK_DRAGGING_MS
+        if self.backend.is_playing and not self.backend.is_paused:
+            return self.TICK_PLAYING_MS
+        return None
+    
+    def _schedule_tick(self):
+        """(Re)planifie la mise à jour du slider selon l'état de lecture"""
+        if self._tick_id is not None:
+            self.root.after_cancel(self._tick_id)
+            self._tick_id = None
+        
+        interval = self._tick_interval()
+        if interval is not None:
+            self._tick_id = self.root.after(interval, self.update_slider)
     
     def update_slider(self):
-        """Met à jour le slider périodiquement"""
+        """Met à jour le slider et le temps affiché"""
+        start = time.perf_counter()
+        self._tick_id = None
+        # Sortie sans événement de fin : la fin du morceau est vérifiée à chaque tick
+        self.backend.check_song_end()
         info = self.backend.get_playback_info()
+        song_length = info['song_length']
+        total_time = self.backend.format_time(song_length)
+        
+        if self.seeking:
+            # Pendant le glissement, afficher la position visée
+            current_time = self.backend.format_time(self.drag_position)
+            self.time_label.config(text=f"{current_time} / {total_time}")
+        elif info['is_playing'] and not info['is_paused']:
+            current_pos = info['current_position']
+            if song_length > 0:
+                progress = (current_pos / song_length) * 100
+                self.update_slider_position(progress)
+            
+            current_time = self.backend.format_time(current_pos)
+            self.time_label.config(text=f"{current_time} / {total_time}")
         
-        if info['is_playing'] and not info['is_paused'] and not self.seeking:
-            try:
-                current_pos = info['current_position']
-                song_length = info['song_length']
-                
-                if song_length > 0:
-                    progress = (current_pos / song_length) * 100
-                    self.update_slider_position(progress)
-                
-                current_time = self.backend.format_time(current_pos)
-                total_time = self.backend.format_time(song_length)
-                self.time_label.config(text=f"{current_time} / {total_time}")
-                
-                # Vérifier si la chanson est terminée
-                if self.backend.is_song_finished():
-                    self.backend.next_song()
-                    
-            except:
-                pass
-        
-        self.root.after(50, self.update_slider)
+        self._schedule_tick()
+        ui_tick_seconds.observe(time.perf_counter() - start)
     
     # ===== Dialogue de téléchargement YouTube =====
     
@@ -477,7 +631,7 @@ class MusicPlayerFrontend:
         """Affiche le dialogue de téléchargement YouTube"""
         dialog = tk.Toplevel(self.root)
         dialog.title("Télécharger depuis YouTube")
-        dialog.geometry("600x300")
+        dialog.geometry("600x510")
         dialog.configure(bg='#1e1e1e')
         dialog.transient(self.root)
         
@@ -501,7 +655,7 @@ class MusicPlayerFrontend:
         # Instructions
         instructions = tk.Label(
             dialog,
-            text="Collez l'URL d'une vidéo YouTube ou YouTube Music ci-dessous:",
+            text="Collez l'URL d'une vidéo, d'une playlist ou d'un album YouTube ci-dessous:",
             font=('Arial', 10),
             bg='#1e1e1e',
             fg='#b3b3b3'
@@ -529,6 +683,22 @@ class MusicPlayerFrontend:
         url_entry.pack(fill=tk.X, padx=40, pady=10)
         url_entry.focus()
         
+        # Option : garder le flux audio d'origine (pas de conversion MP3)
+        keep_native_var = tk.BooleanVar(value=self.backend.youtube.keep_native)
+        keep_native_check = tk.Checkbutton(
+            dialog,
+            text="Conserver le format d'origine (Opus/Vorbis, sans conversion)",
+            variable=keep_native_var,
+            command=lambda: self.backend.set_keep_native_audio(keep_native_var.get()),
+            font=('Arial', 9),
+            bg='#1e1e1e',
+            fg='#b3b3b3',
+            selectcolor='#2d2d2d',
+            activebackground='#1e1e1e',
+            activeforeground='white'
+        )
+        keep_native_check.pack()
+        
         # Label de statut
         self.download_status_label = tk.Label(
             dialog,
@@ -539,6 +709,35 @@ class MusicPlayerFrontend:
         )
         self.download_status_label.pack(pady=10)
         
+        # File des téléchargements
+        self.download_jobs_box = tk.Listbox(
+            dialog,
+            bg='#2d2d2d',
+            fg='white',
+            selectbackground='#1db954',
+            font=('Arial', 10),
+            height=6
+        )
+        self.download_jobs_box.pack(fill=tk.BOTH, expand=True, padx=40)
+        self.download_job_ids = []
+        self.refresh_download_jobs()
+        
+        def selected_job():
+            selection = self.download_jobs_box.curselection()
+            if not selection:
+                return None
+            return self.download_job_ids[selection[0]]
+        
+        def cancel_job():
+            job_id = selected_job()
+            if job_id is not None:
+                self.backend.cancel_download(job_id)
+        
+        def retry_job():
+            job_id = selected_job()
+            if job_id is not None:
+                self.backend.retry_download(job_id)
+        
         # Frame pour les boutons
         button_frame = tk.Frame(dialog, bg='#1e1e1e')
         button_frame.pack(pady=20)
@@ -578,6 +777,35 @@ class MusicPlayerFrontend:
         )
         download_btn.pack(side=tk.LEFT, padx=5)
         
+        # Boutons annuler / réessayer le téléchargement sélectionné
+        cancel_btn = tk.Button(
+            button_frame,
+            text="Annuler",
+            command=cancel_job,
+            font=('Arial', 12),
+            bg='#404040',
+            fg='white',
+            activebackground='#505050',
+            bd=0,
+            padx=20,
+            pady=10
+        )
+        cancel_btn.pack(side=tk.LEFT, padx=5)
+        
+        retry_btn = tk.Button(
+            button_frame,
+            text="Réessayer",
+            command=retry_job,
+            font=('Arial', 12),
+            bg='#404040',
+            fg='white',
+            activebackground='#505050',
+            bd=0,
+            padx=20,
+            pady=10
+        )
+        retry_btn.pack(side=tk.LEFT, padx=5)
+        
         # Bouton fermer
         close_btn = tk.Button(
             button_frame,
@@ -596,15 +824,43 @@ class MusicPlayerFrontend:
         # Bind Enter pour télécharger
         url_entry.bind('<Return>', lambda e: start_download())
     
+    def refresh_download_jobs(self):
+        """Affiche l'état de chaque téléchargement dans le dialogue"""
+        box = getattr(self, 'download_jobs_box', None)
+        if box is None or not box.winfo_exists():
+            return
+        selection = box.curselection()
+        selected = self.download_job_ids[selection[0]] if selection else None
+        
+        jobs = self.backend.get_downloads()
+        self.download_job_ids = [job.id for job in jobs]
+        box.delete(0, tk.END)
+        for job in jobs:
+            box.insert(tk.END, job.label())
+        
+        if selected in self.download_job_ids:
+            box.selection_set(self.download_job_ids.index(selected))
+    
     def on_closing(self):
         """Gère la fermeture de l'application"""
+        # Le tube de réveil est fermé par cleanup() : Tk cesse d'abord de le surveiller
+        self.root.tk.deletefilehandler(self._events_fd)
         self.backend.cleanup()
         self.root.destroy()
 
 
 def main():
     """Point d'entrée principal"""
+    # Export des métriques, si MP3_PLAYER_METRICS ou MP3_PLAYER_METRICS_PORT est défini
+    exporter = start_exporter()
     root = tk.Tk()
+    profile.mark('tk')
     app = MusicPlayerFrontend(root)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
-    root.mainloop()
\ No newline at end of file
+    # kill -USR1 <pid> démarre ou arrête le profilage
+    profiler.install_signal(root)
+    # Enregistré après le premier affichage, la restauration de la session et la reprise des téléchargements
+    root.after_idle(profile.finish)
+    root.mainloop()
+    if exporter:
+        exporter.stop()
\ No newline at end of file
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Horloge de lecture du Lecteur Musical
+Position dans le morceau calculée sans interroger le mixer
+"""
+
+import time
+import threading
+
+
+class PlaybackClock:
+    """Position de lecture ancrée sur une horloge monotone
+
+    La position vaut le décalage enregistré au dernier ancrage (lecture,
+    reprise, déplacement) plus le temps écoulé depuis, tant que la lecture
+    n'est pas en pause. Lisible depuis n'importe quel thread.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._offset = 0.0
+        self._anchor = None
+
+    def position(self):
+        """Position courante en secondes"""
+        with self._lock:
+            if self._anchor is None:
+                return self._offset
+            return self._offset + (self._clock() - self._anchor)
+
+    def start(self, position=0.0):
+        """Démarre l'horloge à la position donnée"""
+        with self._lock:
+            self._offset = position
+            self._anchor = self._clock()
+
+    def pause(self):
+        """Fige la position courante"""
+        with self._lock:
+            if self._anchor is not None:
+                self._offset += self._clock() - self._anchor
+                self._anchor = None
+
+    def resume(self):
+        """Reprend l'avancement depuis la position figée"""
+        with self._lock:
+            if self._anchor is None:
+                self._anchor = self._clock()
+
+    def stop(self):
+        """Remet l'horloge à zéro, à l'arrêt"""
+        with self._lock:
+            self._offset = 0.0
+            self._anchor = None
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Playlist du Lecteur Musical
+Liste ordonnée de chemins sans doublons avec recherche en temps constant
+"""
+
+
+class Playlist:
+    """Ensemble ordonné de chemins de fichiers
+
+    Les positions sont mémorisées dans un dictionnaire ; après une suppression,
+    une insertion ou un déplacement, seules les positions situées après la
+    modification sont recalculées, et uniquement quand on en a besoin.
+    """
+
+    def __init__(self, paths=()):
+        self._items = []
+        self._positions = {}
+        # Les positions mémorisées à partir de cet index peuvent être périmées
+        self._dirty_from = None
+
+        # Callback appelé à chaque modification : on_change(action, *args)
+        #   'insert', index, nombre
+        #   'remove', index, nombre
+        #   'move', source, destination
+        #   'clear'
+        self.on_change = None
+
+        self.extend(paths)
+
+    # ===== Lecture =====
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __contains__(self, path):
+        return path in self._positions
+
+    def __repr__(self):
+        return f"Playlist({len(self._items)} titres)"
+
+    def index(self, path):
+        """Retourne la position d'un chemin (ValueError s'il est absent)"""
+        try:
+            position = self._positions[path]
+        except KeyError:
+            raise ValueError(f"{path} n'est pas dans la playlist") from None
+        if self._dirty_from is not None and position >= self._dirty_from:
+            self._reindex()
+            position = self._positions[path]
+        return position
+
+    def to_list(self):
+        """Retourne une copie de la liste des chemins"""
+        return list(self._items)
+
+    # ===== Modification =====
+
+    def append(self, path):
+        """Ajoute un chemin en fin de liste, retourne False s'il y est déjà"""
+        return bool(self.extend([path]))
+
+    def extend(self, paths):
+        """Ajoute les chemins absents en fin de liste et retourne ceux réellement ajoutés"""
+        start = len(self._items)
+        added = []
+        for path in paths:
+            if path not in self._positions:
+                self._positions[path] = start + len(added)
+                added.append(path)
+
+        if added:
+            self._items.extend(added)
+            self._notify('insert', start, len(added))
+        return added
+
+    def insert(self, index, paths):
+        """Insère les chemins absents à la position donnée et retourne ceux réellement ajoutés"""
+        index = max(0, min(index, len(self._items)))
+        if index == len(self._items):
+            return self.extend(paths)
+
+        added = []
+        seen = set()
+        for path in paths:
+            if path not in self._positions and path not in seen:
+                seen.add(path)
+                added.append(path)
+
+        if added:
+            self._items[index:index] = added
+            for offset, path in enumerate(added):
+                self._positions[path] = index + offset
+            self._mark_dirty(index)
+            self._notify('insert', index, len(added))
+        return added
+
+    def remove_at(self, index):
+        """Retire le chemin à la position donnée et le retourne"""
+        path = self._items.pop(index)
+        del self._positions[path]
+        self._mark_dirty(index)
+        self._notify('remove', index, 1)
+        return path
+
+    def remove(self, path):
+        """Retire un chemin de la liste"""
+        return self.remove_at(self.index(path))
+
+    def move(self, source, destination):
+        """Déplace un élément de la position source à la position destination"""
+        size = len(self._items)
+        if not (0 <= source < size) or not (0 <= destination < size):
+            raise IndexError("Position hors de la playlist")
+        if source == destination:
+            return
+
+        path = self._items.pop(source)
+        self._items.insert(destination, path)
+        self._positions[path] = destination
+        self._mark_dirty(min(source, destination))
+        self._notify('move', source, destination)
+
+    def clear(self):
+        """Vide la liste"""
+        self._items = []
+        self._positions = {}
+        self._dirty_from = None
+        self._notify('clear')
+
+    # ===== Interne =====
+
+    def _mark_dirty(self, index):
+        """Marque les positions à partir de index comme à recalculer"""
+        if self._dirty_from is None or index < self._dirty_from:
+            self._dirty_from = index
+
+    def _reindex(self):
+        """Recalcule les positions périmées"""
+        items = self._items
+        positions = self._positions
+        for i in range(self._dirty_from, len(items)):
+            positions[items[i]] = i
+        self._dirty_from = None
+
+    def _notify(self, action, *args):
+        if self.on_change:
+            self.on_change(action, *args)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Vue virtualisée de la playlist
+Ne dessine que les lignes visibles et applique les modifications sans tout reconstruire
+"""
+
+import os
+import tkinter as tk
+import tkinter.font as tkfont
+
+
+# Noms affichés gardés en cache : quelques écrans de lignes suffisent (seules les lignes visibles sont dessinées)
+DISPLAY_NAME_CACHE_SIZE = 1024
+
+
+class PlaylistView(tk.Canvas):
+    """Liste défilante de la playlist dessinée sur un Canvas
+
+    Le widget lit directement la playlist (source) : seules les lignes
+    visibles ont des éléments graphiques, et les noms affichés sont calculés
+    à la demande puis mis en cache (DISPLAY_NAME_CACHE_SIZE noms au plus).
+    """
+
+    def __init__(self, parent, source, bg='#2d2d2d', fg='white', selectbackground='#1db954',
+                 font=('Arial', 10), yscrollcommand=None, **kwargs):
+        super().__init__(parent, bg=bg, highlightthickness=0, **kwargs)
+        self.source = source
+        self.fg = fg
+        self.selectbackground = selectbackground
+        self.font = tkfont.Font(font=font)
+        self.row_height = self.font.metrics('linespace') + 4
+        self.yscrollcommand = yscrollcommand
+
+        self.top = 0
+        self.selected = None
+        self._rows = []
+        self._display_names = {}
+
+        self._selection_rect = self.create_rectangle(0, 0, 0, 0, fill=selectbackground, outline='', state='hidden')
+
+        self.bind('<Configure>', self._on_configure)
+        self.bind('<Button-1>', self._on_click)
+        self.bind('<MouseWheel>', self._on_mousewheel)
+        self.bind('<Button-4>', lambda e: self.yview('scroll', -3, 'units'))
+        self.bind('<Button-5>', lambda e: self.yview('scroll', 3, 'units'))
+
+    # ===== API de type Listbox =====
+
+    def curselection(self):
+        """Retourne l'index sélectionné sous forme de tuple (comme tk.Listbox)"""
+        return (self.selected,) if self.selected is not None else ()
+
+    def selection_clear(self, first=0, last=None):
+        """Efface la sélection"""
+        self.selected = None
+        self._redraw()
+
+    def selection_set(self, index):
+        """Sélectionne une ligne"""
+        if 0 <= index < len(self.source):
+            self.selected = index
+            self._redraw()
+
+    def see(self, index):
+        """Fait défiler la vue pour rendre une ligne visible"""
+        visible = self._visible_count()
+        if index < self.top:
+            self._scroll_to(index)
+        elif index >= self.top + visible:
+            self._scroll_to(index - visible + 1)
+
+    def nearest(self, y):
+        """Retourne l'index de la ligne la plus proche de l'ordonnée y"""
+        if not self.source:
+            return -1
+        return max(0, min(self.top + int(y // self.row_height), len(self.source) - 1))
+
+    def yview(self, *args):
+        """Protocole de défilement utilisé par la Scrollbar"""
+        total = len(self.source)
+        if not args:
+            return self._fractions()
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * total))
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if args[2] == 'pages':
+                step *= max(1, self._visible_count() - 1)
+            self._scroll_to(self.top + step)
+
+    # ===== Modifications de la playlist =====
+
+    def apply_change(self, action, *args):
+        """Applique une modification détaillée de la playlist (voir Playlist.on_change)"""
+        if action == 'clear':
+            self.top = 0
+            self.selected = None
+            self._display_names.clear()
+        elif action == 'insert':
+            index, count = args
+            if index <= self.top and self.top > 0:
+                self.top += count
+            if self.selected is not None and index <= self.selected:
+                self.selected += count
+            if index >= self.top + self._visible_count():
+                # Ajout hors de la zone visible : seule la barre de défilement change
+                self._update_scrollbar()
+                return
+        elif action == 'remove':
+            index, count = args
+            if index < self.top:
+                self.top = max(0, self.top - count)
+            if self.selected is not None:
+                if index <= self.selected < index + count:
+                    self.selected = None
+                elif index < self.selected:
+                    self.selected -= count
+            if index >= self.top + self._visible_count():
+                self._update_scrollbar()
+                return
+        elif action == 'move':
+            source, destination = args
+            if self.selected == source:
+                self.selected = destination
+            elif self.selected is not None:
+                if source < self.selected <= destination:
+                    self.selected -= 1
+                elif destination <= self.selected < source:
+                    self.selected += 1
+
+        self._scroll_to(self.top)
+
+    def refresh(self):
+        """Redessine les lignes visibles"""
+        self._redraw()
+
+    # ===== Rendu =====
+
+    def display_name(self, path):
+        """Nom affiché pour un chemin, calculé à la première demande"""
+        name = self._display_names.get(path)
+        if name is None:
+            name = os.path.basename(path)
+            if len(self._display_names) >= DISPLAY_NAME_CACHE_SIZE:
+                # Le plus ancien nom calculé est oublié (il sera recalculé s'il redevient visible)
+                del self._display_names[next(iter(self._display_names))]
+            self._display_names[path] = name
+        return name
+
+    def _visible_count(self):
+        return max(1, self.winfo_height() // self.row_height + 1)
+
+    def _fractions(self):
+        total = len(self.source)
+        if total == 0:
+            return 0.0, 1.0
+        first = self.top / total
+        last = min(1.0, (self.top + self._visible_count()) / total)
+        return first, last
+
+    def _scroll_to(self, top):
+        """Fixe la première ligne visible et redessine"""
+        max_top = max(0, len(self.source) - self._visible_count() + 1)
+        self.top = max(0, min(top, max_top))
+        self._redraw()
+
+    def _update_scrollbar(self):
+        if self.yscrollcommand:
+            self.yscrollcommand(*self._fractions())
+
+    def _on_configure(self, event):
+        """Ajuste le nombre d'éléments graphiques à la hauteur du widget"""
+        needed = self._visible_count()
+        while len(self._rows) < needed:
+            y = len(self._rows) * self.row_height
+            self._rows.append(self.create_text(
+                4, y + self.row_height // 2, anchor='w', text='', fill=self.fg, font=self.font
+            ))
+        while len(self._rows) > needed:
+            self.delete(self._rows.pop())
+        self._scroll_to(self.top)
+
+    def _redraw(self):
+        """Met à jour le texte des seules lignes visibles"""
+        total = len(self.source)
+        for offset, item in enumerate(self._rows):
+            index = self.top + offset
+            text = self.display_name(self.source[index]) if index < total else ''
+            if self.itemcget(item, 'text') != text:
+                self.itemconfigure(item, text=text)
+
+        if self.selected is not None and self.top <= self.selected < self.top + len(self._rows):
+            y = (self.selected - self.top) * self.row_height
+            self.coords(self._selection_rect, 0, y, self.winfo_width(), y + self.row_height)
+            self.itemconfigure(self._selection_rect, state='normal')
+        else:
+            self.itemconfigure(self._selection_rect, state='hidden')
+
+        self._update_scrollbar()
+
+    def _on_click(self, event):
+        index = self.nearest(event.y)
+        if index >= 0:
+            self.selected = index
+            self._redraw()
+
+    def _on_mousewheel(self, event):
+        self.yview('scroll', -1 if event.delta > 0 else 1, 'units')
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Profilage à la demande du Lecteur Musical
+cProfile et tracemalloc démarrés et arrêtés en cours d'exécution (SIGUSR1 ou MP3_PLAYER_PROFILE)
+"""
+
+import os
+import io
+import time
+import signal
+import threading
+
+
+# Variable d'environnement : profilage actif dès le lancement (jusqu'à la fermeture ou SIGUSR1)
+PROFILE_ENV = 'MP3_PLAYER_PROFILE'
+
+DEFAULT_PROFILES_DIR = os.path.expanduser("~/.cache/mp3_player/profiles")
+
+# Profondeur des piles mémorisées par tracemalloc pour chaque allocation
+TRACE_FRAMES = 5
+
+# Nombre de lignes des résumés texte
+REPORT_LINES = 40
+
+
+class Profiler:
+    """Capture CPU (cProfile) et mémoire (tracemalloc) entre start() et stop()
+
+    cProfile ne suit que le thread qui l'active : start() et stop() sont
+    appelés depuis le thread de l'interface, et les fonctions exécutées par
+    les threads d'arrière-plan passent par wrap() pour être profilées dans
+    leur propre thread. À l'arrêt, les profils sont fusionnés et écrits avec
+    l'état de la mémoire (et son évolution depuis start()) dans profiles_dir.
+    """
+
+    def __init__(self, profiles_dir=DEFAULT_PROFILES_DIR):
+        self.profiles_dir = profiles_dir
+        self.active = False
+        self._lock = threading.Lock()
+        self._main = None
+        self._threads = []
+        self._started_at = None
+        self._memory_start = None
+        self._own_tracemalloc = False
+
+    def toggle(self):
+        if self.active:
+            self.stop()
+        else:
+            self.start()
+
+    def start(self):
+        """Démarre la capture (thread de l'interface)"""
+        if self.active:
+            return
+        # Importés ici : inutiles tant que le profilage n'est pas demandé
+        import cProfile
+        import tracemalloc
+        self._started_at = time.strftime('%Y%m%d-%H%M%S')
+        self._own_tracemalloc = not tracemalloc.is_tracing()
+        if self._own_tracemalloc:
+            tracemalloc.start(TRACE_FRAMES)
+        self._memory_start = tracemalloc.take_snapshot()
+
+        with self._lock:
+            self._threads = []
+            self.active = True
+        self._main = cProfile.Profile()
+        self._main.enable()
+        print(f"Profilage démarré (résultats dans {self.profiles_dir})")
+
+    def stop(self, wait=False):
+        """Arrête la capture et écrit les résultats en arrière-plan (attendus avec wait, à la fermeture)"""
+        if not self.active:
+            return
+        import tracemalloc
+        self._main.disable()
+        with self._lock:
+            self.active = False
+            profiles = [self._main] + self._threads
+            self._threads = []
+        memory = tracemalloc.take_snapshot()
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+
+        thread = threading.Thread(
+            target=self._write,
+            args=(self._started_at, profiles, self._memory_start, memory),
+            daemon=True
+        )
+        thread.start()
+        self._main = None
+        self._memory_start = None
+        if wait:
+            thread.join()
+
+    def wrap(self, func):
+        """Retourne func, profilée dans le thread qui l'exécute si la capture est active"""
+        def wrapper(*args, **kwargs):
+            if not self.active or threading.current_thread() is threading.main_thread():
+                return func(*args, **kwargs)
+            import cProfile
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Un profil actif couvre déjà tous les threads (Python 3.12 et suivants)
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self._lock:
+                    if self.active:
+                        self._threads.append(profile)
+        return wrapper
+
+    # ===== Écriture des résultats =====
+
+    def _write(self, stamp, profiles, memory_start, memory):
+        import pstats
+        base = os.path.join(self.profiles_dir, stamp)
+        try:
+            os.makedirs(self.profiles_dir, exist_ok=True)
+
+            stats = pstats.Stats(profiles[0])
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.dump_stats(base + "-cpu.prof")
+
+            report = io.StringIO()
+            pstats.Stats(base + "-cpu.prof", stream=report).sort_stats('cumulative').print_stats(REPORT_LINES)
+            with open(base + "-cpu.txt", 'w', encoding='utf-8') as f:
+                f.write(report.getvalue())
+
+            memory.dump(base + "-memory.snapshot")
+            with open(base + "-memory.txt", 'w', encoding='utf-8') as f:
+                f.write("Allocations en cours (par ligne)\n")
+                for stat in memory.statistics('lineno')[:REPORT_LINES]:
+                    f.write(f"{stat}\n")
+                f.write("\nÉvolution depuis le début du profilage\n")
+                for stat in memory.compare_to(memory_start, 'lineno')[:REPORT_LINES]:
+                    f.write(f"{stat}\n")
+            print(f"Profil enregistré dans {base}-*")
+        except (OSError, TypeError) as e:
+            print(f"Erreur lors de l'écriture du profil: {e}")
+
+    # ===== Commande par signal =====
+
+    def install_signal(self, root):
+        """Bascule la capture à chaque SIGUSR1 (kill -USR1 <pid>)
+
+        Le gestionnaire Python ne s'exécute que lorsque l'interpréteur
+        reprend la main : le descripteur de réveil des signaux est surveillé
+        par Tk pour que la boucle de l'interface le traite aussitôt.
+        """
+        if not hasattr(signal, 'SIGUSR1'):
+            return
+        import tkinter
+        reader, writer = os.pipe()
+        os.set_blocking(reader, False)
+        os.set_blocking(writer, False)
+        try:
+            signal.set_wakeup_fd(writer)
+        except ValueError as e:
+            print(f"Erreur lors de l'installation du signal de profilage: {e}")
+            return
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.toggle())
+
+        def drain(fd, mask):
+            try:
+                os.read(fd, 512)
+            except OSError:
+                pass
+
+        root.tk.createfilehandler(reader, tkinter.READABLE, drain)
+
+
+def enabled_from_env():
+    """Vrai si MP3_PLAYER_PROFILE demande le profilage dès le lancement"""
+    setting = os.environ.get(PROFILE_ENV, '')
+    return bool(setting) and setting != '0'
+
+
+# Profileur du processus
+profiler = Profiler()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Session du Lecteur Musical
+Sauvegarde compacte (JSON compressé) de la playlist et de la lecture, restaurée au lancement suivant
+"""
+
+import os
+import json
+import zlib
+import threading
+
+
+# Version du format : une session d'un autre format est ignorée
+SESSION_VERSION = 1
+
+DEFAULT_SESSION_FILE = os.path.expanduser("~/.cache/mp3_player/session.bin")
+
+
+class SessionStore:
+    """Écrit l'état de la session au plus une fois par délai
+
+    get_state() fournit l'état à sauvegarder ; il est appelé au moment de
+    l'écriture, si bien que plusieurs changements rapprochés ne produisent
+    qu'une seule écriture. L'écriture est atomique (fichier temporaire puis
+    renommage).
+    """
+
+    def __init__(self, get_state, session_file=DEFAULT_SESSION_FILE, delay=2.0):
+        self.get_state = get_state
+        self.session_file = session_file
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def load(self):
+        """Retourne l'état sauvegardé, ou None s'il est absent ou illisible"""
+        try:
+            with open(self.session_file, 'rb') as f:
+                state = json.loads(zlib.decompress(f.read()))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, zlib.error) as e:
+            print(f"Erreur lors du chargement de la session: {e}")
+            return None
+        if not isinstance(state, dict) or state.get('version') != SESSION_VERSION:
+            return None
+        return state
+
+    def schedule_save(self):
+        """Demande une sauvegarde ; les demandes suivantes sont fusionnées jusqu'à l'écriture"""
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.delay, self._save_scheduled)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Écrit immédiatement la session (à la fermeture)"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self.save()
+
+    def _save_scheduled(self):
+        with self._lock:
+            self._timer = None
+        self.save()
+
+    def save(self):
+        """Sérialise et écrit l'état courant"""
+        try:
+            state = dict(self.get_state(), version=SESSION_VERSION)
+        except RuntimeError:
+            # État modifié pendant sa lecture par un autre thread : on réessaie plus tard
+            self.schedule_save()
+            return
+        try:
+            # Niveau 1 : presque aussi compact que le niveau par défaut, trois fois plus rapide
+            data = zlib.compress(json.dumps(state, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 1)
+
+            os.makedirs(os.path.dirname(self.session_file), exist_ok=True)
+            tmp_file = self.session_file + ".tmp"
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, self.session_file)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Erreur lors de la sauvegarde de la session: {e}")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Mode aléatoire du Lecteur Musical
+Tirage sans remise (Fisher-Yates paresseux) avec historique pour revenir en arrière
+"""
+
+import random
+from collections import deque
+
+
+# Nombre de morceaux mémorisés pour la touche "précédent"
+HISTORY_LIMIT = 1000
+
+
+class ShuffleEngine:
+    """Permutation aléatoire de la playlist générée au fur et à mesure
+
+    Seules les positions déjà échangées sont stockées : chaque tirage est en
+    temps constant et chaque morceau sort une fois par cycle. Les morceaux
+    ajoutés en fin de playlist rejoignent simplement le cycle en cours.
+    """
+
+    def __init__(self, rng=None):
+        self._rng = rng or random.Random()
+        self._size = 0
+        # Positions échangées de la permutation ; les autres valent leur propre index
+        self._swaps = {}
+        # Nombre de morceaux déjà tirés dans le cycle en cours
+        self._drawn = 0
+        self._history = deque(maxlen=HISTORY_LIMIT)
+        self._forward = []
+        # Tirage déjà effectué mais pas encore joué (morceau en file d'attente)
+        self._pending = None
+
+    def reset(self, size, current=None):
+        """Démarre un nouveau cycle, en comptant current comme déjà joué"""
+        self._size = size
+        self._swaps = {}
+        self._drawn = 0
+        self._history.clear()
+        self._forward = []
+        self._pending = None
+        if current is not None and 0 <= current < size:
+            if current != 0:
+                self._swaps[current] = 0
+            self._drawn = 1
+
+    def resize(self, size):
+        """Prend en compte des morceaux ajoutés en fin de playlist"""
+        if size >= self._size:
+            self._size = size
+        else:
+            self.reset(size)
+
+    def peek(self, current):
+        """Retourne le prochain index sans l'enregistrer comme joué"""
+        if self._forward:
+            return self._forward[-1]
+        if self._pending is None or self._pending >= self._size:
+            self._pending = self._draw(avoid=current)
+        return self._pending
+
+    def next(self, current):
+        """Passe au prochain index et mémorise current dans l'historique"""
+        index = self.peek(current)
+        if self._forward:
+            self._forward.pop()
+        else:
+            self._pending = None
+        self._history.append(current)
+        return index
+
+    def previous(self, current):
+        """Revient au morceau précédent de l'historique (None s'il est vide)"""
+        while self._history:
+            index = self._history.pop()
+            if index < self._size:
+                self._forward.append(current)
+                return index
+        return None
+
+    def state(self):
+        """Retourne l'état du cycle en cours sous une forme sérialisable en JSON"""
+        return {
+            'size': self._size,
+            'swaps': list(self._swaps.items()),
+            'drawn': self._drawn,
+            'history': list(self._history),
+            'forward': list(self._forward),
+            'pending': self._pending,
+        }
+
+    def restore(self, state):
+        """Reprend un cycle sauvegardé par state()"""
+        self._size = state['size']
+        self._swaps = {int(key): int(value) for key, value in state['swaps']}
+        self._drawn = state['drawn']
+        self._history = deque(state['history'], maxlen=HISTORY_LIMIT)
+        self._forward = list(state['forward'])
+        self._pending = state['pending']
+
+    def _draw(self, avoid=None):
+        """Tire un index parmi ceux pas encore joués dans le cycle"""
+        if self._size == 0:
+            return 0
+        if self._drawn >= self._size:
+            # Cycle terminé : on repart sur une nouvelle permutation
+            self._swaps = {}
+            self._drawn = 0
+
+        k = self._drawn
+        while True:
+            j = self._rng.randrange(k, self._size)
+            value = self._swaps.get(j, j)
+            if value != avoid or k == self._size - 1:
+                break
+
+        if j != k:
+            self._swaps[j] = self._swaps.get(k, k)
+        self._swaps.pop(k, None)
+        self._drawn = k + 1
+        return value
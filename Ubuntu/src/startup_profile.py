@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Profil de démarrage du Lecteur Musical
+Durée de chaque phase jusqu'au premier affichage, activé par MP3_PLAYER_PROFILE_STARTUP
+"""
+
+import os
+import json
+import time
+
+
+# Variable d'environnement : "1" pour le fichier par défaut, ou chemin du fichier de résultats
+PROFILE_ENV = 'MP3_PLAYER_PROFILE_STARTUP'
+
+DEFAULT_PROFILE_FILE = os.path.expanduser("~/.cache/mp3_player/startup_profile.jsonl")
+
+# Phase qui se termine au premier affichage de la fenêtre
+FIRST_FRAME = 'first_frame'
+
+
+class StartupProfile:
+    """Chronomètre les phases du démarrage et ajoute le résultat à un fichier JSON Lines
+
+    Chaque ligne contient la date, la durée de chaque phase (ms), le temps
+    écoulé jusqu'au premier affichage (phase first_frame) et le total, travail
+    lancé après l'affichage compris. Sans la variable d'environnement, ne fait rien.
+    """
+
+    def __init__(self, setting=None):
+        setting = os.environ.get(PROFILE_ENV, '') if setting is None else setting
+        self.enabled = bool(setting) and setting != '0'
+        self.profile_file = DEFAULT_PROFILE_FILE if setting in ('', '1') else setting
+        self._start = time.perf_counter()
+        self._last = self._start
+        self._phases = []
+        self._first_frame = None
+        self._finished = False
+
+    def mark(self, phase):
+        """Termine la phase en cours sous le nom donné"""
+        if not self.enabled or self._finished:
+            return
+        now = time.perf_counter()
+        self._phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+        if phase == FIRST_FRAME:
+            self._first_frame = now
+
+    def finish(self, phase=None):
+        """Termine la dernière phase (si elle est nommée) et enregistre le profil"""
+        if not self.enabled or self._finished:
+            return
+        if phase is not None:
+            self.mark(phase)
+        self._finished = True
+
+        entry = {
+            'timestamp': time.time(),
+            'phases': {name: round(duration, 1) for name, duration in self._phases},
+            'total_ms': round((self._last - self._start) * 1000, 1),
+        }
+        if self._first_frame is not None:
+            entry['first_frame_ms'] = round((self._first_frame - self._start) * 1000, 1)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.profile_file)), exist_ok=True)
+            with open(self.profile_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            print(f"Erreur lors de l'écriture du profil de démarrage: {e}")
+
+
+# Profil du processus, démarré à la première importation de ce module
+profile = StartupProfile()
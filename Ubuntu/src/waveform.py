@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Formes d'onde du Lecteur Musical
+Pics calculés une fois par fichier dans un processus séparé, puis lus depuis un cache binaire
+"""
+
+import os
+import sys
+import struct
+import shutil
+import hashlib
+import threading
+from array import array
+
+
+DEFAULT_WAVEFORM_DIR = os.path.expanduser("~/.cache/mp3_player/waveforms")
+
+# Décodage en mono à basse fréquence (un quart de 44,1 kHz) : suffisant pour l'enveloppe du signal
+DECODE_RATE = 11025
+
+# Un pic (minimum et maximum) par bloc de 40 ms (441 échantillons)
+BLOCKS_PER_SECOND = 25
+BLOCK_SIZE = DECODE_RATE // BLOCKS_PER_SECOND
+
+# Sortie de ffmpeg lue et réduite par morceaux de 10 s de son (un nombre entier de blocs)
+CHUNK_BYTES = BLOCK_SIZE * 2 * BLOCKS_PER_SECOND * 10
+
+# En-tête du cache : signature, version, blocs par seconde, nombre de blocs
+WAVEFORM_MAGIC = b'MPWF'
+WAVEFORM_VERSION = 1
+HEADER = struct.Struct('<4sBHI')
+
+
+# ===== Calcul (processus de travail) =====
+
+def decode(path):
+    """Décode le fichier en PCM 16 bits mono à DECODE_RATE Hz, morceau par morceau (ffmpeg, sinon pygame)"""
+    if shutil.which('ffmpeg'):
+        import subprocess
+        args = ['ffmpeg', '-v', 'error', '-nostdin', '-i', path,
+                '-ac', '1', '-ar', str(DECODE_RATE), '-f', 's16le', '-']
+        with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as process:
+            for chunk in iter(lambda: process.stdout.read(CHUNK_BYTES), b''):
+                yield chunk
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, args)
+        return
+
+    import pygame
+    if not pygame.mixer.get_init():
+        pygame.mixer.init(frequency=DECODE_RATE, size=-16, channels=1)
+    yield pygame.mixer.Sound(path).get_raw()
+
+
+def compute_peaks(chunks):
+    """Minimum et maximum de chaque bloc, ramenés sur un octet signé (-127 à 127)
+
+    chunks : morceaux successifs de PCM 16 bits, réduits l'un après l'autre
+    sans jamais conserver tout le son. Le dernier bloc, incomplet, est
+    réduit tel quel.
+    """
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    minima, maxima = array('b'), array('b')
+    block_bytes = BLOCK_SIZE * 2
+    rest = b''
+    for chunk in chunks:
+        if rest:
+            chunk = rest + chunk
+        whole = len(chunk) // block_bytes * block_bytes
+        _reduce_blocks(memoryview(chunk)[:whole], BLOCK_SIZE, minima, maxima, numpy)
+        rest = chunk[whole:]
+
+    # Dernier bloc (un éventuel octet isolé est ignoré)
+    samples = len(rest) // 2
+    if samples:
+        _reduce_blocks(memoryview(rest)[:samples * 2], samples, minima, maxima, numpy)
+    return minima.tobytes(), maxima.tobytes()
+
+
+def _reduce_blocks(pcm, size, minima, maxima, numpy):
+    """Ajoute les pics des blocs de size échantillons contenus dans pcm"""
+    if not pcm:
+        return
+    if numpy is not None:
+        # Vue directe sur les échantillons 16 bits : aucune copie avant la réduction
+        blocks = numpy.frombuffer(pcm, dtype='<i2').reshape(-1, size)
+        lows = blocks.min(axis=1).astype(numpy.int32) * 127 // 32768
+        highs = blocks.max(axis=1).astype(numpy.int32) * 127 // 32767
+        minima.frombytes(lows.astype(numpy.int8).tobytes())
+        maxima.frombytes(highs.astype(numpy.int8).tobytes())
+        return
+
+    # Sans NumPy : même résultat, bloc par bloc
+    samples = array('h')
+    samples.frombytes(pcm)
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    for start in range(0, len(samples), size):
+        block = samples[start:start + size]
+        minima.append(min(block) * 127 // 32768)
+        maxima.append(max(block) * 127 // 32767)
+
+
+def build_waveform(path, cache_file):
+    """Décode un fichier et enregistre ses pics (exécuté dans le processus de travail)"""
+    minima, maxima = compute_peaks(decode(path))
+    save_peaks(cache_file, minima, maxima)
+
+
+def _init_worker():
+    # Le décodage par pygame ne doit pas ouvrir la carte son, ni ralentir la lecture
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+
+
+# ===== Cache =====
+
+def save_peaks(cache_file, minima, maxima):
+    os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+    tmp_file = cache_file + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(WAVEFORM_MAGIC, WAVEFORM_VERSION, BLOCKS_PER_SECOND, len(minima)))
+        f.write(minima)
+        f.write(maxima)
+    os.replace(tmp_file, cache_file)
+
+
+def load_peaks(cache_file):
+    """Retourne (minima, maxima) enregistrés, ou None si le cache est absent ou invalide"""
+    try:
+        with open(cache_file, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, blocks_per_second, count = HEADER.unpack_from(data)
+    if (magic != WAVEFORM_MAGIC or version != WAVEFORM_VERSION
+            or blocks_per_second != BLOCKS_PER_SECOND or len(data) != HEADER.size + 2 * count):
+        return None
+    minima = array('b', data[HEADER.size:HEADER.size + count])
+    maxima = array('b', data[HEADER.size + count:])
+    return minima, maxima
+
+
+def resample(peaks, width):
+    """Ramène les pics à width colonnes : [(minimum, maximum), ...] entre -1 et 1"""
+    minima, maxima = peaks
+    count = len(minima)
+    if not count or width <= 0:
+        return []
+    columns = []
+    for x in range(width):
+        start = x * count // width
+        end = max(start + 1, (x + 1) * count // width)
+        columns.append((min(minima[start:end]) / 127, max(maxima[start:end]) / 127))
+    return columns
+
+
+class WaveformCache:
+    """Fournit les pics des fichiers, calculés au plus une fois par fichier
+
+    Un fichier est identifié par son périphérique, son inode, sa taille et
+    sa date de modification : un fichier déplacé garde son cache, un
+    fichier modifié est recalculé. Le décodage a lieu dans un processus
+    séparé (démarré à la première demande), jamais dans le thread appelant.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_WAVEFORM_DIR, max_workers=1):
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self._executor = None
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def cache_file(self, path):
+        st = os.stat(path)
+        identity = f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+        return os.path.join(self.cache_dir, hashlib.sha1(identity.encode()).hexdigest() + ".peaks")
+
+    def request(self, path, callback=None):
+        """Obtient les pics en arrière-plan puis appelle callback(path, pics) (pics None en cas d'échec)"""
+        thread = threading.Thread(target=self._resolve, args=(path, callback), daemon=True)
+        thread.start()
+
+    def _resolve(self, path, callback):
+        peaks = None
+        try:
+            cache_file = self.cache_file(path)
+            peaks = load_peaks(cache_file)
+            if peaks is None:
+                peaks = self._compute(path, cache_file)
+        except Exception as e:
+            if not self._closed:
+                print(f"Erreur lors du calcul de la forme d'onde de {path}: {e}")
+        if callback:
+            callback(path, peaks)
+
+    def _compute(self, path, cache_file):
+        """Calcule les pics dans le processus de travail et les relit depuis le cache"""
+        # Importé au premier calcul seulement, comme le pool de processus
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            self._submit(path, cache_file).result()
+        except BrokenProcessPool:
+            # Processus de travail mort (mémoire, signal) : un nouveau sera lancé à la prochaine demande
+            with self._lock:
+                self._executor = None
+            raise
+        return load_peaks(cache_file)
+
+    def _submit(self, path, cache_file):
+        """Lance le calcul, ou retourne celui déjà en cours pour ce fichier"""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("cache des formes d'onde fermé")
+            future = self._pending.get(cache_file)
+            if future is None:
+                if self._executor is None:
+                    # Importés ici : les formes d'onde en cache n'ont besoin d'aucun processus
+                    import multiprocessing
+                    from concurrent.futures import ProcessPoolExecutor
+                    # spawn : un fork du processus de l'interface (Tk, threads) n'est pas sûr
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_worker
+                    )
+                future = self._executor.submit(build_waveform, path, cache_file)
+                self._pending[cache_file] = future
+                future.add_done_callback(lambda _: self._pending.pop(cache_file, None))
+            return future
+
+    def close(self):
+        """Abandonne les calculs en attente et arrête le processus de travail"""
+        with self._lock:
+            self._closed = True
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
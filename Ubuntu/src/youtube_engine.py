@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Moteur de téléchargement YouTube du Lecteur Musical
+Utilise l'API Python de yt-dlp dans le processus, et la commande yt-dlp à défaut
+"""
+
+import os
+import re
+import shutil
+import importlib
+import importlib.util
+
+from download_manager import DownloadCancelled
+from metrics import metrics
+
+
+# Ligne de progression de la commande yt-dlp lancée avec --newline
+PROGRESS_LINE = re.compile(
+    r'\[download\]\s+(?P<percent>[\d.]+)%\s+of\s+~?\s*(?P<total>[\d.]+\s*\w+)'
+    r'(?:\s+at\s+(?P<speed>[\d.]+\s*\w+/s))?(?:\s+ETA\s+(?P<eta>[\d:]+))?'
+)
+POSTPROCESS_LINE = re.compile(r'\[(ExtractAudio|FFmpeg\w*)\]')
+
+# Extension produite par yt-dlp pour chaque codec audio
+CODEC_EXTENSIONS = {'mp3': '.mp3', 'opus': '.opus', 'vorbis': '.ogg'}
+
+# Flux d'origine lisibles sans conversion, par ordre de préférence
+NATIVE_CODECS = ('opus', 'vorbis')
+
+SIZE_UNITS = {'B': 1, 'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3, 'KB': 1000, 'MB': 1000 ** 2, 'GB': 1000 ** 3}
+
+ytdlp_spawns = metrics.counter(
+    'mp3_player_subprocess_spawns_total', "Processus lancés, par commande", command='yt-dlp')
+
+
+def _parse_size(text):
+    """Convertit une taille affichée par yt-dlp ("3.45MiB") en octets"""
+    match = re.match(r'([\d.]+)\s*(\w+)', text or '')
+    if not match or match.group(2) not in SIZE_UNITS:
+        return None
+    return float(match.group(1)) * SIZE_UNITS[match.group(2)]
+
+
+def _parse_eta(text):
+    """Convertit une durée "MM:SS" ou "HH:MM:SS" en secondes"""
+    if not text:
+        return None
+    seconds = 0
+    for part in text.split(':'):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def parse_progress_line(line):
+    """Décode une ligne de sortie de yt-dlp en état de progression (None si ce n'en est pas une)"""
+    match = PROGRESS_LINE.search(line)
+    if match:
+        total = _parse_size(match.group('total'))
+        percent = float(match.group('percent'))
+        speed = _parse_size((match.group('speed') or '')[:-2])
+        return {
+            'phase': 'download',
+            'percent': percent,
+            'downloaded': total * percent / 100 if total else None,
+            'total': total,
+            'speed': speed,
+            'eta': _parse_eta(match.group('eta')),
+        }
+    if POSTPROCESS_LINE.match(line):
+        return {'phase': 'postprocess'}
+    return None
+
+
+class YoutubeEngine:
+    """Récupère les informations d'une vidéo puis télécharge son audio
+
+    Avec le module yt_dlp, les informations ne sont extraites qu'une fois et
+    réutilisées pour le titre, le nom de fichier et le téléchargement. Sans
+    lui, la commande yt-dlp est lancée dans un sous-processus.
+
+    Avec keep_native, un flux Opus ou Vorbis est conservé tel quel (simple
+    changement de conteneur) ; la conversion en audio_format n'a lieu que
+    si la vidéo n'en propose pas.
+    """
+
+    def __init__(self, audio_format='mp3', keep_native=False):
+        self.audio_format = audio_format
+        self.keep_native = keep_native
+
+    # ===== Disponibilité =====
+
+    def has_module(self):
+        """Vrai si le module yt_dlp est importable"""
+        importlib.invalidate_caches()
+        return importlib.util.find_spec('yt_dlp') is not None
+
+    def has_command(self):
+        """Vrai si la commande yt-dlp est dans le PATH"""
+        return shutil.which('yt-dlp') is not None
+
+    def is_available(self):
+        """Vérifie la présence de yt-dlp sans lancer de processus"""
+        return self.has_module() or self.has_command()
+
+    # ===== Téléchargement =====
+
+    def extract_info(self, url):
+        """Retourne les informations de la vidéo (au minimum son titre)"""
+        if self.has_module():
+            import yt_dlp
+            try:
+                with yt_dlp.YoutubeDL(self._options()) as ydl:
+                    return ydl.extract_info(url, download=False)
+            except yt_dlp.utils.DownloadError as e:
+                raise RuntimeError(f"Erreur de téléchargement: {e}")
+
+        # Importé ici : seule la commande yt-dlp (sans le module) en a besoin
+        import subprocess
+        try:
+            ytdlp_spawns.inc()
+            result = subprocess.run(
+                ['yt-dlp', '--get-title', url],
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            title = result.stdout.strip()
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            title = None
+        return {'title': title or "video"}
+
+    def extract_entries(self, url):
+        """Liste les vidéos d'une playlist ou d'une chaîne sans analyser chaque vidéo
+
+        Retourne (titre de la collection ou None, [(id, titre), ...]).
+        """
+        if self.has_module():
+            import yt_dlp
+            options = self._options(extract_flat='in_playlist', noplaylist=False)
+            try:
+                with yt_dlp.YoutubeDL(options) as ydl:
+                    info = ydl.extract_info(url, download=False)
+            except yt_dlp.utils.DownloadError as e:
+                raise RuntimeError(f"Erreur de téléchargement: {e}")
+            entries = [
+                (entry['id'], entry.get('title'))
+                for entry in info.get('entries') or []
+                if entry and entry.get('id') and entry.get('ie_key', 'Youtube') == 'Youtube'
+            ]
+            return info.get('title'), entries
+
+        import subprocess
+        try:
+            ytdlp_spawns.inc()
+            result = subprocess.run(
+                ['yt-dlp', '--flat-playlist', '--print', '%(id)s\t%(title)s', url],
+                capture_output=True,
+                text=True,
+                check=True
+            )
+        except FileNotFoundError:
+            raise RuntimeError("yt-dlp n'est pas installé")
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Erreur de téléchargement: {e.stderr}")
+        entries = []
+        for line in result.stdout.splitlines():
+            video_id, _, title = line.partition('\t')
+            if video_id:
+                entries.append((video_id, title or None))
+        return None, entries
+
+    def download(self, url, info, output_base, job, on_progress=None):
+        """Télécharge l'audio vers output_base + extension et retourne le fichier produit
+
+        job fournit l'annulation (job.cancelled) et reçoit le sous-processus éventuel.
+        on_progress(état) reçoit un dictionnaire : phase ('download' ou 'postprocess'),
+        percent, downloaded, total (octets), speed (octets/s) et eta (secondes).
+        """
+        on_progress = on_progress or (lambda status: None)
+        if job.cancelled:
+            raise DownloadCancelled()
+
+        # Le nom de fichier est déjà nettoyé : seuls les % doivent être protégés
+        template = output_base.replace('%', '%%') + '.%(ext)s'
+        if self.has_module() and 'formats' in info:
+            codec = (self._native_codec(info) if self.keep_native else None) or self.audio_format
+            self._download_module(info, template, codec, job, on_progress)
+            candidates = [codec]
+        else:
+            self._download_command(url, template, job, on_progress)
+            candidates = list(NATIVE_CODECS) + [self.audio_format] if self.keep_native else [self.audio_format]
+
+        if job.cancelled:
+            raise DownloadCancelled()
+        for codec in candidates:
+            output_file = output_base + CODEC_EXTENSIONS.get(codec, '.' + codec)
+            if os.path.exists(output_file):
+                return output_file
+        raise RuntimeError("Le fichier téléchargé n'a pas été trouvé")
+
+    @staticmethod
+    def _native_codec(info):
+        """Retourne le codec lisible sans conversion proposé par la vidéo, sinon None"""
+        codecs = {
+            (fmt.get('acodec') or '').split('.')[0]
+            for fmt in info.get('formats') or []
+            if fmt.get('vcodec') == 'none'
+        }
+        for codec in NATIVE_CODECS:
+            if codec in codecs:
+                return codec
+        return None
+
+    def _options(self, **extra):
+        options = {
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            'noplaylist': True,
+        }
+        options.update(extra)
+        return options
+
+    def _download_module(self, info, template, codec, job, on_progress):
+        """Téléchargement via l'API, à partir des informations déjà extraites"""
+        import yt_dlp
+
+        def progress_hook(status):
+            if job.cancelled:
+                raise DownloadCancelled()
+            if status.get('status') != 'downloading':
+                return
+            downloaded = status.get('downloaded_bytes')
+            total = status.get('total_bytes') or status.get('total_bytes_estimate')
+            on_progress({
+                'phase': 'download',
+                'percent': downloaded * 100 / total if downloaded and total else None,
+                'downloaded': downloaded,
+                'total': total,
+                'speed': status.get('speed'),
+                'eta': status.get('eta'),
+            })
+
+        def postprocessor_hook(status):
+            if status.get('status') == 'started':
+                on_progress({'phase': 'postprocess'})
+
+        # Flux d'origine : FFmpegExtractAudio se contente de changer de conteneur
+        native = codec in NATIVE_CODECS
+        options = self._options(
+            format=f'bestaudio[acodec^={codec}]' if native else 'bestaudio/best',
+            outtmpl=template,
+            progress_hooks=[progress_hook],
+            postprocessor_hooks=[postprocessor_hook],
+            postprocessors=[{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': codec,
+                'preferredquality': '0',
+            }],
+        )
+        try:
+            with yt_dlp.YoutubeDL(options) as ydl:
+                ydl.process_ie_result(info, download=True)
+        except yt_dlp.utils.DownloadError as e:
+            if job.cancelled:
+                raise DownloadCancelled()
+            raise RuntimeError(f"Erreur de téléchargement: {e}")
+
+    def _download_command(self, url, template, job, on_progress):
+        """Téléchargement via la commande yt-dlp, en lisant sa progression ligne par ligne"""
+        audio_format = self.audio_format
+        cmd = ['yt-dlp', '--newline', '-x']
+        if self.keep_native:
+            # Garder opus/vorbis s'ils sont disponibles, convertir le reste
+            cmd += ['-f', '/'.join(f'bestaudio[acodec^={codec}]' for codec in NATIVE_CODECS) + '/bestaudio/best']
+            audio_format = '/'.join(NATIVE_CODECS + (self.audio_format,))
+        cmd += [
+            '--audio-format', audio_format,
+            '--audio-quality', '0',
+            '-o', template,
+            url
+        ]
+
+        import subprocess
+        ytdlp_spawns.inc()
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True
+        )
+        job.process = process
+        if job.cancelled:
+            process.terminate()
+
+        # Les lignes qui ne sont pas de la progression servent au message d'erreur
+        output = []
+        for line in process.stdout:
+            status = parse_progress_line(line)
+            if status is not None:
+                on_progress(status)
+            elif line.strip():
+                output = (output + [line.strip()])[-20:]
+        process.wait()
+
+        if job.cancelled:
+            raise DownloadCancelled()
+        if process.returncode != 0:
+            raise RuntimeError("Erreur de téléchargement: " + "\n".join(output))
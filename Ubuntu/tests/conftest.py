@@ -0,0 +1,42 @@
+"""Configuration des tests : les modules du lecteur sont importés depuis src/
+
+Les chemins par défaut (index, likes, session...) sont calculés à l'import :
+HOME est redirigé vers un dossier temporaire avant tout import du lecteur.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'benchmarks'))
+
+HOME = tempfile.mkdtemp(prefix="mp3_player_tests_")
+os.environ['HOME'] = HOME
+CACHE_DIR = os.path.join(HOME, '.cache', 'mp3_player')
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(HOME, ignore_errors=True)
+
+
+@pytest.fixture
+def library(tmp_path):
+    """Trois morceaux MP3 CBR synthétiques de 5 secondes"""
+    from synthetic_library import generate_library
+    return generate_library(str(tmp_path / 'library'), 3, kinds=('cbr',), seconds=5.0)
+
+
+@pytest.fixture
+def backend():
+    """Backend neuf (caches vidés) sur une sortie muette dont le temps n'avance que par advance()"""
+    from audio_output import NullOutput
+    from music_player_backend import MusicPlayerBackend
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    backend = MusicPlayerBackend(output=NullOutput(speed=0))
+    yield backend
+    backend.cleanup()
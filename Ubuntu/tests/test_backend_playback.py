@@ -0,0 +1,36 @@
+"""Tests de la lecture par le backend (sortie muette) : enchaînement sans blanc et déplacement"""
+
+import time
+import threading
+
+
+def wait_for(condition, timeout=5.0):
+    """Attend qu'une condition devienne vraie (travail fait dans un thread d'arrière-plan)"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_seek_after_gapless_transition_uses_new_track_index(backend, library):
+    backend.playlist.extend(library)
+    changed = threading.Event()
+    backend.on_song_changed = lambda filename, length, index: changed.set()
+    backend.load_song(0, autoplay=True)
+    assert backend._queued_path == library[1]
+
+    # Fin exacte du premier morceau : la sortie enchaîne sur le morceau en file
+    changed.clear()
+    backend.output.advance(backend.song_length)
+    assert changed.wait(5)
+    assert backend.current_index == 1
+    assert backend.output.source == library[1]
+
+    assert wait_for(lambda: backend._seek_index is not None and backend._seek_index[0] == library[1])
+    assert backend.seek(2.0)
+    # Lecture depuis la trame visée (flux ouvert), et non depuis le début du fichier
+    assert backend._seek_stream is not None
+    assert backend.output.source is backend._seek_stream
+    assert abs(backend.get_current_position() - 2.0) < 0.05
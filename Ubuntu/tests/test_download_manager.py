@@ -0,0 +1,149 @@
+"""Tests de la file de téléchargement : reprise, doublons, annulation et fermeture"""
+
+import json
+import threading
+
+import pytest
+
+from download_manager import (DownloadManager, DownloadCancelled,
+                              PENDING, RUNNING, DONE, FAILED, CANCELLED)
+
+
+class FakeDownloads:
+    """run_job de test : chaque téléchargement attend d'être libéré (ou annulé)"""
+
+    def __init__(self):
+        self.started = []
+        self.release = {}
+        self.fail = set()
+        self._cond = threading.Condition()
+
+    def __call__(self, job):
+        with self._cond:
+            self.started.append(job.url)
+            self.release.setdefault(job.url, threading.Event())
+            self._cond.notify_all()
+        event = self.release[job.url]
+        while not event.wait(0.01):
+            if job.cancelled:
+                raise DownloadCancelled()
+        if job.url in self.fail:
+            raise RuntimeError("Erreur de téléchargement: introuvable")
+        return job.url + ".mp3"
+
+    def wait_started(self, count, timeout=5):
+        with self._cond:
+            return self._cond.wait_for(lambda: len(self.started) >= count, timeout)
+
+    def finish(self, url):
+        with self._cond:
+            self.release.setdefault(url, threading.Event()).set()
+
+
+@pytest.fixture
+def downloads():
+    return FakeDownloads()
+
+
+@pytest.fixture
+def jobs_file(tmp_path):
+    return str(tmp_path / 'downloads.json')
+
+
+def wait_state(manager, job, state, timeout=5):
+    done = threading.Event()
+    manager.on_job_updated = lambda updated: updated is job and updated.state == state and done.set()
+    return job.state == state or done.wait(timeout)
+
+
+def saved(jobs_file):
+    with open(jobs_file, encoding='utf-8') as f:
+        return {data['url']: data['state'] for data in json.load(f)}
+
+
+def test_persisted_pending_and_running_jobs_resume(downloads, jobs_file):
+    with open(jobs_file, 'w', encoding='utf-8') as f:
+        json.dump([
+            {'id': 1, 'url': 'a', 'state': PENDING},
+            {'id': 2, 'url': 'b', 'state': RUNNING},
+            {'id': 3, 'url': 'c', 'state': FAILED},
+        ], f)
+    manager = DownloadManager(downloads, jobs_file, max_workers=2)
+    manager.start()
+
+    assert downloads.wait_started(2)
+    assert sorted(downloads.started) == ['a', 'b']
+    assert manager.get(3).state == FAILED
+    downloads.finish('a')
+    downloads.finish('b')
+    assert wait_state(manager, manager.get(1), DONE)
+    assert wait_state(manager, manager.get(2), DONE)
+    manager.shutdown()
+
+
+def test_same_video_is_not_queued_twice(downloads, jobs_file):
+    manager = DownloadManager(downloads, jobs_file, max_workers=1)
+    first = manager.submit('https://youtu.be/x', video_id='x')
+    again = manager.submit('https://www.youtube.com/watch?v=x', video_id='x')
+    assert again is first
+
+    created = manager.submit_many([('u1', 'x', None), ('u2', 'y', 'Titre'), ('u3', 'y', None)])
+    assert [job.video_id for job in created] == ['y']
+    manager.shutdown()
+
+
+def test_cancel_and_retry(downloads, jobs_file):
+    manager = DownloadManager(downloads, jobs_file, max_workers=1)
+    running = manager.submit('a')
+    pending = manager.submit('b')
+    assert downloads.wait_started(1)
+
+    # En attente : annulé aussitôt, sans avoir démarré
+    assert manager.cancel(pending.id)
+    assert pending.state == CANCELLED
+    # En cours : interrompu par run_job
+    assert manager.cancel(running.id)
+    assert wait_state(manager, running, CANCELLED)
+    assert not manager.cancel(running.id)
+
+    # Relancé une seule fois, même si l'ancien identifiant est encore dans la file
+    assert manager.retry(pending.id)
+    assert not manager.retry(pending.id)
+    downloads.finish('b')
+    assert wait_state(manager, pending, DONE)
+    assert downloads.started == ['a', 'b']
+    manager.shutdown()
+
+
+def test_failed_job_reports_error(downloads, jobs_file):
+    manager = DownloadManager(downloads, jobs_file, max_workers=1)
+    downloads.fail.add('a')
+    job = manager.submit('a')
+    downloads.finish('a')
+    assert wait_state(manager, job, FAILED)
+    assert job.message == "Erreur de téléchargement: introuvable"
+    assert saved(jobs_file) == {'a': FAILED}
+    manager.shutdown()
+
+
+def test_shutdown_requeues_interrupted_jobs_silently(downloads, jobs_file):
+    manager = DownloadManager(downloads, jobs_file, max_workers=1)
+    manager.submit('a')
+    manager.submit('b')
+    assert downloads.wait_started(1)
+
+    updates = []
+    manager.on_job_updated = updates.append
+    manager.shutdown()
+
+    assert updates == []
+    assert saved(jobs_file) == {'a': PENDING, 'b': PENDING}
+    assert downloads.started == ['a']
+
+
+def test_shutdown_before_start_keeps_saved_jobs(downloads, jobs_file):
+    with open(jobs_file, 'w', encoding='utf-8') as f:
+        json.dump([{'id': 1, 'url': 'a', 'state': PENDING}], f)
+    manager = DownloadManager(downloads, jobs_file)
+    manager.shutdown()
+    assert saved(jobs_file) == {'a': PENDING}
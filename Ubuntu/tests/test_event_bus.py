@@ -0,0 +1,132 @@
+"""Tests de la file d'appels : regroupement par clé, ordre et lots"""
+
+import select
+import threading
+
+from event_bus import EventBus
+
+
+def test_calls_run_inline_until_deferred():
+    bus = EventBus()
+    calls = []
+    bus.post(calls.append, 1)
+    assert calls == [1]
+    assert not bus.drain()
+
+
+def test_deferred_calls_run_in_order_on_drain():
+    bus = EventBus()
+    bus.defer()
+    calls = []
+    for i in range(5):
+        bus.post(calls.append, i)
+    assert calls == []
+
+    assert not bus.drain()
+    assert calls == [0, 1, 2, 3, 4]
+
+
+def test_keyed_post_replaces_pending_call_in_place():
+    bus = EventBus()
+    bus.defer()
+    calls = []
+    bus.post(calls.append, 'a')
+    bus.post(calls.append, 'progression 10 %', key='download')
+    bus.post(calls.append, 'b')
+    bus.post(calls.append, 'progression 50 %', key='download')
+    bus.post(calls.append, 'progression 90 %', key='download')
+    bus.post(calls.append, 'liste', key='playlist')
+
+    bus.drain()
+    assert calls == ['a', 'progression 90 %', 'b', 'liste']
+
+
+def test_key_is_free_again_once_drained():
+    bus = EventBus()
+    bus.defer()
+    calls = []
+    bus.post(calls.append, 1, key='k')
+    bus.drain()
+    bus.post(calls.append, 2, key='k')
+    bus.drain()
+    assert calls == [1, 2]
+
+
+def test_drain_runs_one_batch_at_a_time():
+    bus = EventBus(batch_size=10)
+    bus.defer()
+    calls = []
+    for i in range(25):
+        bus.post(calls.append, i)
+
+    assert bus.drain()
+    assert len(calls) == 10
+    assert bus.drain()
+    assert not bus.drain()
+    assert calls == list(range(25))
+
+
+def test_failing_call_does_not_stop_the_batch(capsys):
+    bus = EventBus()
+    bus.defer()
+    calls = []
+    bus.post(lambda: 1 / 0)
+    bus.post(calls.append, 'suite')
+
+    bus.drain()
+    assert calls == ['suite']
+    assert "Erreur lors du traitement d'un événement" in capsys.readouterr().out
+
+
+def test_posts_from_threads_are_all_drained():
+    bus = EventBus()
+    bus.defer()
+    calls = []
+
+    def worker(n):
+        for i in range(500):
+            bus.post(calls.append, (n, i))
+            bus.post(calls.append, n, key=('dernier', n))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    while bus.drain():
+        pass
+
+    for n in range(4):
+        assert [call for call in calls if isinstance(call, tuple) and call[0] == n] == [(n, i) for i in range(500)]
+    assert sorted(call for call in calls if not isinstance(call, tuple)) == [0, 1, 2, 3]
+
+
+def readable(fd):
+    return bool(select.select([fd], [], [], 0)[0])
+
+
+def test_wakeup_fd_is_readable_only_while_calls_wait():
+    bus = EventBus(batch_size=2)
+    fd = bus.defer()
+    assert not readable(fd)
+
+    for i in range(3):
+        bus.post(len, [i])
+    assert readable(fd)
+
+    # Lot complet : le tube reste signalé pour le lot suivant
+    assert bus.drain()
+    assert readable(fd)
+    assert not bus.drain()
+    assert not readable(fd)
+    bus.close()
+
+
+def test_closed_bus_ignores_posts():
+    bus = EventBus()
+    bus.defer()
+    bus.close()
+    calls = []
+    bus.post(calls.append, 1)
+    assert not bus.drain()
+    assert calls == []
@@ -0,0 +1,49 @@
+"""Tests du scanner de dossiers : ordre trié malgré le parcours parallèle"""
+
+import os
+import random
+import time
+
+from folder_scanner import FolderScanner
+from library_index import LibraryIndex
+
+
+def make_tree(root):
+    for artist in range(4):
+        for album in range(3):
+            folder = root / f"Artiste {artist}" / f"Album {album}"
+            folder.mkdir(parents=True)
+            for track in range(3):
+                (folder / f"{track:02d}.mp3").touch()
+            (folder / "cover.jpg").touch()
+        (root / f"Artiste {artist}" / "single.ogg").touch()
+
+
+def sorted_walk(root):
+    paths = []
+    for folder, subdirs, files in os.walk(root):
+        subdirs.sort()
+        paths += [os.path.join(folder, name) for name in sorted(files) if not name.endswith('.jpg')]
+    return paths
+
+
+def test_batches_follow_sorted_directory_order(tmp_path, monkeypatch):
+    make_tree(tmp_path / 'music')
+    scan_directory = FolderScanner._scan_directory
+
+    def slow_scan(self, path):
+        # Les dossiers se terminent dans le désordre
+        time.sleep(random.random() * 0.01)
+        return scan_directory(self, path)
+
+    monkeypatch.setattr(FolderScanner, '_scan_directory', slow_scan)
+    index = LibraryIndex(str(tmp_path / 'library.db'))
+    expected = sorted_walk(str(tmp_path / 'music'))
+
+    for _ in range(3):
+        batches, done = [], []
+        scanner = FolderScanner(index, batch_size=4)
+        scanner.scan(str(tmp_path / 'music'), batches.append, done.append).join()
+        assert [path for batch in batches for path in batch] == expected
+        assert done == [expected]
+    index.close()
@@ -0,0 +1,88 @@
+"""Tests des musiques likées : reprise du journal après un arrêt brutal"""
+
+import json
+
+from liked_songs import LikedSongsStore
+
+
+def crash(store):
+    """Abandonne le store comme un processus tué : journal ouvert, pas de compaction"""
+    if store._journal is not None:
+        store._journal.close()
+
+
+def test_journal_is_replayed_after_crash(tmp_path):
+    snapshot = str(tmp_path / 'liked_list.json')
+    store = LikedSongsStore(snapshot)
+    for path in ['a.mp3', 'b.mp3', 'c.mp3', 'b.mp3', 'd.mp3']:
+        store.toggle(path)
+    crash(store)
+
+    reopened = LikedSongsStore(snapshot)
+    assert list(reopened) == ['a.mp3', 'c.mp3', 'd.mp3']
+    reopened.close()
+
+
+def test_journal_is_replayed_over_snapshot(tmp_path):
+    snapshot = str(tmp_path / 'liked_list.json')
+    store = LikedSongsStore(snapshot)
+    store.toggle('a.mp3')
+    store.toggle('b.mp3')
+    store.close()
+
+    store = LikedSongsStore(snapshot)
+    store.toggle('a.mp3')
+    store.toggle('c.mp3')
+    crash(store)
+
+    with open(snapshot, encoding='utf-8') as f:
+        assert json.load(f) == ['a.mp3', 'b.mp3']
+    reopened = LikedSongsStore(snapshot)
+    assert list(reopened) == ['b.mp3', 'c.mp3']
+    reopened.close()
+
+
+def test_torn_last_line_is_ignored_then_repaired(tmp_path):
+    snapshot = str(tmp_path / 'liked_list.json')
+    store = LikedSongsStore(snapshot)
+    store.toggle('a.mp3')
+    crash(store)
+    # Écriture interrompue au milieu d'une ligne
+    with open(store.journal_file, 'a', encoding='utf-8') as f:
+        f.write('+"b.m')
+
+    store = LikedSongsStore(snapshot)
+    assert list(store) == ['a.mp3']
+    store.toggle('c.mp3')
+    crash(store)
+
+    reopened = LikedSongsStore(snapshot)
+    assert list(reopened) == ['a.mp3', 'c.mp3']
+    reopened.close()
+
+
+def test_crash_between_snapshot_and_journal_reset(tmp_path):
+    snapshot = str(tmp_path / 'liked_list.json')
+    store = LikedSongsStore(snapshot)
+    for path in ['a.mp3', 'b.mp3', 'a.mp3']:
+        store.toggle(path)
+    crash(store)
+    # Instantané déjà remplacé, journal pas encore vidé : le rejouer ne change rien
+    with open(snapshot, 'w', encoding='utf-8') as f:
+        json.dump(['b.mp3'], f)
+
+    reopened = LikedSongsStore(snapshot)
+    assert list(reopened) == ['b.mp3']
+    reopened.close()
+
+
+def test_close_compacts_the_journal(tmp_path):
+    snapshot = str(tmp_path / 'liked_list.json')
+    store = LikedSongsStore(snapshot)
+    store.toggle('a.mp3')
+    store.toggle('b.mp3')
+    store.close()
+
+    with open(store.journal_file, encoding='utf-8') as f:
+        assert f.read() == ''
+    assert list(LikedSongsStore(snapshot)) == ['a.mp3', 'b.mp3']
@@ -0,0 +1,68 @@
+"""Tests du rendu des métriques au format d'exposition Prometheus"""
+
+from metrics import MetricsRegistry
+
+
+def test_counter_rendering():
+    registry = MetricsRegistry()
+    registry.counter('mp3_player_errors_total', "Erreurs", kind='load').inc()
+    registry.counter('mp3_player_errors_total', "Erreurs", kind='load').inc(2)
+    registry.counter('mp3_player_errors_total', "Erreurs", kind='seek').inc()
+
+    assert registry.render() == (
+        '# HELP mp3_player_errors_total Erreurs\n'
+        '# TYPE mp3_player_errors_total counter\n'
+        'mp3_player_errors_total{kind="load"} 3\n'
+        'mp3_player_errors_total{kind="seek"} 1\n'
+    )
+
+
+def test_histogram_rendering_is_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('mp3_player_load_seconds', "Chargement",
+                                   buckets=(0.1, 1.0), phase='decode', backend='null')
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    # Étiquettes triées par nom, "le" en dernier ; une borne compte les valeurs égales
+    labels = 'backend="null",phase="decode"'
+    assert registry.render() == (
+        '# HELP mp3_player_load_seconds Chargement\n'
+        '# TYPE mp3_player_load_seconds histogram\n'
+        f'mp3_player_load_seconds_bucket{{{labels},le="0.1"}} 2\n'
+        f'mp3_player_load_seconds_bucket{{{labels},le="1.0"}} 3\n'
+        f'mp3_player_load_seconds_bucket{{{labels},le="+Inf"}} 4\n'
+        f'mp3_player_load_seconds_sum{{{labels}}} 2.65\n'
+        f'mp3_player_load_seconds_count{{{labels}}} 4\n'
+    )
+
+
+def test_histogram_without_labels():
+    registry = MetricsRegistry()
+    registry.histogram('mp3_player_scan_seconds', "Analyse", buckets=(1.0,))
+
+    assert registry.render().splitlines()[2:] == [
+        'mp3_player_scan_seconds_bucket{le="1.0"} 0',
+        'mp3_player_scan_seconds_bucket{le="+Inf"} 0',
+        'mp3_player_scan_seconds_sum 0.0',
+        'mp3_player_scan_seconds_count 0',
+    ]
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter('mp3_player_files_total', "Fichiers", path='C:\\Musique\\"live"\nbis').inc()
+
+    assert registry.render().splitlines()[-1] == (
+        'mp3_player_files_total{path="C:\\\\Musique\\\\\\"live\\"\\nbis"} 1'
+    )
+
+
+def test_families_are_sorted_by_name():
+    registry = MetricsRegistry()
+    registry.counter('b_total', "B").inc()
+    registry.counter('a_total', "A").inc()
+
+    lines = registry.render().splitlines()
+    assert lines[0] == '# HELP a_total A'
+    assert lines[3] == '# HELP b_total B'
@@ -0,0 +1,111 @@
+"""Tests de l'index de positionnement : chaque déplacement tombe sur un début de trame"""
+
+import struct
+
+import pytest
+
+from mp3_seek_index import build_seek_index, open_at, parse_frame_header
+
+
+# Trames MPEG-1 couche III, 44,1 kHz, stéréo
+SAMPLE_RATE = 44100
+FRAME_TIME = 1152 / SAMPLE_RATE
+
+
+def frame(bitrate_index, padding=0, body=b''):
+    """Trame silencieuse complète (en-tête, éventuel en-tête Xing/VBRI, puis zéros)"""
+    header = bytes((0xFF, 0xFB, (bitrate_index << 4) | (padding << 1), 0x00))
+    length = parse_frame_header(header, 0)[0]
+    return header + body + b'\x00' * (length - 4 - len(body))
+
+
+def id3_tag(size=300):
+    """Étiquette ID3v2.4 vide de la taille indiquée"""
+    syncsafe = bytes((size >> 21 & 0x7F, size >> 14 & 0x7F, size >> 7 & 0x7F, size & 0x7F))
+    return b'ID3\x04\x00\x00' + syncsafe + b'\x00' * size
+
+
+def vbr_frames(count):
+    """Trames de débits variés (128 à 192 kbit/s, avec et sans octet de bourrage)"""
+    return [frame((9, 10, 11, 12)[i % 4], padding=i % 3 == 0) for i in range(count)]
+
+
+def write_mp3(tmp_path, name, frames, tag=b''):
+    """Écrit le fichier et retourne (chemin, positions des débuts de trame)"""
+    starts, pos = [], len(tag)
+    for data in frames:
+        starts.append(pos)
+        pos += len(data)
+    path = tmp_path / name
+    path.write_bytes(tag + b''.join(frames))
+    return str(path), starts
+
+
+def cbr_file(tmp_path):
+    return write_mp3(tmp_path, 'cbr.mp3', [frame(9) for _ in range(400)], id3_tag())
+
+
+def xing_file(tmp_path):
+    audio = vbr_frames(400)
+    audio_bytes = sum(len(data) for data in audio)
+    # Sommaire : position relative (sur 256) de la trame jouée à chaque centième de la durée
+    toc = bytearray()
+    for i in range(100):
+        toc.append(min(255, sum(len(data) for data in audio[:i * len(audio) // 100]) * 256 // audio_bytes))
+    body = b'\x00' * 32 + b'Xing' + struct.pack('>III', 0x7, len(audio), audio_bytes) + bytes(toc)
+    return write_mp3(tmp_path, 'xing.mp3', [frame(9, body=body)] + audio, id3_tag())
+
+
+def vbri_file(tmp_path):
+    frames_per_entry = 10
+    audio = vbr_frames(400)
+    frames = [None] + audio
+    # Table VBRI : taille de chaque groupe de trames, trame VBRI comprise
+    sizes = []
+    lengths = [len(frame(9))] + [len(data) for data in audio]
+    for i in range(0, len(lengths), frames_per_entry):
+        sizes.append(sum(lengths[i:i + frames_per_entry]))
+    body = b'\x00' * 32 + b'VBRI' + struct.pack(
+        '>HHHIIHHHH', 1, 0, 75, sum(lengths), len(lengths), len(sizes), 1, 2, frames_per_entry)
+    body += b''.join(struct.pack('>H', size) for size in sizes)
+    frames[0] = frame(9, body=body)
+    return write_mp3(tmp_path, 'vbri.mp3', frames)
+
+
+@pytest.mark.parametrize('make_file, exact, step', [
+    # Parcours des trames : un point toutes les 38 trames (environ une seconde)
+    (cbr_file, True, 38 * FRAME_TIME),
+    # Sommaire Xing : un point par centième de la durée
+    (xing_file, False, 400 * FRAME_TIME / 100),
+    # Table VBRI : un point par groupe de 10 trames
+    (vbri_file, True, 10 * FRAME_TIME),
+])
+def test_seek_lands_on_frame_header(tmp_path, make_file, exact, step):
+    path, starts = make_file(tmp_path)
+    index = build_seek_index(path)
+    assert index is not None
+    assert index.exact == exact
+    assert index.step == pytest.approx(step)
+    # Durée à une trame près (la trame Xing n'est pas du son)
+    assert index.duration == pytest.approx(len(starts) * FRAME_TIME, abs=1.5 * FRAME_TIME)
+
+    for tenth in range(0, int(index.duration * 10)):
+        seconds = tenth / 10
+        stream, position = open_at(path, index, seconds)
+        assert stream is not None
+        try:
+            offset = stream.tell()
+            assert offset in starts
+            assert parse_frame_header(stream.read(4), 0) is not None
+        finally:
+            stream.close()
+        # La trame trouvée contient la position demandée (à une trame près pour Xing)
+        assert position <= seconds + (0 if exact else FRAME_TIME)
+        if exact:
+            assert seconds < position + FRAME_TIME
+
+
+def test_non_mp3_file_has_no_index(tmp_path):
+    path = tmp_path / 'notes.mp3'
+    path.write_bytes(b'pas un fichier audio' * 100)
+    assert build_seek_index(str(path)) is None
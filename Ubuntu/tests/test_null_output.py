@@ -0,0 +1,135 @@
+"""Tests de la sortie muette : temps simulé, pause, enchaînement et fin des morceaux"""
+
+import threading
+
+import pytest
+
+from audio_output import NullOutput, AudioOutputError
+
+
+DURATIONS = {'a.mp3': 10.0, 'b.mp3': 4.0}
+
+
+@pytest.fixture
+def output():
+    output = NullOutput(get_duration=DURATIONS.get, speed=0)
+    output.ends = threading.Semaphore(0)
+    output.on_end = output.ends.release
+    output.open()
+    yield output
+    output.close()
+
+
+def ended(output, timeout=2.0):
+    """Vrai si on_end a été appelé (depuis le thread de la sortie)"""
+    return output.ends.acquire(timeout=timeout)
+
+
+def not_ended(output):
+    return not output.ends.acquire(timeout=0.05)
+
+
+def test_play_requires_a_loaded_track(output):
+    with pytest.raises(AudioOutputError):
+        output.play()
+
+
+def test_track_ends_after_its_duration(output):
+    output.load('a.mp3')
+    output.play()
+    assert output.get_busy()
+
+    output.advance(9.5)
+    assert not_ended(output)
+    output.advance(0.5)
+    assert ended(output)
+    assert not output.get_busy()
+
+
+def test_play_from_position(output):
+    output.load('a.mp3')
+    output.play(start=7.0)
+    output.advance(3.0)
+    assert ended(output)
+
+
+def test_unknown_duration_uses_default(output):
+    output.default_duration = 2.0
+    output.load('inconnu.mp3')
+    output.play()
+    output.advance(2.0)
+    assert ended(output)
+
+
+def test_pause_freezes_simulated_position(output):
+    output.load('b.mp3')
+    output.play()
+    output.advance(3.0)
+    output.pause()
+    assert not output.get_busy()
+
+    output.advance(100.0)
+    assert not_ended(output)
+    output.unpause()
+    assert output.get_busy()
+    output.advance(0.5)
+    assert not_ended(output)
+    output.advance(0.5)
+    assert ended(output)
+
+
+def test_queued_track_starts_exactly_at_end(output):
+    output.load('a.mp3')
+    output.play()
+    output.queue('b.mp3')
+
+    output.advance(10.0)
+    assert ended(output)
+    # Enchaînement sans blanc : le morceau en file est déjà en cours
+    assert output.get_busy()
+    assert output.source == 'b.mp3'
+
+    output.advance(3.9)
+    assert not_ended(output)
+    output.advance(0.1)
+    assert ended(output)
+    assert not output.get_busy()
+
+
+def test_load_clears_queue(output):
+    output.load('a.mp3')
+    output.queue('b.mp3')
+    output.load('b.mp3')
+    output.play()
+    output.advance(4.0)
+    assert ended(output)
+    assert not output.get_busy()
+
+
+def test_stop_reports_end_only_when_active(output):
+    output.load('a.mp3')
+    output.stop()
+    assert not_ended(output)
+
+    output.play()
+    output.queue('b.mp3')
+    output.stop()
+    assert ended(output)
+    assert not output.get_busy()
+    # La file est vidée : rien ne démarre ensuite
+    output.advance(100.0)
+    assert not_ended(output)
+
+
+def test_open_file_length_is_the_remaining_part(output, tmp_path):
+    path = tmp_path / 'a.mp3'
+    path.write_bytes(bytes(1000))
+    output.get_duration = lambda source: 10.0 if source == str(path) else 0
+    with open(path, 'rb') as stream:
+        stream.seek(750)
+        output.load(stream, 'mp3')
+        output.play()
+        output.advance(2.4)
+        assert not_ended(output)
+        output.advance(0.1)
+        assert ended(output)
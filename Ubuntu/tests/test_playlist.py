@@ -0,0 +1,101 @@
+"""Tests de la playlist : ordre, unicité et positions après modification"""
+
+import pytest
+
+from playlist import Playlist
+
+
+def check_positions(playlist):
+    """Chaque chemin est retrouvé à sa position réelle"""
+    for position, path in enumerate(playlist):
+        assert playlist.index(path) == position
+
+
+def test_extend_ignores_duplicates():
+    playlist = Playlist(['a', 'b'])
+    added = playlist.extend(['b', 'c', 'c', 'a', 'd'])
+
+    assert added == ['c', 'd']
+    assert playlist.to_list() == ['a', 'b', 'c', 'd']
+    assert not playlist.append('a')
+    check_positions(playlist)
+
+
+def test_insert_ignores_duplicates():
+    playlist = Playlist(['a', 'b', 'c'])
+    added = playlist.insert(1, ['x', 'a', 'x', 'y'])
+
+    assert added == ['x', 'y']
+    assert playlist.to_list() == ['a', 'x', 'y', 'b', 'c']
+    check_positions(playlist)
+
+
+def test_remove_reindexes_following_items():
+    playlist = Playlist([f"{i}.mp3" for i in range(10)])
+    assert playlist.remove_at(2) == '2.mp3'
+    playlist.remove('7.mp3')
+    playlist.remove_at(0)
+
+    assert playlist.to_list() == ['1.mp3', '3.mp3', '4.mp3', '5.mp3', '6.mp3', '8.mp3', '9.mp3']
+    assert '2.mp3' not in playlist
+    with pytest.raises(ValueError):
+        playlist.index('7.mp3')
+    check_positions(playlist)
+
+
+def test_removed_path_can_be_added_again():
+    playlist = Playlist(['a', 'b', 'c'])
+    playlist.remove('a')
+
+    assert playlist.append('a')
+    assert playlist.to_list() == ['b', 'c', 'a']
+    check_positions(playlist)
+
+
+def test_move_keeps_order_and_positions():
+    playlist = Playlist(['a', 'b', 'c', 'd', 'e'])
+    playlist.move(0, 3)
+    assert playlist.to_list() == ['b', 'c', 'd', 'a', 'e']
+    playlist.move(4, 1)
+    assert playlist.to_list() == ['b', 'e', 'c', 'd', 'a']
+    check_positions(playlist)
+
+    with pytest.raises(IndexError):
+        playlist.move(0, 5)
+
+
+def test_mixed_changes_match_a_plain_list():
+    playlist = Playlist()
+    expected = []
+    for step in range(200):
+        path = f"{step % 37}.mp3"
+        if step % 5 == 4 and expected:
+            index = (step * 7) % len(expected)
+            expected.pop(index)
+            playlist.remove_at(index)
+        elif step % 7 == 3 and len(expected) > 1:
+            source, destination = step % len(expected), (step * 3) % len(expected)
+            expected.insert(destination, expected.pop(source))
+            playlist.move(source, destination)
+        elif path not in expected:
+            index = step % (len(expected) + 1)
+            expected.insert(index, path)
+            playlist.insert(index, [path])
+
+        assert playlist.to_list() == expected
+        assert len(set(playlist)) == len(playlist)
+    check_positions(playlist)
+
+
+def test_on_change_reports_each_change():
+    playlist = Playlist()
+    changes = []
+    playlist.on_change = lambda action, *args: changes.append((action, *args))
+
+    playlist.extend(['a', 'b', 'c'])
+    playlist.extend(['a'])
+    playlist.remove_at(1)
+    playlist.move(0, 1)
+    playlist.clear()
+
+    assert changes == [('insert', 0, 3), ('remove', 1, 1), ('move', 0, 1), ('clear',)]
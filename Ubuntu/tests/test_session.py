@@ -0,0 +1,73 @@
+"""Tests de la session : sauvegarde, regroupement des écritures, fichier corrompu et restauration"""
+
+import zlib
+import threading
+
+from session import SessionStore
+
+
+def test_save_and_load_round_trip(tmp_path):
+    state = {'playlist': ['a.mp3', 'é.mp3'], 'current_index': 1, 'position': 12.5}
+    store = SessionStore(lambda: state, str(tmp_path / 'session.bin'))
+    store.save()
+
+    loaded = SessionStore(dict, str(tmp_path / 'session.bin')).load()
+    assert loaded == dict(state, version=1)
+
+
+def test_missing_file_loads_nothing(tmp_path):
+    assert SessionStore(dict, str(tmp_path / 'session.bin')).load() is None
+
+
+def test_corrupt_file_is_ignored(tmp_path, capsys):
+    session_file = tmp_path / 'session.bin'
+    session_file.write_bytes(b'pas une session')
+    assert SessionStore(dict, str(session_file)).load() is None
+    assert "Erreur lors du chargement de la session" in capsys.readouterr().out
+
+    # Données lisibles mais d'un autre format
+    session_file.write_bytes(zlib.compress(b'{"version": 99, "playlist": []}'))
+    assert SessionStore(dict, str(session_file)).load() is None
+    session_file.write_bytes(zlib.compress(b'[1, 2]'))
+    assert SessionStore(dict, str(session_file)).load() is None
+
+
+def test_scheduled_saves_are_merged(tmp_path):
+    calls = []
+    saved = threading.Event()
+
+    def get_state():
+        calls.append(1)
+        saved.set()
+        return {'playlist': [], 'count': len(calls)}
+
+    store = SessionStore(get_state, str(tmp_path / 'session.bin'), delay=0.05)
+    for _ in range(20):
+        store.schedule_save()
+    assert saved.wait(5)
+    store.schedule_save()
+    store.flush()
+
+    # Une écriture pour la rafale, une pour flush() (qui annule la sauvegarde planifiée)
+    assert len(calls) == 2
+    assert store.load() is not None
+
+
+def test_malformed_shuffle_resets_against_restored_index(backend, library):
+    SessionStore(lambda: {
+        'playlist': library,
+        'current_index': 2,
+        'position': 0,
+        'shuffle_mode': True,
+        'shuffle': {'size': len(library), 'swaps': 'invalide'},
+    }, backend.session.session_file).save()
+
+    assert backend.restore_session()
+    assert backend.current_index == 2
+    assert backend.shuffle_mode
+    # Le morceau restauré compte comme déjà joué : le cycle se termine par les deux autres
+    current, played = 2, []
+    for _ in range(2):
+        current = backend.shuffle.next(current)
+        played.append(current)
+    assert sorted(played) == [0, 1]
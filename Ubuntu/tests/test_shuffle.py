@@ -0,0 +1,95 @@
+"""Tests du mode aléatoire : chaque morceau une fois par cycle, précédent et suivant"""
+
+import random
+
+from shuffle import ShuffleEngine
+
+
+def play(engine, current, count):
+    """Enchaîne count morceaux et retourne les index joués"""
+    played = []
+    for _ in range(count):
+        current = engine.next(current)
+        played.append(current)
+    return played
+
+
+def test_each_track_plays_once_per_cycle():
+    size = 50
+    engine = ShuffleEngine(random.Random(3))
+    engine.reset(size, current=7)
+
+    # Le morceau en cours compte comme joué dans le premier cycle
+    first = play(engine, 7, size - 1)
+    assert sorted(first + [7]) == list(range(size))
+
+    current = first[-1]
+    for _ in range(3):
+        cycle = play(engine, current, size)
+        assert sorted(cycle) == list(range(size))
+        current = cycle[-1]
+
+
+def test_new_cycle_does_not_repeat_current_track():
+    engine = ShuffleEngine(random.Random(0))
+    engine.reset(5, current=0)
+    current = 0
+    for _ in range(100):
+        following = engine.next(current)
+        assert following != current
+        current = following
+
+
+def test_peek_matches_next():
+    engine = ShuffleEngine(random.Random(1))
+    engine.reset(20, current=0)
+    current = 0
+    for _ in range(40):
+        upcoming = engine.peek(current)
+        assert engine.peek(current) == upcoming
+        current = engine.next(current)
+        assert current == upcoming
+
+
+def test_previous_then_forward_replays_history():
+    engine = ShuffleEngine(random.Random(2))
+    engine.reset(30, current=0)
+    played = [0] + play(engine, 0, 10)
+
+    # Retour en arrière jusqu'au début de l'historique
+    current = played[-1]
+    for expected in reversed(played[:-1]):
+        current = engine.previous(current)
+        assert current == expected
+    assert engine.previous(current) is None
+
+    # Puis en avant : les mêmes morceaux, dans le même ordre
+    for expected in played[1:]:
+        current = engine.next(current)
+        assert current == expected
+
+    # Et le cycle reprend sans rejouer ces morceaux
+    rest = play(engine, current, 30 - len(played))
+    assert sorted(played + rest) == list(range(30))
+
+
+def test_tracks_added_during_cycle_join_it():
+    engine = ShuffleEngine(random.Random(4))
+    engine.reset(10, current=0)
+    played = [0] + play(engine, 0, 4)
+    engine.resize(15)
+    played += play(engine, played[-1], 10)
+    assert sorted(played) == list(range(15))
+
+
+def test_state_round_trip():
+    engine = ShuffleEngine(random.Random(5))
+    engine.reset(25, current=3)
+    current = play(engine, 3, 8)[-1]
+    previous = engine.previous(current)
+
+    restored = ShuffleEngine(random.Random(6))
+    restored.restore(engine.state())
+    assert restored.state() == engine.state()
+    # Le morceau suivant (déjà connu) est le même après la reprise
+    assert restored.next(previous) == engine.next(previous) == current
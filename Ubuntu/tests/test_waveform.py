@@ -0,0 +1,64 @@
+"""Tests du calcul des pics : NumPy et Python pur doivent donner la même forme d'onde"""
+
+import math
+import sys
+from array import array
+
+import pytest
+
+from waveform import compute_peaks, BLOCK_SIZE, CHUNK_BYTES, DECODE_RATE
+
+
+def synthetic_pcm(seconds=3.3):
+    """Sinusoïde modulée en amplitude, avec les extrêmes 16 bits et un dernier bloc incomplet"""
+    samples = array('h', (
+        int(32767 * (0.5 + 0.5 * math.sin(i / 3000)) * math.sin(2 * math.pi * 440 * i / DECODE_RATE))
+        for i in range(int(DECODE_RATE * seconds))
+    ))
+    samples[100] = -32768
+    samples[200] = 32767
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def split(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def pure_peaks(monkeypatch, chunks):
+    with monkeypatch.context() as patch:
+        patch.setitem(sys.modules, 'numpy', None)
+        return compute_peaks(chunks)
+
+
+def test_numpy_and_pure_python_agree(monkeypatch):
+    pytest.importorskip('numpy')
+    pcm = synthetic_pcm()
+
+    peaks = compute_peaks([pcm])
+    assert peaks == pure_peaks(monkeypatch, [pcm])
+
+
+@pytest.mark.parametrize('size', [CHUNK_BYTES, 1000, 1001, BLOCK_SIZE * 2])
+def test_chunking_does_not_change_peaks(monkeypatch, size):
+    pcm = synthetic_pcm()
+    expected = pure_peaks(monkeypatch, [pcm])
+
+    assert pure_peaks(monkeypatch, split(pcm, size)) == expected
+
+
+def test_pure_python_peaks(monkeypatch):
+    pcm = synthetic_pcm()
+    minima, maxima = pure_peaks(monkeypatch, [pcm])
+
+    # Un pic par bloc, le dernier bloc incomplet compris
+    assert len(minima) == len(maxima) == math.ceil(len(pcm) / 2 / BLOCK_SIZE)
+    assert array('b', minima)[0] == -127
+    assert array('b', maxima)[0] == 127
+    assert all(low <= high for low, high in zip(array('b', minima), array('b', maxima)))
+
+
+def test_odd_trailing_byte_is_ignored(monkeypatch):
+    pcm = synthetic_pcm(0.1)
+    assert pure_peaks(monkeypatch, [pcm + b'\x01']) == pure_peaks(monkeypatch, [pcm])
@@ -0,0 +1,59 @@
+"""Tests du décodage des lignes de progression de la commande yt-dlp"""
+
+import pytest
+
+from youtube_engine import parse_progress_line
+
+
+MiB = 1024 ** 2
+
+
+@pytest.mark.parametrize('line, expected', [
+    # Ligne complète
+    ("[download]  45.0% of    4.00MiB at    1.50MiB/s ETA 00:02",
+     {'percent': 45.0, 'total': 4 * MiB, 'downloaded': 1.8 * MiB, 'speed': 1.5 * MiB, 'eta': 2}),
+    # Taille estimée (~) et fragments
+    ("[download]  12.5% of ~  10.00MiB at    2.00MiB/s ETA 00:05 (frag 3/30)",
+     {'percent': 12.5, 'total': 10 * MiB, 'downloaded': 1.25 * MiB, 'speed': 2 * MiB, 'eta': 5}),
+    ("[download]  12.5% of ~10.00MiB at 2.00MiB/s ETA 00:05",
+     {'percent': 12.5, 'total': 10 * MiB, 'downloaded': 1.25 * MiB, 'speed': 2 * MiB, 'eta': 5}),
+    # Unités décimales (KB, MB) et binaires (KiB), ETA avec les heures
+    ("[download]   5.0% of  500.00KiB at  100.00KB/s ETA 01:02:03",
+     {'percent': 5.0, 'total': 500 * 1024, 'downloaded': 25 * 1024, 'speed': 100000, 'eta': 3723}),
+    ("[download]  50.0% of 3.00MB at 1.00MB/s ETA 00:01",
+     {'percent': 50.0, 'total': 3e6, 'downloaded': 1.5e6, 'speed': 1e6, 'eta': 1}),
+    # Vitesse et ETA inconnues
+    ("[download]   0.0% of    3.45MiB at  Unknown speed ETA Unknown",
+     {'percent': 0.0, 'total': 3.45 * MiB, 'downloaded': 0.0, 'speed': None, 'eta': None}),
+    # Fin du téléchargement : durée écoulée au lieu de l'ETA
+    ("[download] 100% of    3.00MiB in 00:00:02 at 1.50MiB/s",
+     {'percent': 100.0, 'total': 3 * MiB, 'downloaded': 3 * MiB, 'speed': None, 'eta': None}),
+    # Unité inconnue : taille ignorée
+    ("[download]  10.0% of 3.00XB at 1.00MiB/s ETA 00:03",
+     {'percent': 10.0, 'total': None, 'downloaded': None, 'speed': MiB, 'eta': 3}),
+])
+def test_download_lines(line, expected):
+    status = parse_progress_line(line)
+    assert status['phase'] == 'download'
+    for key, value in expected.items():
+        assert status[key] == (pytest.approx(value) if value is not None else None), key
+
+
+@pytest.mark.parametrize('line', [
+    "[ExtractAudio] Destination: musique.mp3",
+    "[FFmpegExtractAudio] Destination: musique.mp3",
+    "[FFmpegMetadata] Adding metadata to 'musique.mp3'",
+])
+def test_postprocess_lines(line):
+    assert parse_progress_line(line) == {'phase': 'postprocess'}
+
+
+@pytest.mark.parametrize('line', [
+    "",
+    "[youtube] abc123: Downloading webpage",
+    "[download] Destination: musique.webm",
+    "[download] musique.mp3 has already been downloaded",
+    "ERROR: [youtube] abc123: Video unavailable",
+])
+def test_other_lines(line):
+    assert parse_progress_line(line) is None